@@ -0,0 +1,99 @@
+"""
+Compares the disk asset cache of scraper.session with the browser's own HTTP cache.
+
+    python -m benchmarks.bench_asset_cache --contexts 5 --pages 20
+    python -m benchmarks.bench_asset_cache --site motoroazis --links mototoazis/products_output.json
+
+Each variant opens `--contexts` fresh contexts one after another and loads the same
+`--pages` detail pages in each, the way short runs on a browser server do:
+   - browser cache: plain contexts; each one downloads the assets once and then serves
+     them from its own HTTP cache,
+   - asset cache: contexts routed through an AssetCache in a temporary directory; the
+     first context fills it, the others read the assets from disk through the driver.
+The fixture shop (scraper.fixture_server, ASSET_BYTES of scripts and styles on every
+detail page) is used unless `--site` and `--links` point at a real site. The report
+gives the median and total page load time of each variant; --asset-cache is only worth
+enabling for a site where the asset cache comes out faster.
+"""
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+
+from scraper import fixture_server, get_site
+from scraper.session import STATIC_URL, AssetCache
+from scraper.storage import load_links_from_json
+
+
+def load_pages(browser, urls: list[str], contexts: int, timeout: int, cache_dir: str = None) -> dict:
+    cache = AssetCache(cache_dir) if cache_dir else None
+    timings = []
+    for _ in range(contexts):
+        context = browser.new_context()
+        if cache:
+            context.route(STATIC_URL, cache.handle)
+        try:
+            page = context.new_page()
+            for url in urls:
+                started = time.perf_counter()
+                page.goto(url, wait_until="load", timeout=timeout)
+                timings.append(time.perf_counter() - started)
+        finally:
+            context.close()
+    result = {"median_ms": statistics.median(timings) * 1000, "total_s": sum(timings)}
+    if cache:
+        result.update(hits=cache.hits, misses=cache.misses)
+    return result
+
+
+def run_benchmark(urls: list[str], contexts: int, timeout: int) -> dict:
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        try:
+            # Warms up the browser and the server, so neither variant pays for the first start.
+            load_pages(browser, urls[:1], 1, timeout)
+            results = {"browser cache": load_pages(browser, urls, contexts, timeout)}
+            with tempfile.TemporaryDirectory() as cache_dir:
+                results["asset cache"] = load_pages(browser, urls, contexts, timeout, cache_dir)
+        finally:
+            browser.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_asset_cache")
+    parser.add_argument("--contexts", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=20, help="Detail pages loaded in each context.")
+    parser.add_argument("--site", help="Benchmark a real site instead of the fixture shop (needs --links).")
+    parser.add_argument("--links", help="JSON list of the site's detail page URLs, e.g. its products_output.json.")
+    args = parser.parse_args(argv)
+    if bool(args.site) != bool(args.links):
+        parser.error("--site and --links go together")
+    logging.disable(logging.INFO)
+
+    shop = None
+    if args.site:
+        timeout = get_site(args.site).timeout
+        urls = load_links_from_json(args.links)[:args.pages]
+    else:
+        shop = fixture_server.start()
+        base_url = f"http://127.0.0.1:{shop.server_address[1]}/"
+        timeout = fixture_server.fixture_site(base_url).timeout
+        urls = [f"{base_url}product/{i}" for i in range(args.pages)]
+    try:
+        results = run_benchmark(urls, args.contexts, timeout)
+    finally:
+        if shop:
+            shop.shutdown()
+    print(f"{len(urls)} pages in each of {args.contexts} contexts")
+    print(f"{'variant':16s} {'median ms':>10s} {'total s':>9s} {'hits':>6s} {'misses':>7s}")
+    for name, result in results.items():
+        print(f"{name:16s} {result['median_ms']:10.1f} {result['total_s']:9.2f} "
+              f"{result.get('hits', '-'):>6} {result.get('misses', '-'):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Micro-benchmarks for the pure URL and text helpers that run once per link or record.
+
+    python -m benchmarks.bench_helpers --items 100000
+    python -m benchmarks.bench_helpers --items 100000 --fail-on-regression   # e.g. in CI
+
+Inputs are generated in the shape of mototoazis/links_output.json (listing URLs with a
+?page= parameter), mototoazis/products_output.json (product URLs), totalbike's tracking
+links and tornadohelmets' records. Every benchmark runs `--repeat` times over
+`--items` inputs and the fastest run is kept, as ns per item. Results are appended to
+`--results` (benchmarks/results/bench_helpers.json by default, which git ignores: the
+history belongs to the machine it was measured on) together with the git commit, and
+each result is compared with the median of the last `--history` runs with the same item
+count and Python version; a benchmark more than `--threshold` slower is flagged as a
+regression.
+
+The URL helpers come from scraper.urls and need no browser. The helpers defined in the
+site scripts (totalbike, tornadohelmets) are only benchmarked when Playwright is
+installed, since those scripts import it.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+from benchmarks.bench_memory import CATEGORIES, generate_urls
+from scraper import get_site, save_links_to_json
+from scraper.urls import remove_page_param, scrape_pages_in_reverse, unwrap_redirect, last_page_from_href
+
+RESULTS_FILE = os.path.join(os.path.dirname(__file__), "results", "bench_helpers.json")
+
+
+def generate_listing_urls(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    for i in range(n):
+        query = "" if i % 4 == 0 else f"?page={rng.randint(1, 40)}"
+        if i % 10 == 1:
+            query = f"?sort=price&page={rng.randint(1, 40)}&limit=24"
+        yield f"https://www.motoroazis.hu/{rng.choice(CATEGORIES)}-{i % 500}{query}"
+
+
+def generate_last_page_hrefs(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield f"/{rng.choice(CATEGORIES)}?page={rng.randint(2, 400)}" if i % 20 else "/motoros_ruhazat_58"
+
+
+def generate_tracking_links(n: int, seed: int = 1):
+    # totalbike's post links go through a dex.hu redirect, roughly half of them.
+    rng = random.Random(seed)
+    for i in range(n):
+        post = f"https://totalbike.hu/technika/nepperuzo/{2010 + i % 14}/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/poszt-{i}/"
+        yield f"https://dex.hu/x.php?id=totalbike_cikklink&url={quote(post, safe='')}" if i % 2 else post
+
+
+def generate_records(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    words = ["bukósisak", "Arai", "plexi", "méret", "szín", "anyag", "védelem"]
+    for i, url in enumerate(generate_urls(n, seed)):
+        desc = "" if i % 7 == 0 else " ".join(rng.choice(words) for _ in range(rng.randint(5, 80)))
+        yield {"url": url, "title": f"Tornado bukósisak {i}", "desc": desc if i % 13 else "   "}
+
+
+def _cases(items: int, workdir: str) -> dict:
+    motoroazis = get_site("motoroazis")
+    listing_urls = list(generate_listing_urls(items))
+    hrefs = list(generate_last_page_hrefs(items))
+    tracking = list(generate_tracking_links(items))
+    tracking_file = os.path.join(workdir, "totalbike_posts.json")
+    save_links_to_json(tracking, tracking_file)
+    records_file = os.path.join(workdir, "tornadohelmets_output.json")
+    save_links_to_json(list(generate_records(items)), records_file)
+    # One listing per 100 items, each expanded to its pages (up to 200).
+    listings = [(url.split("?")[0], 1 + i % 200) for i, url in enumerate(listing_urls[:max(1, items // 100)])]
+    totalbike = get_site("totalbike")
+    os.makedirs(os.path.join(workdir, "totalbike"), exist_ok=True)
+
+    cases = {
+        # name: (function, number of items it processes)
+        "remove_page_param": (lambda: [remove_page_param(url) for url in listing_urls], items),
+        "last_page_from_href": (lambda: [last_page_from_href(motoroazis, href) for href in hrefs], items),
+        "scrape_pages_in_reverse": (lambda: [scrape_pages_in_reverse(motoroazis, base, last) for base, last in listings],
+                                    sum(last for _, last in listings)),
+        "unwrap_redirect": (lambda: [unwrap_redirect(url) for url in tracking], items),
+    }
+    if importlib.util.find_spec("playwright") is None:
+        print("Playwright is not installed, skipping the benchmarks of the site script helpers.")
+        return cases
+    from totalbike.totalbike_blog import _remove_dex, generate_pagination_links
+    from tornadohelmets.tornadohelmets_shop import remove_empty_desc_objects
+
+    def remove_dex():
+        # _remove_dex writes to the relative path totalbike/clear_totalbike_posts.json.
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            _remove_dex(tracking_file)
+        finally:
+            os.chdir(cwd)
+
+    cases.update({
+        "generate_pagination_links": (lambda: [generate_pagination_links(totalbike.base_url, last) for _, last in listings],
+                                      sum(last + 1 for _, last in listings)),
+        "_remove_dex (with JSON I/O)": (remove_dex, items),
+        "remove_empty_desc_objects (with JSON I/O)": (
+            lambda: remove_empty_desc_objects(records_file, os.path.join(workdir, "filtered.json")), items),
+    })
+    return cases
+
+
+def run_benchmarks(items: int, repeat: int) -> dict:
+    import logging
+    # The helpers log every file they save; that is not what is measured here.
+    logging.disable(logging.INFO)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, (function, count) in _cases(items, workdir).items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                function()
+                timings.append(time.perf_counter() - started)
+            results[name] = min(timings) / count * 1e9
+    logging.disable(logging.NOTSET)
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_history(path: str = RESULTS_FILE) -> list[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results: dict, history: list[dict], items: int, runs: int) -> dict:
+    """
+    Returns {name: (baseline ns/item or None, change)} against the median of the last `runs` comparable runs.
+    """
+    comparable = [run for run in history if run["items"] == items and run["python"] == platform.python_version()][-runs:]
+    report = {}
+    for name, value in results.items():
+        previous = [run["results"][name] for run in comparable if name in run["results"]]
+        baseline = statistics.median(previous) if previous else None
+        report[name] = (baseline, value / baseline - 1 if baseline else None)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_helpers")
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--history", type=int, default=5, help="Earlier runs the baseline is the median of.")
+    parser.add_argument("--threshold", type=float, default=0.20, help="Slowdown flagged as a regression (0.20 = 20%%).")
+    parser.add_argument("--results", default=RESULTS_FILE, help="JSON file holding the history of runs.")
+    parser.add_argument("--no-save", action="store_true", help="Do not add this run to the results file.")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.items, args.repeat)
+    history = load_history(args.results)
+    regressions = []
+    print(f"{'benchmark':42s} {'ns/item':>10s} {'baseline':>10s} {'change':>8s}")
+    for name, (baseline, change) in compare(results, history, args.items, args.history).items():
+        flag = ""
+        if change is not None and change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:42s} {results[name]:10.0f} {'-' if baseline is None else f'{baseline:.0f}':>10s} "
+              f"{'' if change is None else f'{change:+.0%}':>8s}{flag}")
+    if not args.no_save:
+        history.append({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": git_commit(), "items": args.items,
+                        "python": platform.python_version(), "results": results})
+        if os.path.dirname(args.results):
+            os.makedirs(os.path.dirname(args.results), exist_ok=True)
+        with open(args.results, "w", encoding="utf-8") as f:
+            json.dump(history, f, indent=2)
+    if regressions and args.fail_on_regression:
+        sys.exit(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Memory benchmark for the compact URL and record structures in scraper.compact.
+
+    python -m benchmarks.bench_memory --urls 1000000
+
+Every variant is built in a fresh subprocess, which reports how much its RSS grew
+(from /proc/self/statm, or the tracemalloc total where /proc is not available).
+URLs and records are generated in the shape of mototoazis/products_output.json and
+mototoazis/product_descriptions.json (with short descriptions,
+so the per-record overhead is visible).
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tracemalloc
+
+CATEGORIES = [
+    "motorkerekpar_alkatreszek_65/motor-visszapillanto-tukor/motor-tukrok-133",
+    "bukosisak_motoros_bukosisakok/zart_bukosisakok_54/arai-bukosisakok-153",
+    "motoros_ruhazat_58/motoros_kabatok_61",
+    "motoros_csizmak_cipok_80/sport_csizmak_81",
+]
+
+
+def generate_urls(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    words = ["vicma", "visszapillanto", "tukor", "arai", "bukosisak", "kabat", "csizma", "gaerne", "alpinestars", "dainese"]
+    for i in range(n):
+        yield f"https://www.motoroazis.hu/{rng.choice(CATEGORIES)}/{'-'.join(rng.sample(words, 3))}-e-{i}"
+
+
+def generate_records(n: int, seed: int = 1):
+    rng = random.Random(seed)
+    for i, url in enumerate(generate_urls(n, seed)):
+        yield url, f"VICMA Visszapillantó tükör E-{i}", "A termék leírása. " * rng.randint(1, 4)
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return tracemalloc.get_traced_memory()[0]
+
+
+def build(variant: str, n: int):
+    from scraper.compact import Record, UrlSet, UrlStore
+
+    # The inputs are generated lazily, so only the structure under test stays in memory.
+    texts = generate_records(n) if variant.startswith("records") else generate_urls(n)
+    before = rss_bytes()
+    if variant == "urls-str-set":
+        data = set(texts)
+    elif variant == "urls-UrlSet":
+        data = UrlSet(texts)
+    elif variant == "urls-str-list":
+        data = list(texts)
+    elif variant == "urls-UrlStore":
+        data = UrlStore(texts)
+    elif variant == "records-dict":
+        data = [{"url": u, "title": t, "desc": d} for u, t, d in texts]
+    elif variant == "records-slots":
+        data = [Record(u, t, d) for u, t, d in texts]
+    else:
+        raise ValueError(variant)
+    print(json.dumps({"variant": variant, "entries": len(data), "bytes": rss_bytes() - before}))
+
+
+VARIANTS = ["urls-str-set", "urls-UrlSet", "urls-str-list", "urls-UrlStore", "records-dict", "records-slots"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_memory")
+    parser.add_argument("--urls", type=int, default=1_000_000)
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.variant:
+        return build(args.variant, args.urls)
+    results = {}
+    for variant in VARIANTS:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_memory", "--urls", str(args.urls), "--variant", variant],
+                             capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout)
+        results[variant] = result["bytes"]
+        print(f"{variant:15s} {result['bytes'] / 2**20:9.1f} MiB  {result['bytes'] / result['entries']:7.1f} B/entry")
+    for plain, compact in (("urls-str-set", "urls-UrlSet"), ("urls-str-list", "urls-UrlStore"), ("records-dict", "records-slots")):
+        if results[plain] > 0:
+            print(f"{compact} uses {100 * (1 - results[compact] / results[plain]):.0f}% less than {plain}")
+
+
+if __name__ == "__main__":
+    main()
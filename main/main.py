@@ -1,28 +1,214 @@
+import argparse
+import itertools
 import json
+import logging as log
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # the analytics fall back to plain Python
+    np = None
+
+# Records are turned into columns this many at a time.
+BATCH_SIZE = 50_000
+PERCENTILES = (5, 25, 50, 75, 95)
+
 
 def count_json_elements(json_filename: str) -> int:
     """
-    Loads a JSON file and returns the count of elements in it.
+    Reads a JSON file element by element and returns the count of elements in it.
     The JSON file is expected to contain a list of elements.
-    
+
     :param json_filename: The filename of the JSON file to load.
     :return: The number of elements in the JSON file.
     :raises ValueError: If the loaded data is not a list.
     """
-    data = load_links_from_json(json_filename)
-    
-    if isinstance(data, list):
-        return len(data)
-    else:
+    from scraper.storage import iter_records
+
+    try:
+        return sum(1 for _ in iter_records(json_filename))
+    except ValueError:
         raise ValueError("The JSON file does not contain a list of elements.")
-    
-def load_links_from_json(filename: str) -> list[str]:
-    with open(filename, "r", encoding="utf-8") as f:
-        data = json.load(f)
-        return data
 
-# Example usage:
+
+def record_batches(filenames: list[str], batch_size: int = BATCH_SIZE):
+    """
+    Yields the records of the given output files as columns, `batch_size` records at a time.
+    Files that do not start with a record (link lists) are skipped, and so are later
+    elements that are not records; those are logged.
+
+    :param filenames: JSON files holding lists of {'url', 'title', 'desc'} records ('text' is read as 'desc').
+    :return: Dictionaries of parallel arrays: url/desc hashes (uint64), title/desc lengths (uint32).
+    """
+    from scraper.compact import url_hash
+    from scraper.storage import iter_records
+
+    for filename in filenames:
+        # Decoded record by record (also .json.gz and rotated segments), so only one batch is in memory.
+        records = iter_records(filename)
+        try:
+            first = next(records, None)
+        except ValueError:
+            continue
+        if not _is_record(first):
+            continue
+        records = itertools.chain([first], _skip_non_records(records, filename))
+        while batch := list(itertools.islice(records, batch_size)):
+            descs = [record.get("desc") or record.get("text") or "" for record in batch]
+            yield {
+                "url_hash": array("Q", (url_hash(record["url"]) for record in batch)),
+                "desc_hash": array("Q", (url_hash(desc) if desc.strip() else 0 for desc in descs)),
+                "title_len": array("I", (len((record.get("title") or "").strip()) for record in batch)),
+                "desc_len": array("I", (len(desc.strip()) for desc in descs)),
+            }
+
+
+def _is_record(element) -> bool:
+    return isinstance(element, dict) and isinstance(element.get("url"), str)
+
+
+def _skip_non_records(elements, filename: str):
+    # Position 0 is the first element, which record_batches has already checked.
+    for position, element in enumerate(elements, 1):
+        if _is_record(element):
+            yield element
+        else:
+            log.warning(f"Skipping element {position} of {filename}: not a record with a url.")
+
+
+def _length_stats(lengths) -> dict:
+    if not len(lengths):
+        return {}
+    if np is not None:
+        values = np.percentile(lengths, PERCENTILES)
+        # Log2 buckets: 0, 1, 2-3, 4-7, ...
+        histogram = np.bincount(np.ceil(np.log2(lengths + 1)).astype(np.int64))
+        return {"mean": float(lengths.mean()), **{f"p{p}": int(v) for p, v in zip(PERCENTILES, values)},
+                "log2_histogram": histogram.tolist()}
+    ordered = sorted(lengths)
+    histogram = [0] * (max(ordered).bit_length() + 1)
+    for value in ordered:
+        histogram[value.bit_length()] += 1
+    return {"mean": sum(ordered) / len(ordered),
+            **{f"p{p}": ordered[min(len(ordered) - 1, len(ordered) * p // 100)] for p in PERCENTILES},
+            "log2_histogram": histogram}
+
+
+def analyze_site(site: str, filenames: list[str], state_dir: str) -> dict:
+    """
+    Computes the quality statistics of one site and compares its URLs with the previous run.
+    The state file is replaced on every run, so the new/removed counts are run over run
+    (since the last report), not against a fixed baseline.
+
+    :param site: Site name, used for the state file of the run-over-run delta.
+    :param filenames: The site's record files.
+    :param state_dir: Directory keeping the sorted URL hashes of the previous run.
+    :return: Dictionary with counts, empty-field and duplicate rates, length distributions and deltas.
+    """
+    columns = {"url_hash": array("Q"), "desc_hash": array("Q"), "title_len": array("I"), "desc_len": array("I")}
+    for batch in record_batches(filenames):
+        for name, values in batch.items():
+            columns[name].extend(values)
+    records = len(columns["url_hash"])
+    if np is not None:
+        columns = {name: np.frombuffer(values, dtype=np.uint64 if values.typecode == "Q" else np.uint32)
+                   for name, values in columns.items()}
+        urls = np.unique(columns["url_hash"])
+        filled = columns["desc_hash"][columns["desc_hash"] != 0]
+        unique_descs = np.unique(filled).size
+        empty_title = int((columns["title_len"] == 0).sum())
+        empty_desc = int((columns["desc_len"] == 0).sum())
+    else:
+        urls = array("Q", sorted(set(columns["url_hash"])))
+        filled = [h for h in columns["desc_hash"] if h]
+        unique_descs = len(set(filled))
+        empty_title = sum(1 for length in columns["title_len"] if not length)
+        empty_desc = sum(1 for length in columns["desc_len"] if not length)
+
+    state_file = os.path.join(state_dir, f"{site}_urls.u64")
+    delta = None
+    if os.path.exists(state_file):
+        previous = array("Q")
+        with open(state_file, "rb") as f:
+            previous.frombytes(f.read())
+        if np is not None:
+            previous = np.frombuffer(previous, dtype=np.uint64)
+            new = np.setdiff1d(urls, previous, assume_unique=True).size
+            removed = np.setdiff1d(previous, urls, assume_unique=True).size
+        else:
+            current, before = set(urls), set(previous)
+            new, removed = len(current - before), len(before - current)
+        delta = {"previous_urls": len(previous), "new_urls": int(new), "removed_urls": int(removed)}
+    os.makedirs(state_dir, exist_ok=True)
+    with open(state_file, "wb") as f:
+        f.write(urls.tobytes())
+
+    return {
+        "files": filenames,
+        "records": records,
+        "unique_urls": len(urls),
+        "duplicate_url_rate": 1 - len(urls) / records if records else 0.0,
+        "duplicate_desc_rate": 1 - unique_descs / len(filled) if len(filled) else 0.0,
+        "empty_title_rate": empty_title / records if records else 0.0,
+        "empty_desc_rate": empty_desc / records if records else 0.0,
+        "title_length": _length_stats(columns["title_len"]),
+        "desc_length": _length_stats(columns["desc_len"]),
+        "delta": delta,
+    }
+
+
+def corpus_report(root: str = ".", output_dir: str = "analytics") -> dict:
+    """
+    Analyses every site's record files, one process per site, and saves output_dir/report.json.
+
+    :param root: Repository root holding the site directories.
+    :param output_dir: Where the report and the URL state of this run are kept.
+    :return: The report, keyed by site name.
+    """
+    from scraper.search import find_output_files, site_for
+
+    sites = {}
+    for filename in find_output_files(root):
+        sites.setdefault(site_for(filename), []).append(filename)
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, min(len(sites), os.cpu_count() or 1))) as pool:
+        futures = {site: pool.submit(analyze_site, site, filenames, output_dir) for site, filenames in sites.items()}
+        report = {site: future.result() for site, future in futures.items()}
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump({"seconds": time.perf_counter() - started, "numpy": np is not None, "sites": report},
+                  f, ensure_ascii=False, indent=2)
+    return report
+
+
+def print_report(report: dict):
+    print(f"{'site':18s} {'records':>8s} {'dup url':>8s} {'dup desc':>8s} {'no title':>8s} {'no desc':>8s} {'desc p50':>8s} {'new':>6s} {'gone':>6s}")
+    for site, stats in sorted(report.items()):
+        delta = stats["delta"] or {}
+        print(f"{site:18s} {stats['records']:8d} {stats['duplicate_url_rate']:8.1%} {stats['duplicate_desc_rate']:8.1%} "
+              f"{stats['empty_title_rate']:8.1%} {stats['empty_desc_rate']:8.1%} {stats['desc_length'].get('p50', 0):8d} "
+              f"{delta.get('new_urls', '-'):>6} {delta.get('removed_urls', '-'):>6}")
+
+
+# Example usage (from the repository root):
+#   python -m main.main count totalbike/totalbike_final_output.json
+#   python -m main.main analytics
 if __name__ == "__main__":
-    filename = "totalbike\\totalbike_final_output.json" 
-    count = count_json_elements(filename)
-    print(f"Number of elements in {filename}: {count}")
+    parser = argparse.ArgumentParser(prog="python -m main.main")
+    commands = parser.add_subparsers(dest="command", required=True)
+    count = commands.add_parser("count", help="Count the elements of one JSON file.")
+    count.add_argument("filename", nargs="?", default=os.path.join("totalbike", "totalbike_final_output.json"))
+    analytics = commands.add_parser("analytics", help="Quality report over every site's scraped records.")
+    analytics.add_argument("--root", default=".")
+    analytics.add_argument("--output", default="analytics", help="Directory for report.json and the URL state.")
+    args = parser.parse_args()
+    if args.command == "count":
+        count = count_json_elements(args.filename)
+        print(f"Number of elements in {args.filename}: {count}")
+    else:
+        started = time.perf_counter()
+        print_report(corpus_report(args.root, args.output))
+        print(f"Report saved to {os.path.join(args.output, 'report.json')} in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,9 @@
+"""
+Shared scraping pipeline for all sites in this repository.
+
+Site differences live in scraper.sites; the Playwright based stages live in
+scraper.pipeline and are imported lazily so that the registry can be used
+without a browser installed.
+"""
+from scraper.sites import SiteConfig, SITES, get_site
+from scraper.storage import save_links_to_json, load_links_from_json
@@ -0,0 +1,195 @@
+"""
+Command line entry point for the shared pipeline.
+
+Run from the repository root, e.g.:
+    python -m scraper motoroazis menu
+    python -m scraper motoroazis pages
+    python -m scraper motoroazis links
+    python -m scraper motozem api-links      # like 'links', through the shop's JSON endpoints
+    python -m scraper motoroazis products
+    python -m scraper totalbike update --input totalbike/totalbike_final_output.json
+    python -m scraper motoroazis revisit --budget 1000   # refetch what most likely changed
+    python -m scraper motoroazis stream     # all stages at once, connected by queues
+Every stage reads the previous stage's JSON file unless --input is given.
+"""
+import argparse
+import logging as log
+from contextlib import ExitStack
+from dataclasses import replace
+
+from scraper.sites import SITES, get_site
+
+STAGES = ("menu", "pages", "links", "products", "resume", "stream", "api-links", "update", "revisit")
+
+# Default file names per stage, placed in the site's output directory.
+STAGE_FILES = {
+    "menu": "menu_links.json",
+    "pages": "page_links.json",
+    "links": "products_links.json",
+    "products": "final_output.json",
+    "resume": "final_output.json",
+    "stream": "final_output.json",
+    "api-links": "products_links.json",
+    "update": "final_output.json",
+    "revisit": "final_output.json",
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m scraper", description="Scrape one of the configured sites.")
+    parser.add_argument("site", choices=sorted(SITES))
+    parser.add_argument("stage", choices=STAGES)
+    parser.add_argument("--input", help="JSON file read by the stage.")
+    parser.add_argument("--output", help="JSON file written by the stage.")
+    parser.add_argument("--checkpoint", help="Checkpoint file for the 'resume' stage.")
+    parser.add_argument("--commit-every", type=int, default=10, help="Resume stage: records per group commit of the checkpoint.")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--autotune", action="store_true", help="Stream stage: adapt the number of detail pages in flight.")
+    parser.add_argument("--memory-limit-mb", type=int, help="Stream stage: browser memory budget that caps --autotune.")
+    parser.add_argument("--incremental", action="store_true", help="Links stage: use the link cache and skip unchanged listings.")
+    parser.add_argument("--max-pages", type=int, help="Listing pages visited per changed category ('links --incremental', 'update').")
+    parser.add_argument("--budget", type=int, default=1000, help="Revisit stage: pages fetched in this window.")
+    parser.add_argument("--window-hours", type=float, default=24.0, help="Revisit stage: time until the next revisit run.")
+    parser.add_argument("--prefetch", type=int, default=0, metavar="K",
+                        help="Products/resume stages: load the next K detail pages in spare tabs during extraction.")
+    parser.add_argument("--compress", action="store_true", help="Products/stream stages: gzip the output (.json.gz).")
+    parser.add_argument("--rotate-records", type=int, metavar="N", help="Products/stream stages: split the output into files of N records.")
+    parser.add_argument("--search-index", metavar="DB", help="Stream stage: add the records to a scraper.search index as they arrive.")
+    parser.add_argument("--profile", metavar="DIR", help="Write stage timings, cProfile data and a flame graph to DIR.")
+    parser.add_argument("--browser", metavar="ENDPOINT", help="Connect to a running browser server (see scraper.browser_server).")
+    parser.add_argument("--archive", metavar="DIR", help="Store the raw HTML of every loaded page in .warc.gz segments in DIR.")
+    parser.add_argument("--snapshots", metavar="DIR", help="Save sampled and failed pages as screenshots and DOM dumps in DIR.")
+    parser.add_argument("--snapshot-rate", type=float, default=0.01, help="Share of successful pages snapshotted with --snapshots.")
+    parser.add_argument("--snapshot-quota-mb", type=int, default=500, help="Disk space --snapshots may use.")
+    parser.add_argument("--selector-health", choices=("abort", "pause"),
+                        help="Stop or pause the run when a selector starts returning nothing (see scraper.selector_health).")
+    parser.add_argument("--session", action="store_true",
+                        help="Start from the site's saved cookies/consent state (see scraper.session).")
+    parser.add_argument("--asset-cache", action="store_true",
+                        help="With --session: serve large scripts, stylesheets and fonts from a disk cache shared by all "
+                             "contexts. Off by default, measure it first with benchmarks/bench_asset_cache.py.")
+    parser.add_argument("--structured-data", action="store_true",
+                        help="Read title and description from the pages' JSON-LD/microdata, querying the selectors "
+                             "only for missing fields (see scraper.structured).")
+    parser.add_argument("--record", metavar="HAR", help="Record every response of the run into a HAR archive.")
+    parser.add_argument("--replay", metavar="HAR", help="Serve responses from a recorded HAR archive instead of the network.")
+    return parser
+
+
+def previous_file(stage: str) -> str:
+    index = STAGES.index(stage)
+    if stage in ("resume", "stream", "revisit"):
+        return STAGE_FILES["links"]
+    if stage == "update":
+        return STAGE_FILES["update"]
+    if stage == "api-links":
+        return STAGE_FILES["pages"]
+    return STAGE_FILES[STAGES[index - 1]]
+
+
+def run(args: argparse.Namespace):
+    with ExitStack() as stack:
+        if args.archive:
+            from scraper import archive
+            archive.enable(args.archive)
+            stack.callback(archive.disable)
+        if args.snapshots:
+            from scraper import snapshots
+            snapshots.enable(args.snapshots, sample_rate=args.snapshot_rate,
+                             quota_bytes=args.snapshot_quota_mb * 1024 * 1024)
+            stack.callback(snapshots.disable)
+        if args.selector_health:
+            from scraper import selector_health
+            selector_health.enable(get_site(args.site), action=args.selector_health)
+            stack.callback(selector_health.disable)
+        return _run(args)
+
+
+def _run(args: argparse.Namespace):
+    # Playwright is only needed once a stage actually runs.
+    from playwright.sync_api import sync_playwright
+    from scraper import pipeline
+    from scraper.replay import open_context
+    from scraper.browser_server import launch_browser, warm_context, endpoint_from_env, close_browser
+    from scraper.storage import save_links_to_json, load_links_from_json
+
+    site = get_site(args.site)
+    if args.structured_data:
+        site = replace(site, structured_data=True)
+    if args.replay:
+        # Recorded responses need no settling time, replay runs at full CPU speed.
+        site = replace(site, settle_delay=0.0)
+    if args.stage == "stream":
+        from scraper.streaming import StreamConfig, run_streaming
+        output = args.output or pipeline.site_path(site, STAGE_FILES["stream"])
+        start_urls = load_links_from_json(args.input) if args.input else None
+        run_streaming(site, output, start_urls, StreamConfig(
+            headless=args.headless, browser_endpoint=args.browser, record_har=args.record, replay_har=args.replay,
+            autotune=args.autotune, memory_limit_mb=args.memory_limit_mb, search_index=args.search_index,
+            session=args.session, asset_cache=args.asset_cache, compress=args.compress,
+            rotate_records=args.rotate_records))
+        return
+
+    output = args.output or pipeline.site_path(site, STAGE_FILES[args.stage])
+    source = args.input or (pipeline.site_path(site, previous_file(args.stage)) if args.stage != "menu" else None)
+
+    with sync_playwright() as p:
+        browser = launch_browser(p, args.headless, args.browser)
+        # On a browser server the context is created here, from the server's warmed state.
+        shared = endpoint_from_env(args.browser) and not (args.record or args.replay or args.session)
+        if args.session and not (args.record or args.replay):
+            from scraper import session
+            context = session.open_context(browser, site, asset_cache=args.asset_cache)
+        else:
+            context = warm_context(browser, args.browser) if shared else open_context(browser, args.record, args.replay)
+        page = pipeline.new_page(context)
+        if args.stage == "menu":
+            pipeline.goto(page, site, site.base_url)
+            save_links_to_json(pipeline.scrape_menu(page, site), output)
+        elif args.stage == "pages":
+            links = pipeline.discover_listing_pages(page, site, load_links_from_json(source))
+            save_links_to_json(links, output)
+        elif args.stage == "links" and args.incremental:
+            from scraper.link_cache import scrape_product_from_pages_cached
+            scrape_product_from_pages_cached(page, site, source, output, args.max_pages)
+        elif args.stage == "links":
+            pipeline.scrape_product_from_pages(page, site, source, output)
+        elif args.stage == "api-links":
+            from scraper.api_sniff import scrape_links_via_api
+            scrape_links_via_api(page, site, source, output)
+        elif args.stage == "update":
+            # The stored corpus is both read and extended.
+            from scraper.incremental import update_corpus
+            update_corpus(page, site, source, args.output or source, args.max_pages or 50)
+        elif args.stage == "revisit":
+            # Reads the product links; the corpus (--output) is both read and updated.
+            from scraper.revisit import revisit_corpus
+            revisit_corpus(page, site, source, output, args.budget, args.window_hours)
+        elif args.stage == "products":
+            pipeline.scrape_text_from_product(page, site, source, output, args.prefetch, args.compress, args.rotate_records)
+        else:
+            checkpoint = args.checkpoint or pipeline.site_path(site, "checkpoint.txt")
+            pipeline.process_long_json_with_page(page, site, source, output, checkpoint, args.prefetch, args.commit_every)
+        # Closing the context writes the HAR archive when recording.
+        context.close()
+        # Only disconnects from a browser server, which keeps running for the next runs.
+        close_browser(browser, args.browser)
+    log.info(f"Stage '{args.stage}' for {site.name} finished, output: {output}")
+
+
+def main(argv=None):
+    log.basicConfig(level=log.INFO)
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        from scraper import profiling
+        profiling.enable(args.profile)
+        try:
+            run(args)
+        finally:
+            profiling.write_report()
+        return
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
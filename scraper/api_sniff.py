@@ -0,0 +1,224 @@
+"""
+Listing-page API sniffing.
+
+Some shops (motozem renders its pagination with a JSPaginationContent component) load
+the listing data through XHR/fetch calls. Rendering the whole page just to read the
+product hrefs is wasteful, so this module:
+   1. loads one listing page in the browser and records every JSON response,
+   2. finds the response that contains the product links also present in the DOM,
+      remembering where the list lives in the JSON and which field holds the URL,
+   3. finds the query parameter that carries the page number,
+   4. pages through that endpoint directly with the pooled HttpClient.
+A listing page then costs one small JSON request instead of a browser render.
+Categories without a usable endpoint fall back to the browser.
+"""
+import logging as log
+import os
+from dataclasses import dataclass, asdict
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+
+from playwright.sync_api import Page
+
+from scraper.pipeline import goto, scrape_listing_links, absolute_link, group_by_category
+from scraper.profiling import timed
+from scraper.sites import SiteConfig
+from scraper.storage import save_links_to_json, load_links_from_json
+from scraper.transport import HttpClient
+
+# Query parameter names that usually carry the page number.
+PAGE_PARAM_NAMES = ("page", "iPage", "p", "pageNumber", "pg")
+
+
+@dataclass
+class ApiEndpoint:
+    url: str
+    method: str
+    # Keys/indexes leading from the JSON root to the list of products.
+    items_path: list
+    # Field of each product that holds its link.
+    url_field: str
+    page_param: str = None
+    post_data: str = None
+    matches: int = 0
+
+
+def find_product_lists(data, path: list = None):
+    """
+    Yields (path, list) for every list of dictionaries inside the JSON document.
+    """
+    path = path or []
+    if isinstance(data, list):
+        if data and all(isinstance(item, dict) for item in data):
+            yield path, data
+        for index, item in enumerate(data[:50]):
+            yield from find_product_lists(item, path + [index])
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            yield from find_product_lists(value, path + [key])
+
+
+def resolve_path(data, path: list):
+    for key in path:
+        data = data[key]
+    return data
+
+
+def match_endpoint(url: str, method: str, post_data: str, data, site: SiteConfig, dom_links: set):
+    """
+    Returns the ApiEndpoint describing the best product list in `data`,
+    or None if no list refers to the links seen in the DOM.
+    """
+    best = None
+    for path, items in find_product_lists(data):
+        counts = {}
+        for item in items:
+            for key, value in item.items():
+                if isinstance(value, str) and value and absolute_link(value, site.link_prefix or _origin(url)) in dom_links:
+                    counts[key] = counts.get(key, 0) + 1
+        for key, count in counts.items():
+            if best is None or count > best.matches:
+                best = ApiEndpoint(url, method, path, key, post_data=post_data, matches=count)
+    return best
+
+
+def _origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def detect_page_param(url: str, site: SiteConfig, listing_url: str) -> str:
+    """
+    Picks the query parameter of the API URL that carries the page number:
+    the one equal to the listing page's number, or one with a typical name.
+    """
+    query = parse_qs(urlparse(url).query)
+    listing_page = parse_qs(urlparse(listing_url).query).get(site.page_param, [str(site.first_page)])[0]
+    for key, values in query.items():
+        if values and values[0] == listing_page and values[0].isdigit():
+            return key
+    for key in PAGE_PARAM_NAMES:
+        if key in query:
+            return key
+    return None
+
+
+@timed("api sniffing")
+def sniff_listing(page: Page, site: SiteConfig, listing_url: str) -> ApiEndpoint:
+    """
+    Loads `listing_url` in the browser, records the JSON responses and returns the
+    endpoint that serves the product links, or None when the listing is rendered server side.
+    """
+    responses = []
+
+    def on_response(response):
+        if response.request.resource_type in ("xhr", "fetch") or "json" in response.headers.get("content-type", ""):
+            responses.append(response)
+
+    page.on("response", on_response)
+    try:
+        goto(page, site, listing_url)
+        dom_links = set(scrape_listing_links(page, site))
+    finally:
+        page.remove_listener("response", on_response)
+    best = None
+    for response in responses:
+        try:
+            data = response.json()
+        except Exception:
+            continue
+        request = response.request
+        candidate = match_endpoint(response.url, request.method, request.post_data, data, site, dom_links)
+        if candidate and (best is None or candidate.matches > best.matches):
+            best = candidate
+    if best is None or best.matches < min(3, len(dom_links)):
+        log.info(f"No product API found for {listing_url}.")
+        return None
+    best.page_param = detect_page_param(best.url, site, listing_url)
+    log.info(f"Found product API {best.method} {best.url} ({best.matches} matching links, page parameter: {best.page_param}).")
+    return best
+
+
+def _with_page(url: str, param: str, number: int) -> str:
+    parsed = urlparse(url)
+    query = parse_qs(parsed.query)
+    query[param] = [str(number)]
+    return urlunparse(parsed._replace(query=urlencode(query, doseq=True)))
+
+
+@timed("api paging")
+def page_through(client: HttpClient, endpoint: ApiEndpoint, site: SiteConfig, first_page: int, max_pages: int = 1000) -> list[str]:
+    """
+    Requests consecutive pages of the endpoint until a page returns no new links.
+    """
+    links = {}
+    prefix = site.link_prefix or _origin(endpoint.url)
+    for number in range(first_page, first_page + max_pages):
+        url = _with_page(endpoint.url, endpoint.page_param, number)
+        body = endpoint.post_data.encode("utf-8") if endpoint.post_data else None
+        # Listing endpoints only read, even when they are POSTed to, so a dropped connection may be retried.
+        response = client.request(endpoint.method, url, body=body, headers={"Accept": "application/json"}, idempotent=True)
+        if response.status != 200:
+            log.info(f"API page {url} returned {response.status}, stopping.")
+            break
+        try:
+            items = resolve_path(response.json(), endpoint.items_path)
+        except (ValueError, KeyError, IndexError, TypeError):
+            break
+        new = [absolute_link(item[endpoint.url_field], prefix) for item in items
+               if isinstance(item, dict) and item.get(endpoint.url_field)]
+        new = [link for link in new if link not in links]
+        if not new:
+            break
+        for link in new:
+            links[link] = None
+    return list(links)
+
+
+def endpoints_file(site: SiteConfig) -> str:
+    return os.path.join(site.output_dir or site.name, f"{site.name}_api_endpoints.json")
+
+
+def load_endpoints(site: SiteConfig) -> dict:
+    path = endpoints_file(site)
+    if not os.path.exists(path):
+        return {}
+    return {base: ApiEndpoint(**data) if data else None for base, data in load_links_from_json(path).items()}
+
+
+def save_endpoints(site: SiteConfig, endpoints: dict):
+    save_links_to_json({base: asdict(e) if e else None for base, e in endpoints.items()}, endpoints_file(site))
+
+
+def scrape_links_via_api(page: Page, site: SiteConfig, json_filename: str, output_jsonfile: str) -> list[str]:
+    """
+    Same contract as scraper.pipeline.scrape_product_from_pages, but each category
+    (listing URLs grouped by their base URL) is sniffed once and then paged through
+    its JSON endpoint. Detected endpoints are cached in <site>_api_endpoints.json;
+    categories without an endpoint are scraped with the browser page by page.
+    """
+    categories = group_by_category(site, load_links_from_json(json_filename))
+    endpoints = load_endpoints(site)
+    all_links = {}
+    with HttpClient() as client:
+        for base, listing_urls in categories.items():
+            if base not in endpoints:
+                endpoints[base] = sniff_listing(page, site, listing_urls[0])
+                save_endpoints(site, endpoints)
+            endpoint = endpoints[base]
+            links = []
+            if endpoint and endpoint.page_param:
+                try:
+                    links = page_through(client, endpoint, site, site.first_page)
+                except Exception as e:
+                    log.error(f"API paging failed for {base}: {e}")
+            if not links:
+                for url in listing_urls:
+                    goto(page, site, url)
+                    links.extend(scrape_listing_links(page, site))
+            log.info(f"{base}: {len(links)} product links.")
+            for link in links:
+                all_links[link] = None
+    final_list = list(all_links)
+    log.info(f"Total unique product links: {len(final_list)}")
+    save_links_to_json(final_list, output_jsonfile)
+    return final_list
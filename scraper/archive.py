@@ -0,0 +1,259 @@
+"""
+Raw HTML archive in WARC format, written with as few copies as possible.
+
+Response bodies stay `bytes` from Playwright to disk: write() only queues them, and a
+writer thread feeds them to a streaming gzip compressor in memoryview slices (no
+decode/encode round trip, no concatenation), keeps the compressed chunks as-is and
+flushes them with a single os.writev call once `flush_bytes` have accumulated, so the
+page loop never waits for compression or the disk. The body Playwright hands over is
+already decoded, so the transfer headers (Content-Encoding, Content-Length,
+Transfer-Encoding) are dropped and the real Content-Length is written instead. Every record is its own gzip member inside large
+segment files (archive-00000.warc.gz, ...), so the segments are valid .warc.gz files
+and single records can be read back by offset through index.tsv. Index lines are only
+written after the records they point to, so the index never refers to missing data;
+with `durable` the segment is also fsynced before its index lines are appended.
+
+Enable it for a run with --archive DIR (or enable(DIR)); pipeline.goto then archives
+every document it loads.
+"""
+import asyncio
+import logging as log
+import mmap
+import os
+import queue
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+
+CHUNK = 64 * 1024
+# Most systems refuse more buffers per writev call than this.
+IOV_MAX = 1024
+# Describe the bytes on the wire, not the decoded body that is archived.
+TRANSFER_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+# Marks the end of the queue.
+_CLOSE = object()
+
+writer = None
+
+
+def _writev_all(fd: int, buffers: list):
+    """
+    Writes all buffers, handling short writes and the IOV_MAX limit.
+    """
+    views = [memoryview(b) for b in buffers]
+    while views:
+        batch = views[:IOV_MAX]
+        if hasattr(os, "writev"):
+            written = os.writev(fd, batch)
+        else:
+            written = os.write(fd, batch[0])
+        while written:
+            head = views[0]
+            if written >= len(head):
+                written -= len(head)
+                views.pop(0)
+            else:
+                views[0] = head[written:]
+                written = 0
+
+
+class WarcWriter:
+    def __init__(self, directory: str, segment_bytes: int = 256 * 1024 * 1024, level: int = 1,
+                 flush_bytes: int = 1024 * 1024, queue_size: int = 256, durable: bool = False):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.level = level
+        self.flush_bytes = flush_bytes
+        self.durable = durable
+        self.pending = []
+        self.pending_bytes = 0
+        # Index lines of the pending records, written once the records are.
+        self.pending_index = []
+        self.lock = threading.Lock()
+        self.segment = len([name for name in os.listdir(directory) if name.endswith(".warc.gz")])
+        self.fd = None
+        self.offset = 0
+        self.index = open(os.path.join(directory, "index.tsv"), "a", encoding="utf-8")
+        self.records = 0
+        self._open_segment()
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, name=f"warc-{os.path.basename(directory)}", daemon=True)
+        self.thread.start()
+
+    def _segment_name(self) -> str:
+        return f"archive-{self.segment:05d}.warc.gz"
+
+    def _open_segment(self):
+        path = os.path.join(self.directory, self._segment_name())
+        self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self.offset = os.fstat(self.fd).st_size
+
+    def _compress(self, parts: tuple) -> list:
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        chunks = []
+        for part in parts:
+            view = memoryview(part)
+            for start in range(0, len(view), CHUNK):
+                chunk = compressor.compress(view[start:start + CHUNK])
+                if chunk:
+                    chunks.append(chunk)
+        chunks.append(compressor.flush())
+        return chunks
+
+    def write(self, url: str, status: int, headers: dict, body: bytes):
+        """
+        Queues one WARC response record for `url`; `body` is archived without being decoded.
+        Waits only while the queue is full.
+        """
+        self.queue.put((url, status, headers, body))
+
+    async def write_async(self, url: str, status: int, headers: dict, body: bytes):
+        """
+        Async counterpart of write: a full queue makes the calling task wait, not the event loop.
+        """
+        try:
+            self.queue.put_nowait((url, status, headers, body))
+        except queue.Full:
+            await asyncio.get_running_loop().run_in_executor(None, self.write, url, status, headers, body)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _CLOSE:
+                    return
+                self._write(*item)
+            except Exception as e:
+                log.error(f"Could not archive {item[0]}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _write(self, url: str, status: int, headers: dict, body: bytes):
+        headers = {name: value for name, value in headers.items() if name.lower() not in TRANSFER_HEADERS}
+        headers["Content-Length"] = str(len(body))
+        http_head = "".join(
+            [f"HTTP/1.1 {status}\r\n"] + [f"{name}: {value}\r\n" for name, value in headers.items()] + ["\r\n"]
+        ).encode("utf-8", errors="replace")
+        warc_head = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Date: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            "Content-Type: application/http;msgtype=response\r\n"
+            f"Content-Length: {len(http_head) + len(body)}\r\n\r\n"
+        ).encode("utf-8")
+        chunks = self._compress((warc_head, http_head, body, b"\r\n\r\n"))
+        length = sum(len(chunk) for chunk in chunks)
+        with self.lock:
+            if self.offset and self.offset + length > self.segment_bytes:
+                self._flush()
+                os.close(self.fd)
+                self.segment += 1
+                self._open_segment()
+            self.pending_index.append(f"{url}\t{self._segment_name()}\t{self.offset}\t{length}\n")
+            self.pending.extend(chunks)
+            self.pending_bytes += length
+            self.offset += length
+            self.records += 1
+            if self.pending_bytes >= self.flush_bytes:
+                self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        _writev_all(self.fd, self.pending)
+        if self.durable:
+            os.fsync(self.fd)
+        self.pending = []
+        self.pending_bytes = 0
+        self.index.writelines(self.pending_index)
+        self.index.flush()
+        if self.durable:
+            os.fsync(self.index.fileno())
+        self.pending_index = []
+
+    def flush(self):
+        """
+        Waits for the queued records and writes them to disk.
+        """
+        self.queue.join()
+        with self.lock:
+            self._flush()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(_CLOSE)
+            self.thread.join()
+        with self.lock:
+            self._flush()
+            os.close(self.fd)
+            self.index.close()
+        log.info(f"Archived {self.records} responses into {self.directory}")
+
+
+def read_record(directory: str, segment: str, offset: int, length: int) -> bytes:
+    """
+    Returns the uncompressed WARC record stored at `offset`, decompressing straight from a memory map.
+    """
+    with open(os.path.join(directory, segment), "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                decompressor = zlib.decompressobj(31)
+                record = decompressor.decompress(view[offset:offset + length])
+                return record + decompressor.flush()
+
+
+def lookup(directory: str, url: str) -> bytes:
+    """
+    Returns the HTTP body archived last for `url`, or None.
+    """
+    found = None
+    with open(os.path.join(directory, "index.tsv"), encoding="utf-8") as index:
+        for line in index:
+            fields = line.rstrip("\n").split("\t")
+            if fields[0] == url:
+                found = fields
+    if not found:
+        return None
+    record = read_record(directory, found[1], int(found[2]), int(found[3]))
+    # Skip the WARC header block and the HTTP header block.
+    http_block = record[record.index(b"\r\n\r\n") + 4:]
+    return http_block[http_block.index(b"\r\n\r\n") + 4:-4]
+
+
+def enable(directory: str, **options) -> WarcWriter:
+    global writer
+    writer = WarcWriter(directory, **options)
+    log.info(f"Archiving raw responses to {directory}")
+    return writer
+
+
+def disable():
+    global writer
+    if writer:
+        writer.close()
+        writer = None
+
+
+def archive_response(response):
+    """
+    Archives a Playwright (sync) response if archiving is enabled.
+    """
+    if writer is None or response is None:
+        return
+    try:
+        writer.write(response.url, response.status, response.headers, response.body())
+    except Exception as e:
+        log.error(f"Could not archive {response.url}: {e}")
+
+
+async def archive_response_async(response):
+    if writer is None or response is None:
+        return
+    try:
+        await writer.write_async(response.url, response.status, response.headers, await response.body())
+    except Exception as e:
+        log.error(f"Could not archive {response.url}: {e}")
@@ -0,0 +1,192 @@
+"""
+Adaptive concurrency for the streaming pipeline.
+
+GradientTuner is a gradient-style controller (in the spirit of TCP Vegas): it compares
+the p95 latency of the latest window of page loads with the long-term latency baseline.
+While latency stays near the baseline the number of in-flight pages grows; when the
+server starts queueing (latency rises) or errors appear, it shrinks. The upper bound
+comes from the memory budget of the browser pool: it starts from a guess of
+`page_memory_mb` per page and, with a `memory_probe`, is recomputed on every window
+from the measured browser memory (browser_rss_mb: the summed RSS of the Chromium
+processes, fixed costs included, divided by the pages in flight). Every decision is
+logged, so the chosen concurrency can be followed while it converges.
+"""
+import asyncio
+import logging as log
+import math
+import os
+import time
+
+
+def process_rss_mb(pid) -> float:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+
+def browser_rss_mb() -> float:
+    """
+    Summed RSS of the Chromium processes started by this process (Linux /proc only).
+    """
+    if not os.path.isdir("/proc"):
+        return 0.0
+    parents, names = {}, {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # The process name is in parentheses and may contain spaces.
+        names[int(entry)] = stat[stat.index("(") + 1:stat.rindex(")")]
+        parents[int(entry)] = int(stat[stat.rindex(")") + 2:].split()[1])
+    own = os.getpid()
+
+    def descends(pid: int) -> bool:
+        while pid > 1:
+            pid = parents.get(pid, 0)
+            if pid == own:
+                return True
+        return False
+
+    return sum(process_rss_mb(pid) for pid, name in names.items()
+               if ("chrom" in name or "headless" in name) and descends(pid))
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+class GradientTuner:
+    def __init__(self, initial: int = 2, min_limit: int = 1, max_limit: int = 16, window: int = 20,
+                 smoothing: float = 0.3, tolerance: float = 1.2, max_error_rate: float = 0.1,
+                 memory_limit_mb: int = None, page_memory_mb: int = 150, memory_probe=None, name: str = ""):
+        self.name = name
+        self.min_limit = min_limit
+        self.ceiling = max_limit
+        self.memory_limit_mb = memory_limit_mb
+        self.memory_probe = memory_probe
+        if memory_limit_mb:
+            max_limit = max(min_limit, min(max_limit, memory_limit_mb // page_memory_mb))
+        self.max_limit = max_limit
+        self.window = window
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.max_error_rate = max_error_rate
+        self.estimate = float(max(min_limit, min(initial, max_limit)))
+        self.baseline = None
+        self.latencies = []
+        self.errors = 0
+        self.window_started = time.monotonic()
+        self.last_throughput = None
+        self.last_limit = self.limit
+        self.history = []
+
+    @property
+    def limit(self) -> int:
+        return int(self.estimate)
+
+    def record(self, latency: float, ok: bool = True):
+        """
+        Adds one finished page load; the limit is recomputed after every `window` samples.
+        """
+        if ok:
+            self.latencies.append(latency)
+        else:
+            self.errors += 1
+        if len(self.latencies) + self.errors >= self.window:
+            self._adjust()
+
+    def _memory_cap(self) -> int:
+        """
+        Pages that fit into the memory budget at the measured memory per page, or None without a measurement.
+        """
+        used = self.memory_probe() if self.memory_probe and self.memory_limit_mb else 0
+        if not used:
+            return None
+        per_page = used / max(1, self.limit)
+        return max(self.min_limit, min(self.ceiling, int(self.memory_limit_mb / per_page)))
+
+    def _adjust(self):
+        now = time.monotonic()
+        cap = self._memory_cap()
+        if cap is not None and cap != self.max_limit:
+            log.info(f"[autotune {self.name}] memory cap {self.max_limit} -> {cap} pages "
+                     f"(measured browser memory, budget {self.memory_limit_mb} MB)")
+            self.max_limit = cap
+        samples = len(self.latencies) + self.errors
+        throughput = samples / max(now - self.window_started, 1e-6)
+        error_rate = self.errors / samples
+        previous = self.limit
+        if error_rate > self.max_error_rate or not self.latencies:
+            self.estimate = self.estimate / 2
+            reason = f"error rate {error_rate:.0%}"
+            p95 = gradient = float("nan")
+        else:
+            p95 = percentile(self.latencies, 0.95)
+            # The baseline follows improvements immediately and degradations slowly.
+            self.baseline = p95 if self.baseline is None else min(p95, 0.99 * self.baseline + 0.01 * p95)
+            gradient = max(0.5, min(1.0, self.tolerance * self.baseline / p95))
+            # Probe upwards quickly while there is no queueing, gently once latency rises.
+            headroom = math.sqrt(self.estimate) if gradient >= 1.0 else 1.0
+            target = self.estimate * gradient + headroom
+            if self.last_throughput and throughput < 0.9 * self.last_throughput and previous > self.last_limit:
+                # More pages in flight made things slower: step back.
+                target = self.last_limit
+                reason = "throughput dropped after increase"
+            else:
+                reason = "latency gradient"
+            self.estimate = (1 - self.smoothing) * self.estimate + self.smoothing * target
+        self.estimate = float(max(self.min_limit, min(self.max_limit, self.estimate)))
+        self.history.append((now, self.limit, throughput, p95))
+        log.info(f"[autotune {self.name}] limit {previous} -> {self.limit} ({reason}); "
+                 f"throughput {throughput:.2f} pages/s, p95 {p95:.2f}s, gradient {gradient:.2f}, errors {error_rate:.0%}")
+        self.last_throughput = throughput
+        self.last_limit = previous
+        self.latencies = []
+        self.errors = 0
+        self.window_started = now
+
+
+class AdaptiveLimiter:
+    """
+    Async semaphore whose size follows GradientTuner.limit.
+    """
+
+    def __init__(self, tuner: GradientTuner):
+        self.tuner = tuner
+        self.in_flight = 0
+        self.condition = asyncio.Condition()
+
+    @property
+    def workers(self) -> int:
+        """
+        Workers to start: as many as the limit can ever reach (the tuner's ceiling, not the
+        memory cap of the moment). The limiter keeps the ones above the current limit waiting.
+        """
+        return self.tuner.ceiling
+
+    @property
+    def saturated(self) -> bool:
+        """
+        True when acquire() would have to wait for a slot.
+        """
+        return self.in_flight >= self.tuner.limit
+
+    async def acquire(self) -> float:
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < self.tuner.limit)
+            self.in_flight += 1
+        return time.monotonic()
+
+    async def release(self, started: float, ok: bool = True):
+        self.tuner.record(time.monotonic() - started, ok)
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
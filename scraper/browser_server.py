@@ -0,0 +1,177 @@
+"""
+Long-lived local browser that short-lived workers connect to instead of launching Chromium.
+
+    python -m scraper.browser_server --port 9222 --warm motozem
+    python -m scraper motozem products --browser http://127.0.0.1:9222
+
+The server launches Chromium once with a CDP endpoint and optionally warms it by
+bootstrapping the sessions of the configured sites and visiting them (DNS, sockets
+and TLS sessions are then hot in the browser's network service). The merged cookies
+and local storage are saved to a state file named after the port. Clients attach with
+connect_over_cdp, which takes tens of milliseconds instead of the seconds of a cold
+launch, and create their own context from that state with warm_context: contexts
+created by another CDP client are not exposed to them.
+
+A connected client never closes the server: close_browser only drops the connection,
+and the client closes just the contexts it created.
+The SCRAPER_BROWSER environment variable can be used instead of --browser.
+"""
+import argparse
+import json
+import logging as log
+import os
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+ENDPOINT_ENV = "SCRAPER_BROWSER"
+
+
+def endpoint_from_env(endpoint: str = None) -> str:
+    return endpoint or os.environ.get(ENDPOINT_ENV)
+
+
+def state_file(port: int) -> str:
+    """
+    Storage state (cookies, local storage) of the warmed sites of the server on `port`.
+    """
+    return os.path.join(tempfile.gettempdir(), f"scraper_browser_{port}.json")
+
+
+def launch_browser(playwright, headless: bool = True, endpoint: str = None):
+    """
+    Connects to a running browser server when an endpoint is configured,
+    otherwise launches a fresh Chromium. ws:// endpoints use the Playwright
+    protocol (playwright run-server), http:// endpoints use CDP.
+    """
+    endpoint = endpoint_from_env(endpoint)
+    if not endpoint:
+        return playwright.chromium.launch(headless=headless)
+    started = time.perf_counter()
+    if endpoint.startswith("ws"):
+        browser = playwright.chromium.connect(endpoint)
+    else:
+        browser = playwright.chromium.connect_over_cdp(endpoint)
+    log.info(f"Connected to browser at {endpoint} in {(time.perf_counter() - started) * 1000:.0f}ms")
+    return browser
+
+
+async def launch_browser_async(playwright, headless: bool = True, endpoint: str = None):
+    """
+    Async counterpart of launch_browser.
+    """
+    endpoint = endpoint_from_env(endpoint)
+    if not endpoint:
+        return await playwright.chromium.launch(headless=headless)
+    started = time.perf_counter()
+    if endpoint.startswith("ws"):
+        browser = await playwright.chromium.connect(endpoint)
+    else:
+        browser = await playwright.chromium.connect_over_cdp(endpoint)
+    log.info(f"Connected to browser at {endpoint} in {(time.perf_counter() - started) * 1000:.0f}ms")
+    return browser
+
+
+def _endpoint_state(endpoint: str):
+    port = urlsplit(endpoint_from_env(endpoint) or "").port
+    path = state_file(port) if port else None
+    return path if path and os.path.exists(path) else None
+
+
+def warm_context(browser, endpoint: str = None):
+    """
+    Creates a context on a connected server, seeded with the cookies and local storage
+    the server saved for its warmed sites. The caller owns (and closes) the context.
+    """
+    return browser.new_context(storage_state=_endpoint_state(endpoint))
+
+
+async def warm_context_async(browser, endpoint: str = None):
+    """
+    Async counterpart of warm_context.
+    """
+    return await browser.new_context(storage_state=_endpoint_state(endpoint))
+
+
+def close_browser(browser, endpoint: str = None):
+    """
+    Closes a browser this process launched. A connected server keeps running: the
+    connection is dropped when the Playwright driver stops, and browser.close() over
+    CDP is not relied on to leave the remote browser alone.
+    """
+    if not endpoint_from_env(endpoint):
+        browser.close()
+
+
+async def close_browser_async(browser, endpoint: str = None):
+    """
+    Async counterpart of close_browser.
+    """
+    if not endpoint_from_env(endpoint):
+        await browser.close()
+
+
+def serve(port: int = 9222, headless: bool = True, warm_sites: list[str] = (), storage_state: str = None):
+    """
+    Launches Chromium with a CDP endpoint on `port` and keeps it running until interrupted.
+    `storage_state` is a saved state file merged into the one clients start from.
+    """
+    from playwright.sync_api import sync_playwright
+    from scraper.session import bootstrap
+    from scraper.sites import get_site
+
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=headless, args=[f"--remote-debugging-port={port}"])
+        # Every client context starts with the cookies (consent included) of all warmed sites.
+        state = {"cookies": [], "origins": []}
+        if storage_state:
+            with open(storage_state, encoding="utf-8") as f:
+                state = json.load(f)
+        for name in warm_sites:
+            try:
+                with open(bootstrap(browser, get_site(name)), encoding="utf-8") as f:
+                    site_state = json.load(f)
+            except Exception as e:
+                log.error(f"Bootstrapping the {name} session failed: {e}")
+                continue
+            state["cookies"] += site_state.get("cookies", [])
+            state["origins"] += site_state.get("origins", [])
+        # DNS, sockets and TLS sessions live in the browser's network service, shared by all contexts.
+        context = browser.new_context(storage_state=state)
+        page = context.new_page()
+        for name in warm_sites:
+            site = get_site(name)
+            try:
+                page.goto(site.base_url, wait_until='load', timeout=site.timeout)
+            except Exception as e:
+                log.error(f"Warming {site.base_url} failed: {e}")
+        path = state_file(port)
+        temporary = path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(temporary, path)
+        log.info(f"Browser server ready on http://127.0.0.1:{port}, client contexts start from {path}.")
+        try:
+            while browser.is_connected():
+                time.sleep(1)
+        except KeyboardInterrupt:
+            log.info("Stopping browser server.")
+        finally:
+            browser.close()
+            os.remove(path)
+
+
+def main(argv=None):
+    log.basicConfig(level=log.INFO)
+    parser = argparse.ArgumentParser(prog="python -m scraper.browser_server")
+    parser.add_argument("--port", type=int, default=9222)
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--warm", nargs="*", default=[],
+                        help="Sites whose session is bootstrapped and whose start page is loaded before clients connect.")
+    parser.add_argument("--storage-state", metavar="FILE", help="Saved storage state every client context starts from too.")
+    args = parser.parse_args(argv)
+    serve(args.port, not args.headed, args.warm, args.storage_state)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Compact in-memory representations for crawls with millions of URLs.
+
+   - Record: a __slots__ class for {'url', 'title', 'desc'} records, without a
+     per-record dict and its repeated keys (optional fields go to `extra`),
+   - UrlSet: a dedup set that keeps only a 64-bit hash per URL in sorted arrays
+     (8 bytes per URL instead of a str object plus a set slot); with 64-bit hashes
+     the chance of a collision among 10 million URLs is about 3 in a million,
+   - UrlStore: an append-only list of URLs that interns the shared host/path prefix
+     and packs the remaining tails into one bytearray.
+The distributed frontier keeps its queue in a UrlStore and its dedup index in UrlSets;
+the product link stage collects its links the same way. benchmarks/bench_memory.py
+compares them with plain str sets and dict records.
+"""
+import hashlib
+import sys
+from array import array
+from bisect import bisect_left
+
+
+class Record:
+    __slots__ = ("url", "title", "desc", "extra")
+
+    def __init__(self, url: str, title: str = "", desc: str = "", extra: dict = None):
+        self.url = url
+        self.title = title
+        self.desc = desc
+        # Optional fields (sku, brand, price, source, ...); None keeps plain records small.
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Record":
+        extra = {key: value for key, value in data.items() if key not in ("url", "title", "desc", "text")}
+        return cls(data["url"], data.get("title", ""), data.get("desc", data.get("text", "")), extra)
+
+    def to_dict(self, desc_key: str = "desc") -> dict:
+        return {"url": self.url, "title": self.title, desc_key: self.desc, **(self.extra or {})}
+
+    def __eq__(self, other):
+        return isinstance(other, Record) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Record(url={self.url!r}, title={self.title!r}, desc={len(self.desc)} chars)"
+
+
+def url_hash(url: str) -> int:
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class UrlSet:
+    """
+    Set of URL hashes. New hashes go to a small Python set; once it holds `merge_every`
+    entries it becomes a sorted array('Q') run. Runs of similar size are merged up to
+    `max_run` entries, which bounds the temporary memory of a merge. Lookups bisect each run.
+    """
+
+    def __init__(self, urls=(), merge_every: int = 65536, max_run: int = 1 << 20):
+        self.runs = []
+        self.recent = set()
+        self.merge_every = merge_every
+        self.max_run = max_run
+        for url in urls:
+            self.add(url)
+
+    def _in_runs(self, h: int) -> bool:
+        for run in self.runs:
+            i = bisect_left(run, h)
+            if i < len(run) and run[i] == h:
+                return True
+        return False
+
+    def __contains__(self, url: str) -> bool:
+        h = url_hash(url)
+        return h in self.recent or self._in_runs(h)
+
+    def add(self, url: str) -> bool:
+        """
+        Adds `url` and returns True if it was not in the set yet.
+        """
+        h = url_hash(url)
+        if h in self.recent or self._in_runs(h):
+            return False
+        self.recent.add(h)
+        if len(self.recent) >= self.merge_every:
+            self._flush_recent()
+        return True
+
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+
+    def _flush_recent(self):
+        self.runs.append(array("Q", sorted(self.recent)))
+        self.recent = set()
+        while (len(self.runs) >= 2 and len(self.runs[-2]) <= len(self.runs[-1]) * 2
+               and len(self.runs[-2]) + len(self.runs[-1]) <= self.max_run):
+            last = self.runs.pop()
+            self.runs[-1] = array("Q", sorted(self.runs[-1] + last))
+
+    def issuperset(self, urls) -> bool:
+        return all(url in self for url in urls)
+
+    def __len__(self) -> int:
+        return sum(len(run) for run in self.runs) + len(self.recent)
+
+
+def split_url(url: str) -> tuple[str, str]:
+    """
+    Splits a URL after the last '/' of its path: ('https://host/dir/', 'page?x=1').
+    """
+    query = url.find("?")
+    cut = url.rfind("/", 0, query if query >= 0 else len(url)) + 1
+    return url[:cut], url[cut:]
+
+
+class UrlStore:
+    """
+    Append-only URL list: each URL is kept as an interned prefix id plus a UTF-8 tail
+    packed into one shared bytearray.
+    """
+
+    def __init__(self, urls=()):
+        self.prefixes = []
+        self.prefix_ids = {}
+        self.prefix_of = array("I")
+        self.offsets = array("Q", [0])
+        self.tails = bytearray()
+        for url in urls:
+            self.append(url)
+
+    def append(self, url: str) -> int:
+        prefix, tail = split_url(url)
+        prefix_id = self.prefix_ids.get(prefix)
+        if prefix_id is None:
+            prefix_id = self.prefix_ids[prefix] = len(self.prefixes)
+            self.prefixes.append(sys.intern(prefix))
+        self.prefix_of.append(prefix_id)
+        self.tails += tail.encode("utf-8")
+        self.offsets.append(len(self.tails))
+        return len(self.prefix_of) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("UrlStore index out of range")
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.prefixes[self.prefix_of[index]] + self.tails[start:end].decode("utf-8")
+
+    def __len__(self) -> int:
+        return len(self.prefix_of)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
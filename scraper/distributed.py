@@ -0,0 +1,355 @@
+"""
+Coordinator/worker mode for crawling with several machines (or processes).
+
+The coordinator keeps the frontier and the dedup index and serves them over a small
+JSON-over-HTTP protocol:
+    POST /lease     {"worker": str, "size": int}                -> {"lease_id", "items", "site"}
+    POST /complete  {"lease_id", "records": [...], "discovered": [...], "failed": [{"url", "error"}]}
+    POST /add       {"items": [{"url", "kind"}]}
+    GET  /site      the SiteConfig of the crawl, so workers need no registry entry for it
+    GET  /status
+Workers lease a batch of URLs, fetch them with their own browser, and stream the
+records, newly discovered links and failed URLs back. A failed URL goes back to the
+end of the frontier; after `max_attempts` failures (a lease that expires counts as one
+for each of its items) it is parked and reported in <output>.failed.json instead of
+being handed out forever. A lease that is not completed within `lease_seconds` goes
+back to the frontier and is handed to the next worker. The coordinator appends new
+records to the output file outside the frontier lock, so leases never wait for disk.
+
+Start on one box, e.g.:
+    python -m scraper.distributed coordinator motozem --input motozem/motozen_products_links.json
+    python -m scraper.distributed worker --coordinator http://127.0.0.1:8765   (several times)
+"""
+import argparse
+import json
+import logging as log
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from scraper.compact import Record, UrlSet, UrlStore
+from scraper.sites import SiteConfig, get_site, site_from_dict
+from scraper.storage import append_links_to_json, load_links_from_json, save_links_to_json
+
+LISTING = "listing"
+DETAIL = "detail"
+KINDS = (DETAIL, LISTING)
+
+
+class Frontier:
+    """
+    Thread-safe frontier with leases and a dedup index.
+    Every URL is handed out until a lease containing it is completed or it failed
+    `max_attempts` times; records for a URL are accepted only once, even if its lease
+    was reassigned.
+    """
+
+    def __init__(self, lease_seconds: float = 120.0, max_attempts: int = 3):
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # FIFO of packed URLs with their kind (KINDS index); `head` is the next one to lease.
+        # Entries before `head` are not freed, each URL is queued at most max_attempts times.
+        self.pending = UrlStore()
+        self.kinds = bytearray()
+        self.head = 0
+        self.known = UrlSet()
+        self.done = UrlSet()
+        self.leases = {}
+        # Failures so far of URLs that failed at least once.
+        self.attempts = {}
+        self.parked = []
+        # Records not yet written to the output file (see take_records) and the total accepted.
+        self.records = []
+        self.accepted = 0
+        self.lock = threading.Lock()
+        # Set once every item is done or parked and no lease is out; the coordinator waits on it.
+        self.finished = threading.Event()
+
+    def add(self, items: list[dict]) -> int:
+        added = 0
+        with self.lock:
+            for item in items:
+                if not self.known.add(item["url"]):
+                    continue
+                self._queue(item["url"], item.get("kind", DETAIL))
+                added += 1
+            if added:
+                self.finished.clear()
+        return added
+
+    def _check_finished(self) -> bool:
+        # Called with the lock held. Skips queued entries that were done meanwhile.
+        while self.head < len(self.pending) and self.pending[self.head] in self.done:
+            self.head += 1
+        if not self.leases and self.head == len(self.pending):
+            self.finished.set()
+        return self.finished.is_set()
+
+    def _queue(self, url: str, kind: str):
+        # Called with the lock held.
+        self.pending.append(url)
+        self.kinds.append(KINDS.index(kind))
+
+    @property
+    def queued(self) -> int:
+        return len(self.pending) - self.head
+
+    def _fail(self, item: dict, error: str):
+        # Called with the lock held.
+        url = item["url"]
+        if url in self.done:
+            return
+        self.attempts[url] = self.attempts.get(url, 0) + 1
+        if self.attempts[url] >= self.max_attempts:
+            log.warning(f"Parking {url} after {self.attempts[url]} failed attempts: {error}")
+            self.done.add(url)
+            self.parked.append({"url": url, "kind": item["kind"], "attempts": self.attempts.pop(url), "error": error})
+        else:
+            # Back of the queue, so one bad URL does not hold up the rest.
+            self._queue(url, item["kind"])
+
+    def _requeue_expired(self, now: float):
+        for lease_id in [lid for lid, lease in self.leases.items() if lease["expires_at"] <= now]:
+            lease = self.leases.pop(lease_id)
+            log.info(f"Lease {lease_id} of {lease['worker']} expired, requeueing {len(lease['items'])} items.")
+            for item in lease["items"]:
+                self._fail(item, "lease expired")
+
+    def lease(self, worker: str, size: int) -> dict:
+        now = time.monotonic()
+        with self.lock:
+            self._requeue_expired(now)
+            items = []
+            while self.head < len(self.pending) and len(items) < size:
+                url, kind = self.pending[self.head], KINDS[self.kinds[self.head]]
+                self.head += 1
+                if url not in self.done:
+                    items.append({"url": url, "kind": kind})
+            if not items:
+                return {"lease_id": None, "items": [], "finished": self._check_finished()}
+            lease_id = uuid.uuid4().hex
+            self.leases[lease_id] = {"worker": worker, "items": items, "expires_at": now + self.lease_seconds}
+            return {"lease_id": lease_id, "items": items, "lease_seconds": self.lease_seconds}
+
+    def complete(self, lease_id: str, records: list[dict], discovered: list[dict], failed: list[dict] = ()) -> dict:
+        with self.lock:
+            lease = self.leases.pop(lease_id, None)
+            accepted = 0
+            for record in records:
+                if not self.done.add(record["url"]):
+                    continue
+                self.records.append(Record.from_dict(record))
+                self.attempts.pop(record["url"], None)
+                accepted += 1
+            self.accepted += accepted
+            if lease:
+                errors = {failure["url"]: failure.get("error", "") for failure in failed}
+                for item in lease["items"]:
+                    if item["url"] in errors:
+                        self._fail(item, errors[item["url"]])
+                    elif self.done.add(item["url"]):
+                        # Items that produced no record (e.g. listing pages, empty products) are done too.
+                        self.attempts.pop(item["url"], None)
+        added = self.add(discovered)
+        with self.lock:
+            finished = self._check_finished()
+        return {"accepted": accepted, "added": added, "failed": len(failed), "expired": lease is None, "finished": finished}
+
+    def take_records(self) -> list:
+        """
+        Returns the records accepted since the last call.
+        """
+        with self.lock:
+            records, self.records = self.records, []
+        return records
+
+    def status(self) -> dict:
+        with self.lock:
+            return {
+                "pending": self.queued,
+                "leased": sum(len(lease["items"]) for lease in self.leases.values()),
+                "done": len(self.done),
+                "records": self.accepted,
+                "retrying": len(self.attempts),
+                "parked": len(self.parked),
+            }
+
+
+def make_handler(frontier: Frontier, site: SiteConfig):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, payload: dict, status: int = 200):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/status":
+                return self._reply(frontier.status())
+            if self.path == "/site":
+                return self._reply(asdict(site))
+            self._reply({"error": "not found"}, 404)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(length) or b"{}")
+            if self.path == "/lease":
+                reply = frontier.lease(data.get("worker", "?"), int(data.get("size", 10)))
+                reply["site"] = site.name
+                return self._reply(reply)
+            if self.path == "/complete":
+                return self._reply(frontier.complete(data["lease_id"], data.get("records", []), data.get("discovered", []),
+                                                     data.get("failed", [])))
+            if self.path == "/add":
+                return self._reply({"added": frontier.add(data.get("items", []))})
+            self._reply({"error": "not found"}, 404)
+
+        def log_message(self, format, *args):
+            log.debug(format % args)
+
+    return Handler
+
+
+def run_coordinator(site: SiteConfig, items: list[dict], output_json: str, host: str = "127.0.0.1",
+                    port: int = 8765, lease_seconds: float = 120.0, flush_seconds: float = 30.0,
+                    max_attempts: int = 3) -> dict:
+    """
+    Serves the frontier until every item is done or parked, appending new records to
+    `output_json` every `flush_seconds`. The crawl ends as soon as the report of the
+    last item arrives. Returns the final status.
+    """
+    frontier = Frontier(lease_seconds, max_attempts)
+    frontier.add(items)
+    server = ThreadingHTTPServer((host, port), make_handler(frontier, site))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    log.info(f"Coordinator for {site.name} listening on http://{host}:{server.server_address[1]} with {len(items)} items.")
+    save_links_to_json([], output_json)
+    try:
+        while True:
+            frontier.finished.wait(flush_seconds)
+            status = frontier.status()
+            log.info(f"Frontier status: {status}")
+            # Taken under the lock, written outside it: leases and completions never wait for the disk.
+            append_links_to_json([record.to_dict(site.desc_key) for record in frontier.take_records()], output_json)
+            if frontier.finished.is_set():
+                break
+    finally:
+        server.shutdown()
+        append_links_to_json([record.to_dict(site.desc_key) for record in frontier.take_records()], output_json)
+        if frontier.parked:
+            save_links_to_json(frontier.parked, output_json + ".failed.json")
+    status = frontier.status()
+    log.info(f"Crawl finished, saved {status['records']} records to {output_json}, {status['parked']} URLs parked.")
+    return status
+
+
+def _call(coordinator: str, path: str, payload: dict = None) -> dict:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    request = Request(coordinator.rstrip("/") + path, data=data, headers={"Content-Type": "application/json"})
+    with urlopen(request, timeout=60) as response:
+        return json.loads(response.read())
+
+
+def _refused(error: Exception) -> bool:
+    # urlopen wraps the socket error in URLError.reason.
+    return isinstance(getattr(error, "reason", error), (ConnectionRefusedError, ConnectionResetError))
+
+
+def run_worker(coordinator: str, batch_size: int = 10, headless: bool = True, idle_seconds: float = 2.0):
+    """
+    Leases batches from the coordinator until the crawl is finished.
+    Listing items report their product links as new detail items; detail items report records.
+    A page that fails to load or breaks in the browser is reported as failed; any other
+    error stops the worker. A coordinator that is gone after it reported the crawl
+    finished, or after an empty lease, ends the worker cleanly.
+    """
+    from playwright.sync_api import Error as PlaywrightError, sync_playwright
+    from scraper.pipeline import PageLoadError, new_page, goto, scrape_listing_links, process_item, is_empty_record
+    from scraper.browser_server import launch_browser, warm_context, close_browser
+
+    worker = f"{socket.gethostname()}-{os.getpid()}"
+    site = site_from_dict(_call(coordinator, "/site"))
+    with sync_playwright() as p:
+        # With SCRAPER_BROWSER set, workers attach to a warm browser server instead of launching one.
+        browser = launch_browser(p, headless)
+        context = warm_context(browser)
+        page = new_page(context)
+        # True after a reply that may have been the coordinator's last one.
+        may_be_finished = False
+        while True:
+            try:
+                lease = _call(coordinator, "/lease", {"worker": worker, "size": batch_size})
+            except (URLError, ConnectionError) as e:
+                if may_be_finished and _refused(e):
+                    log.info(f"{worker}: the coordinator has shut down, the crawl is finished.")
+                    break
+                raise
+            if not lease["items"]:
+                if lease.get("finished"):
+                    break
+                may_be_finished = True
+                time.sleep(idle_seconds)
+                continue
+            records, discovered, failed = [], [], []
+            for item in lease["items"]:
+                try:
+                    if item["kind"] == LISTING:
+                        goto(page, site, item["url"])
+                        discovered.extend({"url": link, "kind": DETAIL} for link in scrape_listing_links(page, site))
+                    else:
+                        record = process_item(page, site, item["url"])
+                        if not is_empty_record(site, record["title"], record[site.desc_key]):
+                            records.append(record)
+                except (PageLoadError, PlaywrightError) as e:
+                    # Reported with the lease; the good records of the batch are kept.
+                    log.error(f"{worker} failed on {item['url']}: {e}")
+                    failed.append({"url": item["url"], "error": str(e)[:500]})
+            reply = _call(coordinator, "/complete", {"lease_id": lease["lease_id"], "records": records,
+                                                     "discovered": discovered, "failed": failed})
+            log.info(f"{worker} completed lease: {reply}")
+            may_be_finished = reply.get("finished", False)
+        context.close()
+        close_browser(browser)
+
+
+def main(argv=None):
+    log.basicConfig(level=log.INFO)
+    parser = argparse.ArgumentParser(prog="python -m scraper.distributed")
+    sub = parser.add_subparsers(dest="role", required=True)
+    coord = sub.add_parser("coordinator")
+    coord.add_argument("site")
+    coord.add_argument("--input", required=True, help="JSON list of URLs to crawl.")
+    coord.add_argument("--kind", choices=(LISTING, DETAIL), default=DETAIL)
+    coord.add_argument("--output")
+    coord.add_argument("--host", default="127.0.0.1")
+    coord.add_argument("--port", type=int, default=8765)
+    coord.add_argument("--lease-seconds", type=float, default=120.0)
+    coord.add_argument("--max-attempts", type=int, default=3, help="Failures after which a URL is parked.")
+    coord.add_argument("--structured-data", action="store_true", help="Workers read JSON-LD/microdata first.")
+    work = sub.add_parser("worker")
+    work.add_argument("--coordinator", default="http://127.0.0.1:8765")
+    work.add_argument("--batch-size", type=int, default=10)
+    work.add_argument("--headless", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.role == "coordinator":
+        site = get_site(args.site)
+        if args.structured_data:
+            site = replace(site, structured_data=True)
+        items = [{"url": url, "kind": args.kind} for url in load_links_from_json(args.input)]
+        output = args.output or os.path.join(site.output_dir or site.name, f"{site.name}_distributed_output.json")
+        run_coordinator(site, items, output, args.host, args.port, args.lease_seconds, max_attempts=args.max_attempts)
+    else:
+        run_worker(args.coordinator, args.batch_size, args.headless)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Local fixture shop for soak tests and benchmarks that must not hit the real sites.
+
+    python -m scraper.fixture_server --port 8000
+
+Serves a deterministic shop shaped like the real ones:
+   - /                                  menu with category links,
+   - /category/<c>?page=N               listings with product links and a last-page link,
+   - /product/<id>                      detail page with a title, a description of
+                                        varying length and a JSON-LD Product block,
+   - /static/shop.js, /static/shop.css  the scripts and styles every detail page loads
+                                        (ASSET_BYTES each, cacheable for a day).
+fixture_site() returns the matching SiteConfig.
+"""
+import argparse
+import json
+import logging as log
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from scraper.sites import SiteConfig
+
+CATEGORIES = 8
+PAGES_PER_CATEGORY = 20
+PRODUCTS_PER_PAGE = 24
+WORDS = ("bukósisak", "motoros", "kabát", "csizma", "kesztyű", "tükör", "plexi", "vízálló", "Gore-Tex", "Arai",
+         "gyors", "szállítás", "méret", "anyag", "bőr", "textil", "védelem", "szellőzés", "zár", "szín")
+ASSET_BYTES = 256 * 1024
+ASSET_TYPES = {"shop.js": "application/javascript", "shop.css": "text/css"}
+
+
+def fixture_site(base_url: str, output_dir: str = "fixture") -> SiteConfig:
+    return SiteConfig(
+        name="fixture",
+        base_url=base_url,
+        selectors={
+            'main_menu': 'nav a',
+            'pagination': 'ul.pagination',
+            'pagination_last_page': 'a.page-last',
+            'product': 'a.product-link',
+            'product_title': 'h1.product-title',
+            'product_desc': 'div.product-desc',
+        },
+        link_prefix=base_url.rstrip("/"),
+        menu_prefix=base_url.rstrip("/"),
+        timeout=30000,
+        # Every detail page carries a JSON-LD Product block.
+        structured_data=True,
+        output_dir=output_dir,
+    )
+
+
+def product_html(product_id: int) -> str:
+    rng = random.Random(product_id)
+    title = f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)} P-{product_id}"
+    texts = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(10, 60))) + "." for _ in range(rng.randint(1, 8))]
+    paragraphs = [f"<p>{text}</p>" for text in texts]
+    data = {"@context": "https://schema.org", "@type": "Product", "name": title, "description": "\n".join(texts),
+            "sku": f"P-{product_id}",
+            "brand": {"@type": "Brand", "name": rng.choice(("Arai", "Gaerne", "Caberg", "Vicma"))},
+            "offers": {"@type": "Offer", "price": rng.randint(1000, 300000), "priceCurrency": "HUF"}}
+    return (f"<html><head><title>{title}</title><script type=\"application/ld+json\">{json.dumps(data)}</script>"
+            f"<link rel=\"stylesheet\" href=\"/static/shop.css\"><script src=\"/static/shop.js\"></script></head>"
+            f"<body><h1 class=\"product-title\">{title}</h1><div class=\"product-desc\">{''.join(paragraphs)}</div></body></html>")
+
+
+def listing_html(category: int, number: int) -> str:
+    first = (category * PAGES_PER_CATEGORY + number - 1) * PRODUCTS_PER_PAGE
+    links = "".join(f'<a class="product-link" href="/product/{i}">P-{i}</a>' for i in range(first, first + PRODUCTS_PER_PAGE))
+    return (f"<html><body>{links}<ul class=\"pagination\"><li>"
+            f"<a class=\"page-last\" href=\"/category/{category}?page={PAGES_PER_CATEGORY}\">{PAGES_PER_CATEGORY}</a></li></ul></body></html>")
+
+
+def asset_body(name: str) -> bytes:
+    # A comment of ASSET_BYTES, valid in both JavaScript and CSS.
+    return b"/*" + b"x" * (ASSET_BYTES - 4) + b"*/"
+
+
+def menu_html() -> str:
+    return "<html><body><nav>" + "".join(f'<a href="/category/{c}">Kategória {c}</a>' for c in range(CATEGORIES)) + "</nav></body></html>"
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        segments = [s for s in parts.path.split("/") if s]
+        if len(segments) == 2 and segments[0] == "static" and segments[1] in ASSET_TYPES:
+            self._send(asset_body(segments[1]), ASSET_TYPES[segments[1]], {"Cache-Control": "public, max-age=86400"})
+            return
+        try:
+            if not segments:
+                body = menu_html()
+            elif segments[0] == "category" and len(segments) == 2:
+                number = int(parse_qs(parts.query).get("page", ["1"])[0])
+                body = listing_html(int(segments[1]), number)
+            elif segments[0] == "product" and len(segments) == 2:
+                body = product_html(int(segments[1]))
+            else:
+                raise ValueError(parts.path)
+        except ValueError:
+            self.send_error(404)
+            return
+        self._send(body.encode("utf-8"), "text/html; charset=utf-8")
+
+    def _send(self, data: bytes, content_type: str, headers: dict = None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(port: int = 0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Starts the fixture shop in a daemon thread; port 0 picks a free port.
+    """
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    log.info(f"Fixture shop running on http://{host}:{server.server_address[1]}/")
+    return server
+
+
+def main(argv=None):
+    log.basicConfig(level=log.INFO)
+    parser = argparse.ArgumentParser(prog="python -m scraper.fixture_server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+    server = ThreadingHTTPServer((args.host, args.port), FixtureHandler)
+    log.info(f"Fixture shop running on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Incremental blog updates.
+
+Instead of enumerating the whole archive (totalbike's fixed 22 pages, every motoroazis
+blog page), the listing is read newest-first from the first page onwards and every
+post link is compared with the stored corpus. The walk stops at the first page whose
+posts are all known, so a daily update costs one or two page loads plus the new posts.
+"""
+import logging as log
+
+from playwright.sync_api import Page
+
+from scraper.pipeline import goto, page_url, scrape_listing_links, process_item, is_empty_record
+from scraper.sites import SiteConfig
+from scraper.storage import save_links_to_json, load_links_from_json, output_exists
+
+
+def find_new_links(page: Page, site: SiteConfig, known: set, base_url: str = None, max_pages: int = 50) -> list[str]:
+    """
+    Walks the listing of `base_url` (default site.base_url) from site.first_page upwards
+    and returns the links that are not in `known`, newest first.
+    Stops at the first page that has no posts or contains only known posts.
+    """
+    base_url = base_url or site.base_url
+    new_links = {}
+    for number in range(site.first_page, site.first_page + max_pages):
+        goto(page, site, page_url(site, base_url, number))
+        links = scrape_listing_links(page, site)
+        fresh = [link for link in links if link not in known and link not in new_links]
+        for link in fresh:
+            new_links[link] = None
+        if not links or len(fresh) == 0:
+            log.info(f"Page {number} has no new posts, stopping.")
+            break
+    log.info(f"Found {len(new_links)} new posts.")
+    return list(new_links)
+
+
+def update_corpus(page: Page, site: SiteConfig, corpus_json: str, output_json: str = None, max_pages: int = 50) -> list[dict]:
+    """
+    1. Loads the stored corpus (a list of {'url', 'title', 'desc'} records) from corpus_json.
+    2. Finds the posts that are newer than the corpus (find_new_links).
+    3. Scrapes only those posts and puts them in front of the stored records.
+    4. Saves the result to output_json (default: corpus_json) and returns the new records.
+    """
+    corpus = load_links_from_json(corpus_json) if output_exists(corpus_json) else []
+    known = {record["url"] for record in corpus}
+    log.info(f"Loaded {len(corpus)} stored posts from {corpus_json}.")
+    new_records = []
+    for link in find_new_links(page, site, known, max_pages=max_pages):
+        record = process_item(page, site, link)
+        if is_empty_record(site, record["title"], record[site.desc_key]):
+            log.info(f"Skipping post at {link} because it has no text.")
+            continue
+        new_records.append(record)
+    save_links_to_json(new_records + corpus, output_json or corpus_json)
+    log.info(f"Added {len(new_records)} new posts to {output_json or corpus_json}.")
+    return new_records
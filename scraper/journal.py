@@ -0,0 +1,174 @@
+"""
+Crash-consistent checkpointing of a long run: the resume cursor and the records it
+covers are always committed together.
+
+The checkpoint file is a write-ahead log of JSON lines:
+   - a header {"base": B, "size": S, "next": N}: the output file holds B committed
+     records in its first S bytes and the run resumes at input item N,
+   - one line per group commit {"next": N, "records": [...]}, appended and fsynced.
+A commit is one line, so the records and the cursor are durable together or not at
+all. A line torn by a crash ends the log: recovery drops it and everything after it.
+
+Every `compact_every` commits the logged records are appended to the output file
+(after cutting it back to S bytes, which removes whatever an interrupted append left
+there), the file is fsynced and the log is replaced by a new header. Compaction only
+writes the new records, so its cost does not grow with the output. A crash at any
+point leaves the log describing which bytes of the output are committed, so after
+recovery every record is in the output exactly once.
+
+The output file stays a JSON list in the layout save_links_to_json writes. An output
+file and checkpoint of the format used before (a plain index in the checkpoint file)
+are converted on the first start.
+"""
+import json
+import logging as log
+import os
+
+from scraper.storage import _encode, encode_items, save_links_to_json, load_links_from_json
+
+
+def _fsync_directory(path: str):
+    if os.name != "posix":
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class CheckpointJournal:
+    def __init__(self, output_file: str, checkpoint_file: str, compact_every: int = 50):
+        self.output_file = output_file
+        self.checkpoint_file = checkpoint_file
+        self.compact_every = compact_every
+        self.pending = []
+        self.base, self.size, self.next = self._recover()
+        self.commits = 0
+        self.log = open(checkpoint_file, "a", encoding="utf-8")
+
+    @property
+    def total(self) -> int:
+        """
+        Number of committed records.
+        """
+        return self.base + sum(len(records) for records in self.pending)
+
+    def _read_log(self) -> list[str]:
+        if not os.path.exists(self.checkpoint_file):
+            return []
+        with open(self.checkpoint_file, encoding="utf-8") as f:
+            return f.read().split("\n")
+
+    def _convert(self, position: int) -> tuple[int, int, int]:
+        # Rewrites the output once in the journal's layout and starts a log for it.
+        records = load_links_from_json(self.output_file) if os.path.exists(self.output_file) else []
+        save_links_to_json(records, self.output_file, durable=True)
+        size = os.path.getsize(self.output_file)
+        self._write_header(len(records), size, position)
+        return len(records), size, position
+
+    def _convert_unsized(self, header: dict, lines: list[str]) -> tuple[int, int, int]:
+        # Logs whose header has no "size" rewrote the whole output on compaction.
+        records = load_links_from_json(self.output_file) if os.path.exists(self.output_file) else []
+        records, position = records[:header["base"]], header["next"]
+        for line in lines:
+            try:
+                commit = json.loads(line)
+            except ValueError:
+                break
+            records.extend(commit["records"])
+            position = commit["next"]
+        save_links_to_json(records, self.output_file, durable=True)
+        return self._convert(position)
+
+    def _recover(self) -> tuple[int, int, int]:
+        lines = self._read_log()
+        if not lines or not lines[0].strip():
+            if lines:
+                log.warning(f"{self.checkpoint_file} is empty, starting from the first item")
+            return self._convert(0)
+        if lines[0].strip().isdigit():
+            return self._convert(int(lines[0]))
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            raise ValueError(f"{self.checkpoint_file} does not start with a journal header")
+        if "size" not in header:
+            return self._convert_unsized(header, lines[1:])
+        if not os.path.exists(self.output_file) or os.path.getsize(self.output_file) < header["size"]:
+            raise ValueError(f"{self.output_file} is shorter than its checkpoint says; it was modified outside the journal")
+        base, size, position = header["base"], header["size"], header["next"]
+        for number, line in enumerate(lines[1:], 2):
+            if not line:
+                continue
+            try:
+                commit = json.loads(line)
+            except ValueError:
+                log.warning(f"Dropping a torn commit at line {number} of {self.checkpoint_file}")
+                break
+            self.pending.append(commit["records"])
+            position = commit["next"]
+        # Applying the commits (even none) rewrites the log as a bare header, so a torn tail never stays.
+        self.base, self.size, self.next = base, size, position
+        if self.pending:
+            log.info(f"Recovered {len(self.pending)} commits from {self.checkpoint_file}")
+        self._apply()
+        return self.base, self.size, self.next
+
+    def _write_header(self, base: int, size: int, position: int):
+        directory = os.path.dirname(self.checkpoint_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = self.checkpoint_file + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"base": base, "size": size, "next": position}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.checkpoint_file)
+        _fsync_directory(self.checkpoint_file)
+
+    def _apply(self):
+        # Appends the logged records to the output, then replaces the log with a new header.
+        records = [record for batch in self.pending for record in batch]
+        if records:
+            with open(self.output_file, "r+b") as f:
+                # Drop the closing bracket of the committed list ("]" when empty, "\n]" otherwise).
+                f.truncate(self.size - (1 if self.base == 0 else 2))
+                f.seek(0, os.SEEK_END)
+                f.write((b"\n" if self.base == 0 else b",\n") + encode_items(records) + b"\n]")
+                f.flush()
+                os.fsync(f.fileno())
+                self.size = f.tell()
+            self.base += len(records)
+        elif os.path.getsize(self.output_file) > self.size:
+            with open(self.output_file, "r+b") as f:
+                f.truncate(self.size)
+        self.pending = []
+        self._write_header(self.base, self.size, self.next)
+
+    def commit(self, records: list, position: int):
+        """
+        Durably adds `records` and moves the resume cursor to `position`.
+        """
+        line = json.dumps({"next": position, "records": records}, ensure_ascii=False, default=_encode)
+        self.log.write(line + "\n")
+        self.log.flush()
+        os.fsync(self.log.fileno())
+        self.pending.append(records)
+        self.next = position
+        self.commits += 1
+        if self.commits % self.compact_every == 0:
+            self.compact()
+
+    def compact(self):
+        """
+        Appends the logged records to the output file and starts a new log.
+        """
+        self.log.close()
+        self._apply()
+        self.log = open(self.checkpoint_file, "a", encoding="utf-8")
+
+    def close(self):
+        self.compact()
+        self.log.close()
@@ -0,0 +1,114 @@
+"""
+Cache of listing page -> product links, used to refresh product link lists cheaply.
+
+For every category (listing URL without the page parameter) the cache keeps a
+fingerprint of the links on its first page, the links of every listing page and the
+set of all known product links. On a refresh:
+   - the first page is visited; an unchanged fingerprint means nothing new was added,
+     so the deeper pages are skipped and the cached links are reused,
+   - otherwise pages are visited newest-first and the category stops as soon as a page
+     contains only known links (or after `max_pages` pages),
+   - categories missing from the cache, or last crawled in full more than `max_age`
+     seconds ago, are crawled in full, which also drops the links that are gone.
+A refresh then touches a small fraction of the listing pages.
+"""
+import hashlib
+import logging as log
+import os
+import time
+
+from playwright.sync_api import Page
+
+from scraper.pipeline import goto, scrape_listing_links, group_by_category
+from scraper.sites import SiteConfig
+from scraper.storage import save_links_to_json, load_links_from_json
+
+# Age after which a category is crawled in full again.
+MAX_AGE = 7 * 24 * 3600
+
+
+def fingerprint(links: list[str]) -> str:
+    return hashlib.sha1("\n".join(links).encode("utf-8")).hexdigest()
+
+
+def cache_file(site: SiteConfig) -> str:
+    return os.path.join(site.output_dir or site.name, f"{site.name}_link_cache.json")
+
+
+def load_cache(site: SiteConfig) -> dict:
+    path = cache_file(site)
+    return load_links_from_json(path) if os.path.exists(path) else {}
+
+
+def _visit(page: Page, site: SiteConfig, url: str) -> list[str]:
+    goto(page, site, url)
+    if site.require_product_selector and not page.query_selector(site.selectors['product']):
+        return []
+    return scrape_listing_links(page, site)
+
+
+def expired(entry: dict, max_age: float = MAX_AGE) -> bool:
+    return time.time() - entry.get("crawled", 0) > max_age
+
+
+def refresh_category(page: Page, site: SiteConfig, listing_urls: list[str], entry: dict, max_pages: int = None,
+                     max_age: float = MAX_AGE) -> dict:
+    """
+    Refreshes one category. `listing_urls` must be sorted newest page first
+    (see group_by_category); `entry` is the cached state of the category or None.
+    Returns the new cache entry.
+    """
+    if entry and expired(entry, max_age):
+        log.info(f"Cache of the category is older than {max_age / 3600:.0f}h, crawling it in full.")
+        entry = None
+    first_links = _visit(page, site, listing_urls[0])
+    first_print = fingerprint(first_links)
+    if entry and entry["fingerprint"] == first_print:
+        log.info(f"First page unchanged, skipping {len(listing_urls) - 1} deeper pages.")
+        entry["checked"] = time.time()
+        return entry
+
+    known = set(entry["links"]) if entry else set()
+    pages = dict(entry["pages"]) if entry else {}
+    pages[listing_urls[0]] = first_links
+    visited = 1
+    if not entry or not known.issuperset(first_links):
+        for url in listing_urls[1:]:
+            if max_pages and visited >= max_pages and entry:
+                log.info(f"Reached the limit of {max_pages} pages for this category.")
+                break
+            links = _visit(page, site, url)
+            pages[url] = links
+            visited += 1
+            if entry and known.issuperset(links):
+                log.info(f"Page {url} holds only known links, stopping this category.")
+                break
+    # Known links stay even if they moved to a page that was not revisited.
+    all_links = dict.fromkeys(link for links in pages.values() for link in links)
+    all_links.update(dict.fromkeys(entry["links"] if entry else []))
+    new = len(set(all_links) - known)
+    log.info(f"Visited {visited}/{len(listing_urls)} pages, {new} new links.")
+    now = time.time()
+    return {"fingerprint": first_print, "pages": pages, "links": list(all_links), "checked": now,
+            "crawled": entry["crawled"] if entry else now}
+
+
+def scrape_product_from_pages_cached(page: Page, site: SiteConfig, json_filename: str, output_jsonfile: str,
+                                     max_pages: int = None, max_age: float = MAX_AGE) -> list[str]:
+    """
+    Same contract as scraper.pipeline.scrape_product_from_pages, using and updating the link cache.
+    The cache is saved after every category, so an interrupted refresh keeps its progress.
+    """
+    categories = group_by_category(site, load_links_from_json(json_filename))
+    cache = load_cache(site)
+    all_links = {}
+    for base, listing_urls in categories.items():
+        log.info(f"Refreshing category {base} ({len(listing_urls)} listing pages)")
+        cache[base] = refresh_category(page, site, listing_urls, cache.get(base), max_pages, max_age)
+        save_links_to_json(cache, cache_file(site))
+        for link in cache[base]["links"]:
+            all_links[link] = None
+    final_list = list(all_links)
+    log.info(f"Total unique product links: {len(final_list)}")
+    save_links_to_json(final_list, output_jsonfile)
+    return final_list
@@ -0,0 +1,329 @@
+from playwright.sync_api import Page
+import time
+import logging as log
+import os
+
+from scraper import archive, selector_health, snapshots, structured
+from scraper.compact import UrlSet, UrlStore
+from scraper.journal import CheckpointJournal
+from scraper.prefetch import Prefetcher
+from scraper.profiling import timed, devtools_trace
+# is_empty_record needs no browser either; it is re-exported here with the URL helpers.
+from scraper.sites import SiteConfig, selector_chain, is_empty_record
+from scraper.storage import save_links_to_json, load_links_from_json
+# The URL helpers live in scraper.urls (no Playwright needed) and are re-exported here.
+from scraper.urls import (
+    absolute_link,
+    unwrap_redirect,
+    remove_page_param,
+    page_url,
+    page_number,
+    group_by_category,
+    scrape_pages_in_reverse,
+    parse_page_value,
+    last_page_from_href,
+)
+from scraper.writer import BackgroundWriter
+
+# Collects every href of the matched elements in one round trip to the browser
+# instead of two get_attribute() calls per element.
+HREFS_JS = "els => els.map(e => e.getAttribute('href')).filter(Boolean)"
+
+
+class PageLoadError(Exception):
+    """
+    A page did not load (timeout, network error); raised by goto.
+    """
+
+
+@timed("navigation")
+def goto(page: Page, site: SiteConfig, url: str):
+    log.info(f"Visiting: {url}")
+    try:
+        response = page.goto(url, timeout=site.timeout, wait_until='load')
+    except Exception as e:
+        log.error(f"Error loading {url}: {e}")
+        raise PageLoadError(f"Error loading {url}: {e}")
+    archive.archive_response(response)
+    if site.settle_delay:
+        time.sleep(site.settle_delay)
+    return response
+
+
+@timed("menu")
+def scrape_menu(page: Page, site: SiteConfig) -> list[str]:
+    """
+    Collects the category links from the main menu of the currently loaded page.
+    """
+    hrefs = page.eval_on_selector_all(site.selectors['main_menu'], HREFS_JS)
+    links = [absolute_link(href, site.menu_prefix) for href in hrefs]
+    log.info(f"Found {len(links)} main menu links.")
+    return links
+
+
+def has_pagination(page: Page, site: SiteConfig) -> bool:
+    selector = site.selectors.get('pagination')
+    return selector is not None and page.query_selector(selector) is not None
+
+
+def get_last_page_number(page: Page, site: SiteConfig) -> int:
+    """
+    1. Looks for the 'last page' element (selectors['pagination_last_page']).
+    2. Reads the number N either from its href (?page=N) or from its inner text,
+       depending on site.last_page_from.
+    3. Returns N as an int, and if it fails - returns 1.
+    """
+    element = page.query_selector(site.selectors['pagination_last_page'])
+    if not element:
+        return 1
+    if site.last_page_from == "text":
+        return parse_page_value(element.inner_text().strip())
+    return last_page_from_href(site, element.get_attribute("href"))
+
+
+@timed("pagination")
+def discover_listing_pages(page: Page, site: SiteConfig, menu_links: list[str]) -> list[str]:
+    """
+    For every category link, expands the pagination into the full list of listing pages,
+    using the strategy configured by site.pagination_mode:
+       - 'last_page': read the last page number and generate all pages in reverse,
+       - 'anchors': collect the hrefs inside the pagination container,
+       - 'fixed': generate pages up to site.fixed_last_page without visiting anything,
+       - 'none': use the category links as they are.
+    Returns a de-duplicated list that keeps the discovery order.
+    """
+    collected = {}
+    for link in menu_links:
+        if site.pagination_mode == "none":
+            collected[link] = None
+            continue
+        if site.pagination_mode == "fixed":
+            for url in scrape_pages_in_reverse(site, link, site.fixed_last_page):
+                collected[url] = None
+            continue
+        goto(page, site, link)
+        if not has_pagination(page, site):
+            log.info("No pagination on this page. Moving to the next URL.")
+            collected[link] = None
+            continue
+        if site.pagination_mode == "anchors":
+            collected[link] = None
+            hrefs = page.eval_on_selector_all(f"{site.selectors['pagination']} a", HREFS_JS)
+            for href in hrefs:
+                collected[absolute_link(href, site.link_prefix)] = None
+            continue
+        last_page = get_last_page_number(page, site)
+        selector_health.observe(page, site, {"pagination_last_page": last_page > 1})
+        log.info(f"The last page is: {last_page}")
+        base_url = remove_page_param(link, site.page_param)
+        for url in scrape_pages_in_reverse(site, base_url, last_page):
+            collected[url] = None
+    links = list(collected)
+    log.info(f"Collected {len(links)} listing pages.")
+    return links
+
+
+@timed("listing links")
+def scrape_listing_links(page: Page, site: SiteConfig) -> list[str]:
+    """
+    Returns the detail page links found on the currently loaded listing page.
+    """
+    hrefs = page.eval_on_selector_all(site.selectors['product'], HREFS_JS)
+    links = [absolute_link(href, site.link_prefix) for href in hrefs]
+    if site.unwrap_redirects:
+        links = [unwrap_redirect(link) for link in links]
+    selector_health.observe(page, site, {"product": links})
+    log.info(f"Found {len(links)} products links.")
+    return links
+
+
+def scrape_product_from_pages(page: Page, site: SiteConfig, json_filename: str, output_jsonfile: str) -> list[str]:
+    """
+    1. Reads a list of listing URLs from `json_filename`.
+    2. For each URL, goes to that page and scrapes product links (using scrape_listing_links).
+    3. Collects all product links, dropping duplicates but keeping the order.
+    4. Saves them to `output_jsonfile` and returns them.
+    """
+    urls = load_links_from_json(json_filename)
+    log.info(f"Loaded {len(urls)} links from {json_filename}")
+    seen, all_product_links = UrlSet(), UrlStore()
+    for url in urls:
+        goto(page, site, url)
+        if site.require_product_selector and not page.query_selector(site.selectors['product']):
+            log.info("Product links selector not found on this page. Skipping this URL.")
+            continue
+        for link in scrape_listing_links(page, site):
+            if seen.add(link):
+                all_product_links.append(link)
+    final_list = list(all_product_links)
+    log.info(f"Total unique product links after scraping all pages: {len(final_list)}")
+    save_links_to_json(final_list, output_jsonfile)
+    return final_list
+
+
+def extract_text(page: Page, selector, join_parts: bool = False, text_from: str = "inner_text") -> str:
+    """
+    Returns the text of the first selector in the fallback chain that matches.
+    With `join_parts` the stripped texts of all matched elements are joined with newlines.
+    `text_from` is 'inner_text' (rendered text) or 'text_content' (every text node).
+    Returns an empty string if nothing matches.
+    """
+    for css in selector_chain(selector):
+        if join_parts:
+            locator = page.locator(css)
+            parts = locator.all_text_contents() if text_from == "text_content" else locator.all_inner_texts()
+            text = "\n".join(part.strip() for part in parts if part.strip())
+            if text:
+                return text
+            continue
+        element = page.query_selector(css)
+        if element:
+            return (element.text_content() if text_from == "text_content" else element.inner_text()).strip()
+    return ""
+
+
+@timed("detail extraction")
+def scrape_product_fields(page: Page, site: SiteConfig) -> tuple[str, str, dict]:
+    """
+    Scrapes the title and description from the currently loaded detail page.
+    With site.structured_data the JSON-LD/microdata of the page is read first, and the title
+    and description selectors are only queried for the fields it does not have.
+    Returns (title, desc, extra fields such as sku, brand, price and 'source').
+    """
+    fields = {}
+    if site.structured_data:
+        try:
+            fields = structured.parse(page.evaluate(structured.STRUCTURED_JS))
+        except Exception as e:
+            log.info(f"Could not read structured data: {e}")
+    queried = {}
+    if not fields.get("title"):
+        queried['product_title'] = extract_text(page, site.selectors['product_title'])
+    if not fields.get("desc"):
+        queried['product_desc'] = extract_text(page, site.selectors['product_desc'], site.join_desc_parts, site.desc_from)
+    selector_health.observe(page, site, queried)
+    if not site.structured_data:
+        return queried['product_title'], queried['product_desc'], {}
+    return structured.combine(fields, queried.get('product_title'), queried.get('product_desc'))
+
+
+def process_item(page: Page, site: SiteConfig, url: str, prefetcher: Prefetcher = None, upcoming: list[str] = ()) -> dict:
+    """
+    Given a detail page URL, navigates to it, scrapes the title and description,
+    and returns a dictionary with keys: 'url', 'title', 'desc' (site.desc_key) and the extra fields
+    of scrape_product_fields. With a prefetcher, a tab that already loaded `url` is used instead and the
+    `upcoming` URLs start loading while this one is extracted.
+    """
+    loaded = prefetcher.take(url, upcoming) if prefetcher else None
+    current = loaded or page
+    with devtools_trace(current, url):
+        try:
+            if loaded is None:
+                goto(page, site, url)
+            title, desc, extra = scrape_product_fields(current, site)
+        except Exception:
+            snapshots.capture(current, url, "error")
+            raise
+        else:
+            snapshots.capture(current, url, "sample" if title.strip() or desc.strip() else "empty")
+        finally:
+            # The snapshot is taken first: a released tab starts loading the next URL.
+            if loaded is not None:
+                prefetcher.release(loaded)
+    log.info(f"Scraped product data: title length: {len(title)} characters, description length: {len(desc)} characters.")
+    return {"url": url, "title": title, site.desc_key: desc, **extra}
+
+
+def scrape_text_from_product(page: Page, site: SiteConfig, input_json: str, output_json: str,
+                             prefetch: int = 0, compress: bool = False, rotate_records: int = None) -> int:
+    """
+    1. Loads a list of product URLs from input_json.
+    2. Visits each product page, scrapes the product title and description.
+       With `prefetch` > 0 the next `prefetch` pages load in spare tabs meanwhile.
+    3. Empty products are skipped (see is_empty_record), and with site.skip_load_errors
+       the ones that fail to load.
+    4. Builds a dictionary with keys: 'url', 'title', and 'desc' (site.desc_key) per product.
+    5. Writes them to output_json on a background thread (see scraper.writer), optionally
+       gzip-compressed and split into files of `rotate_records` records.
+    Returns the number of records written; they are not kept in memory.
+    """
+    product_links = load_links_from_json(input_json)
+    log.info(f"Loaded {len(product_links)} product links from {input_json}.")
+    prefetcher = Prefetcher(page.context, site, prefetch) if prefetch else None
+    writer = BackgroundWriter(output_json, compress=compress, rotate_records=rotate_records)
+    try:
+        for index, link in enumerate(product_links):
+            try:
+                record = process_item(page, site, link, prefetcher, product_links[index + 1:index + 1 + prefetch])
+            except PageLoadError:
+                if not site.skip_load_errors:
+                    raise
+                continue
+            if is_empty_record(site, record["title"], record[site.desc_key]):
+                log.info(f"Skipping product at {link} because it has no text.")
+                continue
+            writer.put(record)
+    finally:
+        if prefetcher:
+            prefetcher.close()
+        writer.close()
+    log.info(f"Saved scraped product data for {writer.written} products to {', '.join(writer.segments)}.")
+    return writer.written
+
+
+def process_long_json_with_page(page: Page, site: SiteConfig, input_file: str, output_file: str, checkpoint_file: str,
+                                prefetch: int = 0, commit_every: int = 10, compact_every: int = 50):
+    """
+    Processes product URLs from input_file one by one using process_item(),
+    prefetching the next `prefetch` URLs in spare tabs.
+    Every `commit_every` items the new records and the index of the next item are
+    committed together to checkpoint_file (a write-ahead log, see scraper.journal);
+    the logged records are appended to output_file every `compact_every` commits and at the end.
+    If interrupted, even by a crash, the process resumes after the last commit and
+    every record ends up in output_file exactly once.
+    """
+    items = load_links_from_json(input_file)
+    total_items = len(items)
+    log.info(f"Total items to process: {total_items}")
+
+    journal = CheckpointJournal(output_file, checkpoint_file, compact_every)
+    if journal.next:
+        log.info(f"Resuming from checkpoint: {journal.next}")
+    pending = []
+    prefetcher = Prefetcher(page.context, site, prefetch) if prefetch else None
+    i = journal.next
+    try:
+        for i in range(journal.next, total_items):
+            try:
+                log.info(f"Processing item {i+1}/{total_items}")
+                pending.append(process_item(page, site, items[i], prefetcher, items[i + 1:i + 1 + prefetch]))
+            except Exception as e:
+                log.error(f"Error processing item {i} - {e}")
+                raise e
+            if len(pending) >= commit_every:
+                batch, pending = pending, []
+                journal.commit(batch, i + 1)
+                log.info(f"Checkpoint updated at item {i+1}")
+        i = total_items
+    finally:
+        if prefetcher:
+            prefetcher.close()
+        # Item i was not finished; everything before it is committed.
+        if pending:
+            journal.commit(pending, i)
+        journal.close()
+    log.info(f"Processing complete. Processed {journal.total} items.")
+
+
+def new_page(context) -> Page:
+    page = context.new_page()
+    page.set_default_timeout(1000*60)
+    page.set_default_navigation_timeout(1000*60)
+    return page
+
+
+def site_path(site: SiteConfig, filename: str) -> str:
+    """
+    Returns the default location of a site's JSON file, e.g. 'pardi/pardi_links.json'.
+    """
+    return os.path.join(site.output_dir or site.name, f"{site.name}_{filename}")
@@ -0,0 +1,129 @@
+"""
+Speculative prefetch of the next detail pages in spare tabs.
+
+Sequential extraction (scrape_text_from_product, process_long_json_with_page) leaves
+the network idle while a page is being read and the output written. The Prefetcher
+starts the next `depth` URLs in spare tabs of the same context without waiting for
+them: the navigation is started from inside the page (location.href = url), which
+returns immediately, and the tab's 'load' event is caught by a listener. When the
+loop reaches a prefetched URL it takes that tab, waits only for whatever is left of
+its load and extracts from it, so network latency overlaps with extraction. At most
+`depth` navigations are outstanding; with depth=0 nothing is prefetched.
+"""
+import logging as log
+import time
+
+from playwright.sync_api import Page
+
+from scraper import archive
+from scraper.profiling import timed
+from scraper.sites import SiteConfig
+
+NAVIGATE_JS = "url => { window.location.href = url; }"
+
+
+def final_response(kept, response, frame):
+    """
+    The navigation response of `frame` to keep after `response` arrived: a redirect
+    (3xx) is replaced by the response it leads to, the final one is kept.
+    """
+    if not response.request.is_navigation_request() or response.frame != frame:
+        return kept
+    if kept is None or 300 <= kept.status < 400:
+        return response
+    return kept
+
+
+class Prefetcher:
+    def __init__(self, context, site: SiteConfig, depth: int = 2):
+        self.context = context
+        self.site = site
+        self.depth = depth
+        self.spare = []
+        # url -> (page, state) in the order the navigations were started.
+        self.inflight = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _spare_page(self) -> Page:
+        if self.spare:
+            return self.spare.pop()
+        page = self.context.new_page()
+        page.set_default_timeout(1000*60)
+        return page
+
+    def schedule(self, urls: list[str]):
+        """
+        Starts loading the URLs that are not in flight yet, up to `depth` outstanding navigations.
+        """
+        for url in urls:
+            if len(self.inflight) >= self.depth:
+                break
+            if url in self.inflight:
+                continue
+            page = self._spare_page()
+            state = {"loaded": False, "response": None}
+
+            def on_response(response, state=state, page=page):
+                state["response"] = final_response(state["response"], response, page.main_frame)
+
+            def on_load(_, state=state):
+                state["loaded"] = True
+
+            page.on("response", on_response)
+            page.once("load", on_load)
+            state["listener"] = on_response
+            try:
+                page.evaluate(NAVIGATE_JS, url)
+            except Exception as e:
+                log.info(f"Could not prefetch {url}: {e}")
+                page.remove_listener("response", on_response)
+                self.spare.append(page)
+                continue
+            self.inflight[url] = (page, state)
+
+    @timed("prefetch wait")
+    def take(self, url: str, upcoming: list[str] = ()) -> Page:
+        """
+        Returns the tab holding `url` once it has loaded, or None if `url` was not
+        prefetched or its load failed (the caller then loads it itself).
+        The `upcoming` URLs are scheduled before waiting, so they load in the meantime.
+        """
+        entry = self.inflight.pop(url, None)
+        self.schedule(upcoming)
+        if entry is None:
+            self.misses += 1
+            return None
+        page, state = entry
+        try:
+            if not state["loaded"]:
+                page.wait_for_event("load", timeout=self.site.timeout)
+        except Exception as e:
+            log.info(f"Prefetch of {url} did not finish: {e}")
+            self.misses += 1
+            self.release(page)
+            return None
+        finally:
+            page.remove_listener("response", state["listener"])
+        self.hits += 1
+        log.info(f"Using prefetched page: {url}")
+        archive.archive_response(state["response"])
+        if self.site.settle_delay:
+            time.sleep(self.site.settle_delay)
+        return page
+
+    def release(self, page: Page):
+        """
+        Gives a tab returned by take() back to the pool once it has been extracted.
+        """
+        self.spare.append(page)
+
+    def close(self):
+        for page, state in self.inflight.values():
+            page.remove_listener("response", state["listener"])
+            self.spare.append(page)
+        self.inflight = {}
+        for page in self.spare:
+            page.close()
+        self.spare = []
+        log.info(f"Prefetch: {self.hits} pages used, {self.misses} loaded without prefetch.")
@@ -0,0 +1,264 @@
+"""
+Opt-in profiling of the pipeline stages.
+
+When enabled (python -m scraper ... --profile DIR, or enable(DIR) in a script):
+   - every function decorated with @timed records its wall time per call, for plain
+     functions and for coroutines (asyncio task timing),
+   - cProfile runs for the whole process and is saved as profile.prof,
+   - a sampling thread records the Python stacks of all threads, written as
+     stacks.folded and rendered to flamegraph.svg,
+   - a sample of pages gets a Chrome DevTools performance trace (traces/*.json),
+     which shows how much of a page load is network, rendering and Playwright IPC.
+Everything is summarised in report.json in the output directory.
+When profiling is disabled, @timed costs one attribute check per call.
+"""
+import functools
+import inspect
+import logging as log
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager, contextmanager
+
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.output_dir = None
+        self.stage_stats = defaultdict(lambda: {"calls": 0, "total": 0.0, "max": 0.0})
+        self.stacks = Counter()
+        self.profile = None
+        self.sampler = None
+        self.sample_interval = 0.005
+        self.trace_rate = 0.0
+        self.traces = 0
+        # A browser records one trace at a time; concurrent async pages skip theirs.
+        self.tracing = False
+        self.started = None
+        self.lock = threading.Lock()
+
+
+profiler = Profiler()
+
+
+def enable(output_dir: str, sample_interval: float = 0.005, trace_rate: float = 0.01, use_cprofile: bool = True):
+    """
+    Starts collecting. `trace_rate` is the share of pages that get a DevTools trace.
+    """
+    import cProfile
+    os.makedirs(output_dir, exist_ok=True)
+    profiler.enabled = True
+    profiler.output_dir = output_dir
+    profiler.sample_interval = sample_interval
+    profiler.trace_rate = trace_rate
+    profiler.started = time.perf_counter()
+    if use_cprofile:
+        profiler.profile = cProfile.Profile()
+        profiler.profile.enable()
+    profiler.sampler = threading.Thread(target=_sample_stacks, name="profiling-sampler", daemon=True)
+    profiler.sampler.start()
+    log.info(f"Profiling enabled, reports go to {output_dir}")
+
+
+def record(name: str, seconds: float):
+    with profiler.lock:
+        stats = profiler.stage_stats[name]
+        stats["calls"] += 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+
+
+def timed(name: str):
+    """
+    Decorator recording the wall time of every call under `name`.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not profiler.enabled:
+                    return await func(*args, **kwargs)
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    record(name, time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def _trace_path(label: str) -> str:
+    """
+    The file of the next DevTools trace, or None when this call is not sampled
+    or another trace is running.
+    """
+    if not profiler.enabled or profiler.tracing or random.random() >= profiler.trace_rate:
+        return None
+    import re
+    profiler.traces += 1
+    trace_dir = os.path.join(profiler.output_dir, "traces")
+    os.makedirs(trace_dir, exist_ok=True)
+    return os.path.join(trace_dir, f"{profiler.traces:04d}_{re.sub(r'[^A-Za-z0-9]+', '_', label)[-80:]}.json")
+
+
+@contextmanager
+def devtools_trace(page, label: str):
+    """
+    Records a Chrome DevTools performance trace of whatever happens on `page` inside
+    the block, for a random `trace_rate` share of calls. Only works with Chromium.
+    """
+    path = _trace_path(label)
+    if path is None:
+        yield
+        return
+    browser = page.context.browser
+    profiler.tracing = True
+    try:
+        browser.start_tracing(page=page, path=path, screenshots=False)
+        try:
+            yield
+        finally:
+            browser.stop_tracing()
+    finally:
+        profiler.tracing = False
+
+
+@asynccontextmanager
+async def devtools_trace_async(page, label: str):
+    """
+    Async counterpart of devtools_trace.
+    """
+    path = _trace_path(label)
+    if path is None:
+        yield
+        return
+    browser = page.context.browser
+    profiler.tracing = True
+    try:
+        await browser.start_tracing(page=page, path=path, screenshots=False)
+        try:
+            yield
+        finally:
+            await browser.stop_tracing()
+    finally:
+        profiler.tracing = False
+
+
+def _sample_stacks():
+    own = threading.get_ident()
+    names = {}
+    while profiler.enabled:
+        time.sleep(profiler.sample_interval)
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            if thread_id not in names:
+                names = {t.ident: t.name for t in threading.enumerate()}
+            calls = []
+            while frame is not None:
+                code = frame.f_code
+                calls.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            calls.append(names.get(thread_id, str(thread_id)))
+            with profiler.lock:
+                profiler.stacks[";".join(reversed(calls))] += 1
+
+
+def write_report() -> str:
+    """
+    Stops collecting and writes report.json, profile.prof, stacks.folded and flamegraph.svg.
+    Returns the path of report.json.
+    """
+    if not profiler.enabled:
+        return None
+    import io
+    import json
+    import pstats
+    profiler.enabled = False
+    if profiler.sampler:
+        profiler.sampler.join()
+    out = profiler.output_dir
+    top = ""
+    if profiler.profile:
+        profiler.profile.disable()
+        profiler.profile.dump_stats(os.path.join(out, "profile.prof"))
+        buffer = io.StringIO()
+        pstats.Stats(profiler.profile, stream=buffer).sort_stats("cumulative").print_stats(30)
+        top = buffer.getvalue()
+    with open(os.path.join(out, "stacks.folded"), "w", encoding="utf-8") as f:
+        for stack, count in profiler.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    with open(os.path.join(out, "flamegraph.svg"), "w", encoding="utf-8") as f:
+        f.write(render_flamegraph(profiler.stacks))
+    wall = time.perf_counter() - profiler.started
+    report = {
+        "wall_seconds": wall,
+        "stages": {
+            name: dict(stats, mean=stats["total"] / stats["calls"], share_of_wall=stats["total"] / wall)
+            for name, stats in sorted(profiler.stage_stats.items(), key=lambda item: -item[1]["total"])
+        },
+        "samples": sum(profiler.stacks.values()),
+        "devtools_traces": profiler.traces,
+        "cprofile_top": top.splitlines(),
+    }
+    path = os.path.join(out, "report.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    for name, stats in report["stages"].items():
+        log.info(f"[profile] {name}: {stats['calls']} calls, {stats['total']:.2f}s total, {stats['mean']*1000:.1f}ms mean")
+    log.info(f"Profiling report saved to {path}")
+    return path
+
+
+def render_flamegraph(stacks: Counter, width: int = 1200, row: int = 16) -> str:
+    """
+    Renders folded stacks as a minimal self-contained SVG flame graph.
+    """
+    import html
+    tree = {"count": 0, "children": {}}
+    for stack, count in stacks.items():
+        node = tree
+        node["count"] += count
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"count": 0, "children": {}})
+            node["count"] += count
+    total = tree["count"] or 1
+    rects = []
+
+    def walk(node, x, depth):
+        for name, child in sorted(node["children"].items()):
+            w = child["count"] / total * width
+            if w >= 0.5:
+                hue = 10 + (hash(name) % 40)
+                label = html.escape(name)
+                text = label if w > 60 else ""
+                rects.append(
+                    f'<g><title>{label} ({child["count"]} samples)</title>'
+                    f'<rect x="{x:.1f}" y="{depth * row}" width="{w:.1f}" height="{row - 1}" fill="hsl({hue},80%,60%)"/>'
+                    f'<text x="{x + 2:.1f}" y="{depth * row + row - 4}" font-size="10">{text[: int(w / 6)]}</text></g>'
+                )
+                walk(child, x, depth + 1)
+            x += w
+
+    walk(tree, 0.0, 0)
+    height = row * (_depth(tree) + 1)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="monospace">'
+            + "".join(rects) + "</svg>\n")
+
+
+def _depth(node) -> int:
+    return 1 + max((_depth(child) for child in node["children"].values()), default=0) if node["children"] else 0
@@ -0,0 +1,66 @@
+"""
+Record and replay of crawls with Playwright HAR archives.
+
+Record mode stores every response of a crawl in a HAR file; replay mode serves
+those responses back to the very same scraper code through context routing, so a
+run can be repeated without touching the live site - for benchmarks and for
+regression tests of the extraction logic. Use a '.zip' path to keep response
+bodies as separate entries instead of base64 inside the JSON.
+
+    python -m scraper motoroazis products --record archives/motoroazis.har.zip
+    python -m scraper motoroazis products --replay archives/motoroazis.har.zip
+"""
+import logging as log
+import os
+
+# Requests missing from the archive fail fast instead of silently going to the network.
+NOT_FOUND = "abort"
+
+
+def recording_options(har_path: str) -> dict:
+    """
+    Keyword arguments for browser.new_context() that record every response into `har_path`.
+    The archive is written when the context is closed.
+    """
+    directory = os.path.dirname(har_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    return {
+        "record_har_path": har_path,
+        "record_har_content": "attach" if har_path.endswith(".zip") else "embed",
+        # Service workers would answer requests without them showing up in the archive.
+        "service_workers": "block",
+    }
+
+
+def open_context(browser, record_har: str = None, replay_har: str = None):
+    """
+    Creates a browser context that records into `record_har`, replays from `replay_har`,
+    or is a plain live context when neither is given.
+    """
+    if record_har and replay_har:
+        raise ValueError("Recording and replaying at the same time is not supported.")
+    if record_har:
+        log.info(f"Recording responses to {record_har}")
+        return browser.new_context(**recording_options(record_har))
+    context = browser.new_context(service_workers="block") if replay_har else browser.new_context()
+    if replay_har:
+        log.info(f"Replaying responses from {replay_har}")
+        context.route_from_har(replay_har, not_found=NOT_FOUND)
+    return context
+
+
+async def open_context_async(browser, record_har: str = None, replay_har: str = None):
+    """
+    Async counterpart of open_context for the streaming pipeline.
+    """
+    if record_har and replay_har:
+        raise ValueError("Recording and replaying at the same time is not supported.")
+    if record_har:
+        log.info(f"Recording responses to {record_har}")
+        return await browser.new_context(**recording_options(record_har))
+    context = await browser.new_context(service_workers="block") if replay_har else await browser.new_context()
+    if replay_har:
+        log.info(f"Replaying responses from {replay_har}")
+        await context.route_from_har(replay_har, not_found=NOT_FOUND)
+    return context
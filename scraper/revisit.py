@@ -0,0 +1,195 @@
+"""
+Revisit scheduler for continuous monitoring of a corpus.
+
+Refetching every product on the same cadence wastes most fetches: the majority of
+descriptions never change, while new products keep appearing. The scheduler keeps a
+per-URL history in <output_dir>/<site>_revisit.json (content hash of the last fetch,
+number of checks and detected changes, total observed time) and estimates each URL's
+change rate λ assuming changes arrive as a Poisson process (the estimator of Cho and
+Garcia-Molina, which corrects for changes missed between two checks).
+
+A page never seen changing is assumed to change at most once in twice its observed time
+plus `prior_days`, so it is still rechecked now and then, less often the longer it stays
+the same. A crawl window of `budget` fetches is planned as:
+   1. URLs never fetched, in the order they were discovered,
+   2. the others by the freshness gained per fetch: the probability the page changed since
+      its last fetch, 1 - exp(-λ·age), times the share of the next window it is likely
+      to stay fresh, (1 - exp(-λ·W)) / (λ·W). Pages that change faster than they can be
+      revisited gain little and fall behind the ones that change now and then.
+A fetch that fails is recorded and the run goes on; every failure in a row halves the
+URL's score, so a broken page does not take the top of every plan.
+
+The content hash covers only the title and the description ('desc', or 'text' in the
+blog records) with whitespace collapsed, so records of the stored corpus and of a
+revisit compare equal however they were extracted. The first check of a URL seeded
+from the corpus only takes its hash as the baseline: the corpus may come from an
+older extraction (other selectors, structured data), which is not a content change.
+
+    python -m scraper motoroazis revisit --budget 1000
+"""
+import hashlib
+import logging as log
+import math
+import os
+import time
+
+from scraper.sites import SiteConfig
+from scraper.storage import save_links_to_json, load_links_from_json, output_exists, output_mtime
+
+
+def _normalize(text: str) -> str:
+    return " ".join((text or "").split())
+
+
+def content_hash(record: dict) -> str:
+    text = _normalize(record.get("title")) + "\n" + _normalize(record.get("desc") or record.get("text"))
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def state_file(site: SiteConfig) -> str:
+    return os.path.join(site.output_dir or site.name, f"{site.name}_revisit.json")
+
+
+class RevisitScheduler:
+    def __init__(self, path: str, window_hours: float = 24.0, prior_days: float = 30.0):
+        self.path = path
+        self.window = window_hours * 3600
+        self.prior = prior_days * 86400
+        self.history = load_links_from_json(path) if os.path.exists(path) else {}
+
+    def seed(self, records: list[dict], fetched_at: float):
+        """
+        Starts the history of records fetched before the scheduler was used.
+        """
+        for record in records:
+            if record["url"] not in self.history:
+                self.history[record["url"]] = {"hash": content_hash(record), "last": fetched_at,
+                                               "checks": 0, "changes": 0, "observed": 0.0, "seeded": True}
+
+    def observe(self, record: dict, fetched_at: float = None) -> bool:
+        """
+        Records a fetch of record['url']. Returns True when the content changed.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        digest = content_hash(record)
+        entry = self.history.get(record["url"])
+        if entry is None or entry["hash"] is None:
+            # Never fetched, or every fetch so far failed.
+            self.history[record["url"]] = {"hash": digest, "last": fetched_at, "checks": 0, "changes": 0, "observed": 0.0}
+            return False
+        entry.pop("failures", None)
+        if entry.pop("seeded", False):
+            # Only the baseline: the seeded hash may come from an older extraction of the page.
+            entry["hash"] = digest
+            entry["observed"] += max(0.0, fetched_at - entry["last"])
+            entry["last"] = fetched_at
+            return False
+        changed = digest != entry["hash"]
+        entry["checks"] += 1
+        entry["changes"] += changed
+        entry["observed"] += max(0.0, fetched_at - entry["last"])
+        entry["hash"] = digest
+        entry["last"] = fetched_at
+        return changed
+
+    def fail(self, url: str, fetched_at: float = None):
+        """
+        Records a fetch of `url` that failed; the URL keeps its hash and stays due.
+        """
+        entry = self.history.get(url)
+        if entry is None:
+            # Known from now on, so it is no longer planned first as a new URL.
+            fetched_at = time.time() if fetched_at is None else fetched_at
+            entry = self.history[url] = {"hash": None, "last": fetched_at, "checks": 0, "changes": 0, "observed": 0.0}
+        entry["failures"] = entry.get("failures", 0) + 1
+
+    def change_rate(self, url: str) -> float:
+        """
+        Estimated changes per second of `url`.
+        """
+        entry = self.history[url]
+        checks, changes = entry["checks"], entry["changes"]
+        if not changes or not entry["observed"]:
+            # Never seen changing: assume half a change over the observed time plus a prior period,
+            # so the estimate keeps falling while the page stays the same but never reaches zero.
+            return 0.5 / (entry["observed"] + self.prior)
+        mean_interval = entry["observed"] / checks
+        # Cho & Garcia-Molina: -log((n - X + 0.5) / (n + 0.5)) / I, finite even when every check saw a change.
+        return -math.log((checks - changes + 0.5) / (checks + 0.5)) / mean_interval
+
+    def score(self, url: str, now: float) -> float:
+        rate = self.change_rate(url)
+        age = now - self.history[url]["last"]
+        stale = 1 - math.exp(-rate * age)
+        stays_fresh = (1 - math.exp(-rate * self.window)) / (rate * self.window)
+        return stale * stays_fresh / 2 ** self.history[url].get("failures", 0)
+
+    def plan(self, urls: list[str], budget: int, now: float = None) -> list[str]:
+        """
+        Picks the `budget` URLs of `urls` whose fetch gains the most freshness.
+        """
+        now = time.time() if now is None else now
+        new, known = [], []
+        for url in dict.fromkeys(urls):
+            if url in self.history:
+                known.append((self.score(url, now), url))
+            else:
+                new.append(url)
+        known.sort(reverse=True)
+        planned = (new + [url for _, url in known])[:budget]
+        log.info(f"Planned {len(planned)} fetches: {min(len(new), budget)} new, the rest by expected change "
+                 f"({len(new) + len(known)} URLs known).")
+        return planned
+
+    def save(self):
+        save_links_to_json(self.history, self.path)
+
+
+def revisit_corpus(page, site: SiteConfig, links_json: str, corpus_json: str, budget: int = 1000,
+                   window_hours: float = 24.0) -> list[dict]:
+    """
+    1. Loads the product links (links_json) and the stored corpus (corpus_json).
+    2. Plans `budget` fetches with the RevisitScheduler.
+    3. Scrapes them, replaces changed records in place and appends new ones. A URL that
+       fails to load or whose page breaks the browser calls is recorded as a failure and
+       skipped; any other error (a SelectorHealthError of --selector-health abort, a bug)
+       stops the run, after the corpus and the scheduler state are saved.
+    4. Saves the corpus and the scheduler state; returns the new and changed records.
+    """
+    from playwright.sync_api import Error as PlaywrightError
+    from scraper.pipeline import PageLoadError, process_item, is_empty_record
+
+    corpus = load_links_from_json(corpus_json) if output_exists(corpus_json) else []
+    links = load_links_from_json(links_json) if output_exists(links_json) else []
+    scheduler = RevisitScheduler(state_file(site), window_hours)
+    if corpus:
+        scheduler.seed(corpus, output_mtime(corpus_json))
+    positions = {record["url"]: index for index, record in enumerate(corpus)}
+    updated, failed = [], 0
+    try:
+        for url in scheduler.plan(links + list(positions), budget):
+            try:
+                record = process_item(page, site, url)
+            except (PageLoadError, PlaywrightError) as e:
+                log.error(f"Revisiting {url} failed: {e}")
+                scheduler.fail(url)
+                failed += 1
+                continue
+            # Empty pages count as a check too, so a removed product is not retried first on every run.
+            scheduler.observe(record)
+            if is_empty_record(site, record["title"], record[site.desc_key]):
+                log.info(f"Skipping product at {url} because it has no text.")
+                continue
+            # Compared with the stored record itself, so a first check after seeding refreshes it too.
+            if url not in positions or content_hash(corpus[positions[url]]) != content_hash(record):
+                updated.append(record)
+                if url in positions:
+                    corpus[positions[url]] = record
+                else:
+                    positions[url] = len(corpus)
+                    corpus.append(record)
+    finally:
+        save_links_to_json(corpus, corpus_json)
+        scheduler.save()
+    log.info(f"{len(updated)} new or changed records saved to {corpus_json}, {failed} fetches failed.")
+    return updated
@@ -0,0 +1,308 @@
+"""
+Full-text search over the scraped {'url', 'title', 'desc'} outputs of every site.
+
+    python -m scraper.search index                      # every record file under the repository
+    python -m scraper.search index mototoazis/product_descriptions.json
+    python -m scraper.search query "arai bukósisak"
+    python -m scraper.search query "gore-tex" --site motoroazis --limit 20
+
+The index is an SQLite FTS5 table (bm25 ranking, title weighted above the
+description). Text is analysed before it reaches FTS5: lower-cased, accents folded
+(ő -> o, so 'bukosisak' finds 'bukósisak') and Hungarian case and plural suffixes
+stripped by a light stemmer ('bukósisakokat' and 'bukósisak' -> 'bukosis'). Queries go through
+the same analysis. Indexing is incremental: unchanged files are skipped by mtime and
+size, and unchanged records by a digest of their text, so re-indexing after a crawl
+only touches new and changed products. StreamConfig.search_index keeps the index
+up to date while the 'stream' stage runs.
+"""
+import argparse
+import hashlib
+import logging as log
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+
+from scraper.sites import SITES
+from scraper.storage import load_links_from_json
+
+DEFAULT_INDEX = "search_index.sqlite"
+
+# Length-preserving accent folding for Latin letters, so positions in the folded
+# text are positions in the original text too (used for snippets).
+FOLD_TABLE = {
+    code: unicodedata.normalize("NFD", chr(code))[0]
+    for code in range(0xC0, 0x250)
+    if unicodedata.normalize("NFD", chr(code))[0] != chr(code) and unicodedata.normalize("NFD", chr(code))[0].isascii()
+}
+
+# Case endings stripped before the plural, after folding, longest first. Only endings
+# of three or more letters: shorter ones ('-t', '-ra', '-on') end too many bare stems
+# ('kabat', 'kamera', 'motoron'). A suffix is only stripped if MIN_STEM letters remain.
+CASE_SUFFIXES = sorted({
+    "ban", "ben", "bol", "rol", "tol", "nak", "nek", "val", "vel", "hoz", "hez",
+    "nal", "nel", "ert", "kent",
+}, key=len, reverse=True)
+# Accusative endings recognised only where they cannot be part of the stem: after the
+# plural -k ('kabatokat', 'csizmakat') and with the linking vowel -o- ('kabatot').
+ACCUSATIVE_SUFFIXES = ("kat", "ket", "kot", "ot")
+VOWELS = "aeiou"
+MIN_STEM = 4
+# Bump when stem() changes, so existing indexes are analysed again (see SearchIndex).
+ANALYZER_VERSION = 2
+TOKEN_RE = re.compile(r"\w+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE NOT NULL,
+    site TEXT,
+    title TEXT,
+    desc TEXT,
+    digest TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(title, desc, tokenize='unicode61 remove_diacritics 2');
+CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, mtime REAL, size INTEGER);
+"""
+
+
+def fold(text: str) -> str:
+    return text.lower().translate(FOLD_TABLE)
+
+
+def stem(token: str) -> str:
+    """
+    Light Hungarian stemmer on folded tokens. Singular and plural forms get the same
+    stem: the case ending goes first, then the plural (vowel + k, which also covers the
+    lengthened a/e of 'csizmák' after folding), then a final vowel, so
+    'csizma', 'csizmák' and 'csizmákban' all become 'csizm', 'kabát' and 'kabátok'
+    'kabat', 'bukósisak' and 'bukósisakokat' 'bukosis'.
+    """
+    for suffix in CASE_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+            token = token[:-len(suffix)]
+            break
+    else:
+        for suffix in ACCUSATIVE_SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM:
+                # Keep the plural k of '-kat' for the next step.
+                token = token[:-2]
+                break
+    # At most twice: 'bukosisakok' -> 'bukosisak' -> 'bukosis', the same as the singular.
+    for _ in range(2):
+        if len(token) - 2 >= MIN_STEM and token.endswith("k") and token[-2] in VOWELS:
+            token = token[:-2]
+    if len(token) - 1 >= MIN_STEM and token[-1] in VOWELS:
+        token = token[:-1]
+    return token
+
+
+def analyze(text: str) -> str:
+    return " ".join(stem(token) for token in TOKEN_RE.findall(fold(text)))
+
+
+def build_query(query: str) -> str:
+    """
+    Turns user input into an FTS5 expression: every word must match, words joined
+    by punctuation ('gore-tex') become phrases and a trailing '*' keeps prefix search.
+    """
+    terms = []
+    for word in query.split():
+        tokens = analyze(word).split()
+        if tokens:
+            terms.append('"' + " ".join(tokens) + '"' + ("*" if word.endswith("*") else ""))
+    return " AND ".join(terms)
+
+
+def snippet(text: str, query: str, width: int = 160) -> str:
+    folded = fold(text)
+    positions = [folded.find(stem(token)) for token in TOKEN_RE.findall(fold(query))]
+    positions = [p for p in positions if p >= 0]
+    start = max(0, min(positions) - width // 4) if positions else 0
+    return ("…" if start else "") + " ".join(text[start:start + width].split()) + ("…" if start + width < len(text) else "")
+
+
+def digest(title: str, desc: str) -> str:
+    return hashlib.blake2b(f"{title}\0{desc}".encode("utf-8"), digest_size=12).hexdigest()
+
+
+# Files the site scripts write under names without the site prefix, in directories
+# shared by more than one site ('mototoazis' holds both the shop and the blog).
+SCRIPT_FILES = {
+    ("mototoazis", "blog_links_output.json"): "motoroazis_blog",
+    ("mototoazis", "blog_pages_links.json"): "motoroazis_blog",
+    ("mototoazis", "blog_pages_output.json"): "motoroazis_blog",
+    ("mototoazis", "blog_testing.json"): "motoroazis_blog",
+    ("mototoazis", "links_output.json"): "motoroazis",
+    ("mototoazis", "products_output.json"): "motoroazis",
+    ("mototoazis", "product_descriptions.json"): "motoroazis",
+}
+
+
+def site_for(path: str) -> str:
+    """
+    Returns the site of an output file: from its name ('totalbike_final_output.json',
+    the longest matching site name wins), from SCRIPT_FILES, or from its directory when
+    that is the output_dir of exactly one site. Otherwise the directory name is returned,
+    so files of a shared directory are never folded into one of its sites.
+    """
+    name = os.path.basename(path)
+    for site in sorted(SITES, key=len, reverse=True):
+        if name.startswith(site + "_"):
+            return site
+    directory = os.path.basename(os.path.dirname(os.path.abspath(path)))
+    script_file = (directory, name[:-3] if name.endswith(".gz") else name)
+    if script_file in SCRIPT_FILES:
+        return SCRIPT_FILES[script_file]
+    owners = [site.name for site in SITES.values() if (site.output_dir or site.name) == directory]
+    return owners[0] if len(owners) == 1 else directory
+
+
+class SearchIndex:
+    def __init__(self, path: str = DEFAULT_INDEX):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != ANALYZER_VERSION:
+            self._reanalyze()
+
+    def _reanalyze(self):
+        # The stored text is analysed again when the stemmer changed since the index was built.
+        with self.db:
+            self.db.execute("DELETE FROM docs_fts")
+            rows = self.db.execute("SELECT id, title, desc FROM docs").fetchall()
+            self.db.executemany("INSERT INTO docs_fts (rowid, title, desc) VALUES (?, ?, ?)",
+                                ((doc_id, analyze(title or ""), analyze(desc or "")) for doc_id, title, desc in rows))
+            self.db.execute(f"PRAGMA user_version = {ANALYZER_VERSION}")
+        if rows:
+            log.info(f"Analysed {len(rows)} indexed records again with the current stemmer.")
+
+    def add(self, records: list, site: str) -> int:
+        """
+        Adds or updates records ({'url', 'title', 'desc'} dicts, 'text' is accepted for
+        'desc', or Record objects). Returns the number of new or changed records.
+        """
+        changed = 0
+        with self.db:
+            for record in records:
+                if not isinstance(record, dict):
+                    record = record.to_dict()
+                url = record.get("url")
+                if not url:
+                    continue
+                title = record.get("title") or ""
+                desc = record.get("desc") or record.get("text") or ""
+                new_digest = digest(title, desc)
+                row = self.db.execute("SELECT id, digest FROM docs WHERE url = ?", (url,)).fetchone()
+                if row and row[1] == new_digest:
+                    continue
+                if row:
+                    self.db.execute("UPDATE docs SET site = ?, title = ?, desc = ?, digest = ? WHERE id = ?",
+                                    (site, title, desc, new_digest, row[0]))
+                    self.db.execute("DELETE FROM docs_fts WHERE rowid = ?", (row[0],))
+                    doc_id = row[0]
+                else:
+                    doc_id = self.db.execute("INSERT INTO docs (url, site, title, desc, digest) VALUES (?, ?, ?, ?, ?)",
+                                             (url, site, title, desc, new_digest)).lastrowid
+                self.db.execute("INSERT INTO docs_fts (rowid, title, desc) VALUES (?, ?, ?)",
+                                (doc_id, analyze(title), analyze(desc)))
+                changed += 1
+        return changed
+
+    def index_file(self, path: str, site: str = None) -> int:
+        """
+        Indexes one JSON output file unless it is unchanged since the last run.
+        Files that do not hold a list of records are remembered and skipped.
+        """
+        stat = os.stat(path)
+        key = os.path.abspath(path)
+        row = self.db.execute("SELECT mtime, size FROM sources WHERE path = ?", (key,)).fetchone()
+        if row and row[0] == stat.st_mtime and row[1] == stat.st_size:
+            return 0
+        try:
+            data = load_links_from_json(path)
+        except ValueError:
+            data = None
+        changed = 0
+        if isinstance(data, list) and data and isinstance(data[0], dict) and "url" in data[0]:
+            changed = self.add(data, site or site_for(path))
+            log.info(f"Indexed {path}: {changed} new or changed of {len(data)} records.")
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO sources (path, mtime, size) VALUES (?, ?, ?)",
+                            (key, stat.st_mtime, stat.st_size))
+        return changed
+
+    def search(self, query: str, site: str = None, limit: int = 10) -> list[dict]:
+        """
+        Returns the best matching records, best first, with a short snippet around the match.
+        """
+        expression = build_query(query)
+        if not expression:
+            return []
+        sql = ("SELECT docs.url, docs.site, docs.title, docs.desc, bm25(docs_fts, 5.0, 1.0) AS score "
+               "FROM docs_fts JOIN docs ON docs.id = docs_fts.rowid WHERE docs_fts MATCH ?")
+        params = [expression]
+        if site:
+            sql += " AND docs.site = ?"
+            params.append(site)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        return [
+            {"url": url, "site": site_name, "title": title, "score": -score, "snippet": snippet(desc, query)}
+            for url, site_name, title, desc, score in self.db.execute(sql, params)
+        ]
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT count(*) FROM docs").fetchone()[0]
+
+    def close(self):
+        self.db.close()
+
+
+def find_output_files(root: str = ".") -> list[str]:
+    """
+    JSON files (plain, .json.gz and rotated segments) in the output directories of the
+    configured sites under `root`. Other directories (soak and fixture runs, analytics,
+    tests) are not site outputs and are left out.
+    """
+    files = []
+    for directory in sorted({site.output_dir or site.name for site in SITES.values()}):
+        path = os.path.join(root, directory)
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)) if name.endswith((".json", ".json.gz")))
+    return files
+
+
+def main(argv=None):
+    log.basicConfig(level=log.INFO)
+    parser = argparse.ArgumentParser(prog="python -m scraper.search", description="Full-text search over the scraped records.")
+    parser.add_argument("--db", default=DEFAULT_INDEX, help="SQLite index file.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    index = commands.add_parser("index", help="Add new and changed records to the index.")
+    index.add_argument("files", nargs="*", help="JSON record files (default: every site directory).")
+    query = commands.add_parser("query", help="Search the index.")
+    query.add_argument("text")
+    query.add_argument("--site")
+    query.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    search_index = SearchIndex(args.db)
+    try:
+        if args.command == "index":
+            started = time.perf_counter()
+            changed = sum(search_index.index_file(path) for path in args.files or find_output_files())
+            log.info(f"{changed} records updated in {time.perf_counter() - started:.1f}s, {len(search_index)} in the index.")
+            return
+        started = time.perf_counter()
+        results = search_index.search(args.text, args.site, args.limit)
+        elapsed = (time.perf_counter() - started) * 1000
+        for rank, result in enumerate(results, 1):
+            print(f"{rank:2d}. [{result['site']}] {result['title']}\n    {result['url']}\n    {result['snippet']}")
+        print(f"{len(results)} results in {elapsed:.1f}ms")
+    finally:
+        search_index.close()
+
+
+if __name__ == "__main__":
+    main()
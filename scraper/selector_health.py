@@ -0,0 +1,283 @@
+"""
+Online health check of the CSS selectors in SiteConfig.selectors.
+
+Long positional selectors (motoroazis product_title, motozem pagination_last_page with
+li:nth-child(7), ...) silently return nothing once a site changes its layout. The
+monitor keeps, per selector key, whether the last `window` extractions found anything
+and trips when the empty rate of the window reaches `max_empty_rate` and exceeds the
+rate seen before the window by `min_increase` (so fields that are often legitimately
+empty, like some motoroazis descriptions, do not trip it). On a trip it:
+   - looks for alternative selectors on the current page, using a fingerprint (tag,
+     id, classes, itemprop) of an element the selector matched earlier in the run,
+   - saves a report to <output_dir>/<site>_selector_health.json,
+   - raises SelectorHealthError ('abort'), or waits `pause_seconds` and starts a new
+     window ('pause'), aborting after `max_pauses` pauses. In the streaming pipeline the
+     pause holds every detail worker, not only the one that tripped.
+Enable it with --selector-health abort|pause (or enable(site)).
+"""
+import asyncio
+import logging as log
+import os
+import time
+from collections import deque
+
+from scraper.sites import SiteConfig, selector_chain
+from scraper.storage import save_links_to_json
+
+FINGERPRINT_JS = """el => ({
+    tag: el.tagName.toLowerCase(),
+    id: el.id || null,
+    classes: [...el.classList],
+    itemprop: el.getAttribute('itemprop'),
+})"""
+
+# Scores every element of the page against the fingerprint and returns the best
+# candidates with a short selector that still matches few elements and has text.
+SUGGEST_JS = """fp => {
+    const shortSelector = el => {
+        const tag = el.tagName.toLowerCase();
+        if (el.id) return '#' + CSS.escape(el.id);
+        const itemprop = el.getAttribute('itemprop');
+        if (itemprop) return `${tag}[itemprop="${itemprop}"]`;
+        return tag + [...el.classList].map(c => '.' + CSS.escape(c)).join('');
+    };
+    const scored = [];
+    for (const el of document.body.querySelectorAll('*')) {
+        let score = 0;
+        if (el.tagName.toLowerCase() === fp.tag) score += 2;
+        if (fp.id && el.id === fp.id) score += 3;
+        if (fp.itemprop && el.getAttribute('itemprop') === fp.itemprop) score += 3;
+        for (const c of fp.classes || []) if (el.classList.contains(c)) score += 1;
+        if (score < 2) continue;
+        const text = (el.innerText || el.getAttribute('href') || '').trim();
+        if (!text) continue;
+        scored.push([score, el, text]);
+    }
+    scored.sort((a, b) => b[0] - a[0]);
+    const seen = new Set(), out = [];
+    for (const [score, el, text] of scored) {
+        const selector = shortSelector(el);
+        if (seen.has(selector)) continue;
+        seen.add(selector);
+        const matches = document.querySelectorAll(selector).length;
+        if (matches > fp.maxMatches) continue;
+        out.push({selector, score, matches, sample: text.slice(0, 80)});
+        if (out.length >= 5) break;
+    }
+    return out;
+}"""
+
+# Used when a selector never matched during the run.
+DEFAULT_FINGERPRINTS = {
+    "product_title": {"tag": "h1", "itemprop": "name"},
+    "product_desc": {"tag": "div", "itemprop": "description"},
+    "product": {"tag": "a"},
+    "pagination_last_page": {"tag": "a", "classes": ["page-link"]},
+}
+
+# Selector keys that match one element on a page; others (product links) match many.
+SINGLE_ELEMENT = ("product_title", "product_desc", "pagination_last_page")
+
+monitor = None
+
+
+class SelectorHealthError(RuntimeError):
+    pass
+
+
+class SelectorMonitor:
+    def __init__(self, site: SiteConfig, action: str = "abort", window: int = 200, min_samples: int = 30,
+                 max_empty_rate: float = 0.6, min_increase: float = 0.3, pause_seconds: float = 300.0,
+                 max_pauses: int = 3):
+        if action not in ("abort", "pause"):
+            raise ValueError(f"Unknown action '{action}', use 'abort' or 'pause'")
+        self.site = site
+        self.action = action
+        self.window = window
+        self.min_samples = min_samples
+        self.max_empty_rate = max_empty_rate
+        self.min_increase = min_increase
+        self.pause_seconds = pause_seconds
+        self.max_pauses = max_pauses
+        self.pauses = 0
+        self.recent = {}
+        # Hits and observations that have left the window.
+        self.history = {}
+        self.fingerprints = {}
+        # Set while the async workers may run; cleared during a pause.
+        self.gate = None
+        self.gate_loop = None
+
+    def async_gate(self) -> asyncio.Event:
+        """
+        The event the async workers wait on, created in the running loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self.gate_loop is not loop:
+            self.gate, self.gate_loop = asyncio.Event(), loop
+            self.gate.set()
+        return self.gate
+
+    def record(self, key: str, hit: bool):
+        recent = self.recent.setdefault(key, deque(maxlen=self.window))
+        if len(recent) == self.window:
+            hits, total = self.history.get(key, (0, 0))
+            self.history[key] = (hits + recent[0], total + 1)
+        recent.append(hit)
+
+    def empty_rate(self, key: str) -> float:
+        recent = self.recent.get(key)
+        return 1 - sum(recent) / len(recent) if recent else 0.0
+
+    def baseline_rate(self, key: str) -> float:
+        hits, total = self.history.get(key, (0, 0))
+        return 1 - hits / total if total else 0.0
+
+    def unhealthy(self) -> list[str]:
+        return [
+            key for key, recent in self.recent.items()
+            if len(recent) >= self.min_samples
+            and self.empty_rate(key) >= self.max_empty_rate
+            and self.empty_rate(key) - self.baseline_rate(key) >= self.min_increase
+        ]
+
+    def needs_fingerprint(self, key: str, hit: bool) -> bool:
+        return hit and key not in self.fingerprints
+
+    def suggestion_args(self, key: str) -> dict:
+        fingerprint = dict(self.fingerprints.get(key) or DEFAULT_FINGERPRINTS.get(key, {"tag": "div"}))
+        fingerprint["maxMatches"] = 3 if key in SINGLE_ELEMENT else 200
+        return fingerprint
+
+    def report(self, url: str, keys: list[str], suggestions: dict) -> str:
+        """
+        Logs and saves the state of the tripped selectors, returns the error message.
+        """
+        report = {
+            "site": self.site.name,
+            "url": url,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "action": self.action,
+            "selectors": {
+                key: {
+                    "selector": self.site.selectors.get(key),
+                    "empty_rate": round(self.empty_rate(key), 3),
+                    "baseline_rate": round(self.baseline_rate(key), 3),
+                    "window": len(self.recent[key]),
+                    "fingerprint": self.fingerprints.get(key),
+                    "suggestions": suggestions.get(key, []),
+                }
+                for key in keys
+            },
+        }
+        path = os.path.join(self.site.output_dir or self.site.name, f"{self.site.name}_selector_health.json")
+        save_links_to_json(report, path)
+        lines = [f"{key}: {self.empty_rate(key):.0%} empty in the last {len(self.recent[key])} pages "
+                 f"(before: {self.baseline_rate(key):.0%}); suggestions: "
+                 + (", ".join(s["selector"] for s in suggestions.get(key, [])) or "none")
+                 for key in keys]
+        message = f"Selectors of {self.site.name} look broken on {url}:\n" + "\n".join(lines) + f"\nReport: {path}"
+        log.error(message)
+        return message
+
+    def should_abort(self) -> bool:
+        """
+        Called after a trip: True when the run must stop, otherwise starts a new window.
+        """
+        if self.action == "abort" or self.pauses >= self.max_pauses:
+            return True
+        self.pauses += 1
+        for recent in self.recent.values():
+            recent.clear()
+        log.info(f"Pausing {self.site.name} for {self.pause_seconds:.0f}s ({self.pauses}/{self.max_pauses}).")
+        return False
+
+
+def observe(page, site: SiteConfig, fields: dict):
+    """
+    Records the extracted values (text, list or number; empty/falsy means a miss) of
+    the selector keys in `fields` for the page that is currently loaded.
+    """
+    if monitor is None or monitor.site.name != site.name:
+        return
+    for key, value in fields.items():
+        hit = bool(value)
+        monitor.record(key, hit)
+        if monitor.needs_fingerprint(key, hit):
+            for css in selector_chain(site.selectors[key]):
+                if page.query_selector(css):
+                    monitor.fingerprints[key] = page.eval_on_selector(css, FINGERPRINT_JS)
+                    break
+    keys = monitor.unhealthy()
+    if not keys:
+        return
+    suggestions = {}
+    for key in keys:
+        try:
+            suggestions[key] = page.evaluate(SUGGEST_JS, monitor.suggestion_args(key))
+        except Exception as e:
+            log.error(f"Could not look for alternatives to {key}: {e}")
+    message = monitor.report(page.url, keys, suggestions)
+    if monitor.should_abort():
+        raise SelectorHealthError(message)
+    time.sleep(monitor.pause_seconds)
+
+
+async def wait_async(site: SiteConfig):
+    """
+    Returns once no pause of the selector health check of `site` is in progress.
+    """
+    if monitor is not None and monitor.site.name == site.name:
+        await monitor.async_gate().wait()
+
+
+async def observe_async(page, site: SiteConfig, fields: dict):
+    """
+    Async counterpart of observe. A pause closes the monitor's gate, so all workers
+    calling wait_async or observe_async wait for it, not only the one that tripped.
+    """
+    if monitor is None or monitor.site.name != site.name:
+        return
+    gate = monitor.async_gate()
+    await gate.wait()
+    for key, value in fields.items():
+        hit = bool(value)
+        monitor.record(key, hit)
+        if monitor.needs_fingerprint(key, hit):
+            for css in selector_chain(site.selectors[key]):
+                if await page.query_selector(css):
+                    monitor.fingerprints[key] = await page.eval_on_selector(css, FINGERPRINT_JS)
+                    break
+    keys = monitor.unhealthy()
+    if not keys:
+        return
+    if not gate.is_set():
+        # Another worker tripped while this one was recording and pauses for everyone.
+        await gate.wait()
+        return
+    gate.clear()
+    try:
+        suggestions = {}
+        for key in keys:
+            try:
+                suggestions[key] = await page.evaluate(SUGGEST_JS, monitor.suggestion_args(key))
+            except Exception as e:
+                log.error(f"Could not look for alternatives to {key}: {e}")
+        message = monitor.report(page.url, keys, suggestions)
+        if monitor.should_abort():
+            raise SelectorHealthError(message)
+        await asyncio.sleep(monitor.pause_seconds)
+    finally:
+        gate.set()
+
+
+def enable(site: SiteConfig, **options) -> SelectorMonitor:
+    global monitor
+    monitor = SelectorMonitor(site, **options)
+    log.info(f"Monitoring the selectors of {site.name} ({monitor.action} on failure)")
+    return monitor
+
+
+def disable():
+    global monitor
+    monitor = None
@@ -0,0 +1,244 @@
+"""
+Per-site browser sessions that start warm.
+
+A fresh context gets the cookie consent banner, the first-visit redirects and cold JS
+bundles on its first pages. bootstrap() does the first visit once per site: it opens
+the home page, accepts the consent banner and saves the context's storage_state
+(cookies and localStorage) to <output_dir>/.session/<site>_state.json. Every context
+opened with open_context() starts from that state. The state is refreshed after
+`max_age_hours`.
+
+With `asset_cache` the large scripts, stylesheets and fonts are also served from a
+disk cache shared by all contexts, <output_dir>/.session/<site>_cache/, instead of
+being downloaded again by each context. Only responses the server allows to be cached
+(Cache-Control, no Set-Cookie) and of at least `min_bytes` are stored, for as long as
+their max-age allows. The cache is off by default: routing requests through Python
+turns off the browser's own HTTP cache for the whole context and passes every cached
+body through the Playwright driver, so it only pays off where
+benchmarks/bench_asset_cache.py measures that it does (large bundles, many
+short-lived contexts).
+
+    python -m scraper motoroazis products --session
+    python -m scraper motoroazis products --session --asset-cache
+"""
+import asyncio
+import hashlib
+import json
+import logging as log
+import os
+import re
+import time
+
+from scraper.sites import SiteConfig
+
+# Tried in order when the site has no extra['consent_selector'].
+CONSENT_SELECTORS = (
+    "#CybotCookiebotDialogBodyLevelButtonLevelOptinAllowAll",
+    "#onetrust-accept-btn-handler",
+    "button:has-text('Elfogadom')",
+    "button:has-text('Összes elfogadása')",
+    "button:has-text('Mindet elfogadom')",
+    "a:has-text('Elfogadom')",
+    "button:has-text('Accept all')",
+)
+
+# Only these requests go through the cache: scripts, stylesheets and fonts are shared by
+# every page of a site. Documents, API calls and images (different on most product pages)
+# are never routed.
+STATIC_URL = re.compile(r"\.(js|css|woff2?|ttf|otf)(\?[^#]*)?$", re.IGNORECASE)
+CACHED_TYPES = ("script", "stylesheet", "font")
+# Cache-Control directives that forbid reusing a response without asking the server.
+UNCACHEABLE = ("no-store", "no-cache", "private")
+MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def session_paths(site: SiteConfig) -> tuple[str, str]:
+    directory = os.path.join(site.output_dir or site.name, ".session")
+    return os.path.join(directory, f"{site.name}_state.json"), os.path.join(directory, f"{site.name}_cache")
+
+
+def _is_fresh(path: str, max_age_hours: float) -> bool:
+    return os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age_hours * 3600
+
+
+def _consent_selectors(site: SiteConfig) -> tuple:
+    custom = site.extra.get("consent_selector")
+    return ((custom,) if custom else ()) + CONSENT_SELECTORS
+
+
+class AssetCache:
+    """
+    Disk cache of large static responses shared by all contexts of a site.
+    URLs whose response was not stored (too small, not cacheable) are remembered and
+    left to the browser from then on.
+    """
+
+    def __init__(self, directory: str, max_age_hours: float = 24.0, min_bytes: int = 16 * 1024):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_age = max_age_hours * 3600
+        self.min_bytes = min_bytes
+        self.skipped = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + ".json"), os.path.join(self.directory, key + ".body")
+
+    def lifetime(self, status: int, headers: dict, body: bytes) -> float:
+        """
+        Seconds the response may be served from the cache; 0 when it must not be stored.
+        """
+        cache_control = headers.get("cache-control", "").lower()
+        if status != 200 or len(body) < self.min_bytes or "set-cookie" in headers:
+            return 0
+        if any(directive in cache_control for directive in UNCACHEABLE) or headers.get("vary", "").strip() == "*":
+            return 0
+        max_age = MAX_AGE.search(cache_control)
+        return min(int(max_age.group(1)), self.max_age) if max_age else self.max_age
+
+    def load(self, url: str):
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if time.time() > meta["expires"]:
+                return None
+            with open(body_path, "rb") as f:
+                return meta["status"], meta["headers"], f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, url: str, status: int, headers: dict, body: bytes) -> bool:
+        """
+        Stores the response if it may be cached; returns whether it was.
+        """
+        lifetime = self.lifetime(status, headers, body)
+        if not lifetime:
+            return False
+        meta_path, body_path = self._paths(url)
+        headers = {k: v for k, v in headers.items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+        with open(body_path + ".tmp", "wb") as f:
+            f.write(body)
+        os.replace(body_path + ".tmp", body_path)
+        # The metadata is written last, so a body without it is never served.
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"url": url, "status": status, "headers": headers, "expires": time.time() + lifetime}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+        return True
+
+    def _routed(self, request) -> bool:
+        return request.method == "GET" and request.resource_type in CACHED_TYPES and request.url not in self.skipped
+
+    def handle(self, route):
+        request = route.request
+        if not self._routed(request):
+            return route.fallback()
+        cached = self.load(request.url)
+        if cached:
+            self.hits += 1
+            return route.fulfill(status=cached[0], headers=cached[1], body=cached[2])
+        self.misses += 1
+        response = route.fetch()
+        route.fulfill(response=response)
+        if not self.store(request.url, response.status, response.headers, response.body()):
+            self.skipped.add(request.url)
+
+    async def handle_async(self, route):
+        """
+        Async counterpart of handle; the disk reads and writes run in a worker thread.
+        """
+        request = route.request
+        if not self._routed(request):
+            return await route.fallback()
+        cached = await asyncio.to_thread(self.load, request.url)
+        if cached:
+            self.hits += 1
+            return await route.fulfill(status=cached[0], headers=cached[1], body=cached[2])
+        self.misses += 1
+        response = await route.fetch()
+        await route.fulfill(response=response)
+        body = await response.body()
+        if not await asyncio.to_thread(self.store, request.url, response.status, response.headers, body):
+            self.skipped.add(request.url)
+
+
+def bootstrap(browser, site: SiteConfig, max_age_hours: float = 24.0, force: bool = False) -> str:
+    """
+    Visits the site once, accepts the consent banner and saves the storage state.
+    Returns the state file; a fresh existing state is reused without visiting anything.
+    """
+    state_file, _ = session_paths(site)
+    if not force and _is_fresh(state_file, max_age_hours):
+        return state_file
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    started = time.perf_counter()
+    context = browser.new_context()
+    try:
+        page = context.new_page()
+        page.goto(site.base_url, timeout=site.timeout, wait_until="load")
+        for selector in _consent_selectors(site):
+            button = page.query_selector(selector)
+            if button and button.is_visible():
+                button.click()
+                page.wait_for_load_state("load")
+                log.info(f"Accepted the consent banner of {site.name} with {selector}")
+                break
+        context.storage_state(path=state_file)
+    finally:
+        context.close()
+    log.info(f"Bootstrapped the {site.name} session in {time.perf_counter() - started:.1f}s: {state_file}")
+    return state_file
+
+
+async def bootstrap_async(browser, site: SiteConfig, max_age_hours: float = 24.0, force: bool = False) -> str:
+    """
+    Async counterpart of bootstrap.
+    """
+    state_file, _ = session_paths(site)
+    if not force and _is_fresh(state_file, max_age_hours):
+        return state_file
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    started = time.perf_counter()
+    context = await browser.new_context()
+    try:
+        page = await context.new_page()
+        await page.goto(site.base_url, timeout=site.timeout, wait_until="load")
+        for selector in _consent_selectors(site):
+            button = await page.query_selector(selector)
+            if button and await button.is_visible():
+                await button.click()
+                await page.wait_for_load_state("load")
+                log.info(f"Accepted the consent banner of {site.name} with {selector}")
+                break
+        await context.storage_state(path=state_file)
+    finally:
+        await context.close()
+    log.info(f"Bootstrapped the {site.name} session in {time.perf_counter() - started:.1f}s: {state_file}")
+    return state_file
+
+
+def open_context(browser, site: SiteConfig, max_age_hours: float = 24.0, asset_cache: bool = False):
+    """
+    Returns a new context seeded with the site's session state, and with `asset_cache`
+    its shared disk cache of large static assets.
+    """
+    state_file = bootstrap(browser, site, max_age_hours)
+    context = browser.new_context(storage_state=state_file)
+    if asset_cache:
+        _, cache_dir = session_paths(site)
+        context.route(STATIC_URL, AssetCache(cache_dir, max_age_hours).handle)
+    return context
+
+
+async def open_context_async(browser, site: SiteConfig, max_age_hours: float = 24.0, asset_cache: bool = False):
+    """
+    Async counterpart of open_context.
+    """
+    state_file = await bootstrap_async(browser, site, max_age_hours)
+    context = await browser.new_context(storage_state=state_file)
+    if asset_cache:
+        _, cache_dir = session_paths(site)
+        await context.route(STATIC_URL, AssetCache(cache_dir, max_age_hours).handle_async)
+    return context
@@ -0,0 +1,217 @@
+from dataclasses import dataclass, field
+from typing import Union
+
+# A selector is either a single CSS selector or a fallback chain that is tried in order.
+Selector = Union[str, tuple]
+
+
+@dataclass(frozen=True)
+class SiteConfig:
+    """
+    Everything that differs between the shops and blogs we scrape.
+    The shared pipeline in scraper.pipeline only reads from this object,
+    so adding a new site means adding one entry to SITES.
+
+    Selector keys used by the pipeline:
+       - main_menu: links to the category pages,
+       - pagination: container that is present when a listing has more pages,
+       - pagination_last_page: element holding the last page number,
+       - product: links to the detail pages on a listing page,
+       - product_title / product_desc: fields extracted from a detail page.
+    """
+    name: str
+    base_url: str
+    selectors: dict
+    # Query parameter used for pagination: 'page', 'iPage', 'p', ...
+    page_param: str = "page"
+    # Lowest page number of a listing (totalbike counts from 0).
+    first_page: int = 1
+    # Appended after the query string, e.g. '#filter-anchor'.
+    page_suffix: str = ""
+    # How listing pages are discovered: 'last_page', 'anchors', 'fixed' or 'none'.
+    pagination_mode: str = "last_page"
+    # Where the last page number comes from: 'href' (?page=N) or 'text' (inner text).
+    last_page_from: str = "href"
+    fixed_last_page: int = 1
+    # Prefixes for relative hrefs found in the menu and on listing pages.
+    menu_prefix: str = ""
+    link_prefix: str = ""
+    # Listing hrefs wrap the real URL in a tracking redirect (see urls.unwrap_redirect).
+    unwrap_redirects: bool = False
+    # Join the text of every matched element instead of taking the first one.
+    join_desc_parts: bool = False
+    # How the description is read: 'inner_text' (rendered text) or 'text_content'
+    # (every text node, hidden ones included).
+    desc_from: str = "inner_text"
+    # Key the description is saved under in the records ('text' in the blog's outputs).
+    desc_key: str = "desc"
+    # Skip detail pages when the description is empty.
+    skip_empty_desc: bool = False
+    # Skip listing pages on which the product selector is missing.
+    require_product_selector: bool = False
+    # Log and skip detail pages that fail to load instead of stopping the run.
+    skip_load_errors: bool = False
+    # Read title/desc from JSON-LD or microdata first (see scraper.structured); the selectors
+    # are only queried for missing fields. Adds sku, brand and offer fields and 'source' to
+    # the records. Off by default (records keep the baseline fields), --structured-data.
+    structured_data: bool = False
+    timeout: int = 100000
+    # Extra seconds to wait after 'load' for sites that render text late.
+    settle_delay: float = 0.0
+    output_dir: str = ""
+    extra: dict = field(default_factory=dict)
+
+
+SITES = {
+    "pardi": SiteConfig(
+        name="pardi",
+        base_url="https://pardi.hu/shop/index.php",
+        selectors={
+            'main_menu': 'ul.menu.top-level-menu a',
+            'product': 'div.button-container a',
+            'product_title': '#prod_name',
+            'product_desc': 'div.rte',
+        },
+        pagination_mode="none",
+        menu_prefix="https://pardi.hu/shop/",
+        require_product_selector=True,
+        settle_delay=2.0,
+        output_dir="pardi",
+    ),
+    "jaszmotor": SiteConfig(
+        name="jaszmotor",
+        base_url="https://jaszmotor.hu/",
+        selectors={
+            'product': 'h3.name a',
+            'product_title': '#top-and-menu > div > div > div.col-xs-12.col-sm-12.col-md-9.homebanner-holderr > div.productnew > div.row.wow_.fadeInUp_.single-product.p > h3',
+            'product_desc': 'span.prtext',
+            'pagination': '#top-and-menu > div > div > div.col-xs-12.col-sm-12.col-md-9.homebanner-holderr > div.search-result-container > div.col.col-sm-6.col-md-6.text-right > div',
+        },
+        pagination_mode="anchors",
+        link_prefix="https://jaszmotor.hu/",
+        desc_from="text_content",
+        settle_delay=2.0,
+        output_dir="jaszmotor",
+    ),
+    "motozem": SiteConfig(
+        name="motozem",
+        base_url="https://www.motozem.hu/",
+        selectors={
+            'pagination': 'div.pagination.d-flex.flex-column',
+            'pagination_last_page': 'body > section.container-fluid.products-category > div.pagination.d-flex.flex-column > div.JSPaginationContent > div > ul > li:nth-child(7)',
+            'product': 'a.single-product-main',
+            'product_title': 'div.product-header h1',
+            'product_desc': 'div.info-containers *',
+        },
+        page_param="iPage",
+        page_suffix="#filter-anchor",
+        last_page_from="text",
+        join_desc_parts=True,
+        settle_delay=2.0,
+        output_dir="motozem",
+    ),
+    "motoroazis": SiteConfig(
+        name="motoroazis",
+        base_url="https://www.motoroazis.hu/",
+        selectors={
+            'main_menu': '#category-nav a.nav-link',
+            'product': '#snapshot_vertical a.img-thumbnail-link',
+            'pagination_last_page': 'a.page-link.page-last',
+            'pagination': 'ul.pagination.m-0',
+            'product_desc': 'span.product-desc',
+            'product_title': '#product > div > div > div.col-12.col-md-6.product-page-left > h1',
+        },
+        skip_empty_desc=True,
+        skip_load_errors=True,
+        output_dir="mototoazis",
+    ),
+    "motoroazis_blog": SiteConfig(
+        name="motoroazis_blog",
+        base_url="https://www.motoroazis.hu/blog",
+        selectors={
+            'pagination_last_page': 'a.page-link.page-last',
+            'pagination': 'ul.pagination.m-0',
+            'product': 'h5.card-title a',
+            'product_title': '#body > div.page-wrap > main > div > div > section > div > div.page-head > h1',
+            'product_desc': 'div.information-item-description *',
+        },
+        link_prefix="https://www.motoroazis.hu",
+        join_desc_parts=True,
+        desc_key="text",
+        skip_load_errors=True,
+        settle_delay=2.0,
+        output_dir="mototoazis",
+    ),
+    "tornadohelmets": SiteConfig(
+        name="tornadohelmets",
+        base_url="https://www.tornadohelmets.hu/",
+        selectors={
+            'main_menu': '#category-nav a.nav-link',
+            'pagination': 'ul.pagination.m-0',
+            'pagination_last_page': 'a.page-link.page-last',
+            'product': 'a.btn.btn-outline-primary',
+            'product_title': 'span.product-page-product-name',
+            'product_desc': (
+                '#productcustomcontent-wrapper div.module-body',
+                '#tab-productdescriptionnoparameters',
+                'td.param-value.product-short-description',
+            ),
+        },
+        settle_delay=2.0,
+        output_dir="tornadohelmets",
+    ),
+    "totalbike": SiteConfig(
+        name="totalbike",
+        base_url="https://totalbike.hu/technika/nepperuzo/",
+        selectors={
+            'last_page': 'body > div.container.border.rovat-container > div.cikk-torzs > div > nav > ul > li:nth-child(5) > a',
+            'product': 'div.blog-poszt > h2 > a',
+            'post_link_other': 'h4.cim a',
+            'product_title': '#content > div.cikk-header-container > div > div > div > h1 > span',
+            'product_desc': 'div.cikk-torzs',
+        },
+        page_param="p",
+        first_page=0,
+        pagination_mode="fixed",
+        fixed_last_page=22,
+        unwrap_redirects=True,
+        settle_delay=2.0,
+        output_dir="totalbike",
+    ),
+}
+
+
+def get_site(name: str) -> SiteConfig:
+    """
+    Returns the SiteConfig registered under `name`.
+    Raises ValueError listing the known sites if the name is unknown.
+    """
+    if name not in SITES:
+        raise ValueError(f"Unknown site '{name}'. Known sites: {', '.join(sorted(SITES))}")
+    return SITES[name]
+
+
+def site_from_dict(data: dict) -> SiteConfig:
+    """
+    Rebuilds a SiteConfig from dataclasses.asdict() output that went through JSON.
+    """
+    return SiteConfig(**data)
+
+
+def is_empty_record(site: SiteConfig, title: str, desc: str) -> bool:
+    """
+    True for records that are not saved: the title and the description are both blank,
+    or, with site.skip_empty_desc, the description is.
+    """
+    if not desc.strip() and not title.strip():
+        return True
+    return site.skip_empty_desc and not desc.strip()
+
+
+def selector_chain(selector: Selector) -> tuple:
+    """
+    Normalises a selector entry to a tuple of fallbacks.
+    """
+    if isinstance(selector, str):
+        return (selector,)
+    return tuple(selector)
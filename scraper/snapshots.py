@@ -0,0 +1,149 @@
+"""
+Screenshots and DOM snapshots for debugging, taken from the page that was scraped.
+
+The scraping code calls capture(page, url, reason) (or capture_async) while `page` still
+shows what the scraper saw, before it is closed or reused. This costs a random number
+and nothing else when no snapshot is due or the service is disabled. Otherwise the
+full-page screenshot and the serialised DOM are read from the page itself, so a
+failure is recorded as it happened rather than as a later reload shows it. Compression
+and disk writes run in a thread pool, and once `quota_bytes` are used up further
+snapshots are dropped. Reasons:
+   - 'sample': taken for a random `sample_rate` share of the calls,
+   - 'error' / 'empty': always taken (extraction failed or found no text).
+When `queue_size` snapshots are already waiting for the encoders a new one is dropped
+instead of slowing the caller down. The network traffic of the page is not part of a
+snapshot; run with --archive to keep the responses.
+
+Enable it for a run with --snapshots DIR (or enable(DIR)). Every snapshot is listed
+in DIR/index.tsv.
+"""
+import gzip
+import logging as log
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+service = None
+
+
+class SnapshotService:
+    def __init__(self, directory: str, sample_rate: float = 0.01, quota_bytes: int = 500 * 1024 * 1024,
+                 encoders: int = 2, queue_size: int = 64):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.quota_bytes = quota_bytes
+        self.queue_size = queue_size
+        self.lock = threading.Lock()
+        self.used = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+        self.pending = 0
+        self.taken = 0
+        self.dropped = 0
+        self.encoder = ThreadPoolExecutor(encoders, thread_name_prefix="snapshot-encoder")
+
+    def due(self, reason: str) -> bool:
+        """
+        Whether a snapshot for `reason` should be taken now; counts the dropped ones.
+        """
+        if reason == "sample" and random.random() >= self.sample_rate:
+            return False
+        with self.lock:
+            if self.used >= self.quota_bytes or self.pending >= self.queue_size:
+                self.dropped += 1
+                return False
+            return True
+
+    def capture(self, page, url: str, reason: str = "sample"):
+        """
+        Takes a snapshot of `page` (showing `url`) if one is due and hands it to the encoders.
+        """
+        if not self.due(reason):
+            return
+        try:
+            png = page.screenshot(full_page=True)
+            dom = page.content()
+        except Exception as e:
+            log.error(f"Could not snapshot {url}: {e}")
+            return
+        self.submit(url, reason, png, dom)
+
+    async def capture_async(self, page, url: str, reason: str = "sample"):
+        """
+        Async counterpart of capture.
+        """
+        if not self.due(reason):
+            return
+        try:
+            png = await page.screenshot(full_page=True)
+            dom = await page.content()
+        except Exception as e:
+            log.error(f"Could not snapshot {url}: {e}")
+            return
+        self.submit(url, reason, png, dom)
+
+    def submit(self, url: str, reason: str, png: bytes, dom: str):
+        with self.lock:
+            self.pending += 1
+        self.encoder.submit(self._store, url, reason, png, dom)
+
+    def _store(self, url: str, reason: str, png: bytes, dom: str):
+        try:
+            self._write(url, reason, png, dom)
+        except Exception as e:
+            log.error(f"Could not save the snapshot of {url}: {e}")
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    def _write(self, url: str, reason: str, png: bytes, dom: str):
+        html = gzip.compress(dom.encode("utf-8"), compresslevel=6)
+        with self.lock:
+            if self.used + len(png) + len(html) > self.quota_bytes:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    log.info(f"Snapshot quota of {self.quota_bytes // 2**20} MB reached, dropped {self.dropped} snapshots.")
+                return
+            self.used += len(png) + len(html)
+            self.taken += 1
+            name = f"{self.taken:05d}_{reason}_{re.sub(r'[^A-Za-z0-9]+', '_', url)[-80:]}"
+        with open(os.path.join(self.directory, name + ".png"), "wb") as f:
+            f.write(png)
+        with open(os.path.join(self.directory, name + ".html.gz"), "wb") as f:
+            f.write(html)
+        with self.lock:
+            with open(os.path.join(self.directory, "index.tsv"), "a", encoding="utf-8") as f:
+                f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')}\t{reason}\t{url}\t{name}\n")
+
+    def close(self):
+        """
+        Waits for the queued snapshots to be written.
+        """
+        self.encoder.shutdown(wait=True)
+        log.info(f"Saved {self.taken} snapshots ({self.used / 2**20:.1f} MB) to {self.directory}, dropped {self.dropped}.")
+
+
+def enable(directory: str, **options) -> SnapshotService:
+    global service
+    service = SnapshotService(directory, **options)
+    log.info(f"Taking snapshots into {directory}")
+    return service
+
+
+def disable():
+    global service
+    if service:
+        service.close()
+        service = None
+
+
+def capture(page, url: str, reason: str = "sample"):
+    if service is not None:
+        service.capture(page, url, reason)
+
+
+async def capture_async(page, url: str, reason: str = "sample"):
+    if service is not None:
+        await service.capture_async(page, url, reason)
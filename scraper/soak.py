@@ -0,0 +1,152 @@
+"""
+Soak test: runs the detail stage against the local fixture shop for a long time and
+checks that memory and throughput stay flat.
+
+    python -m scraper.soak --duration 3600 --output soak
+
+Every run works in a new directory it creates under `--output` (soak/run-<time>-<random>);
+nothing outside that directory is removed. process_long_json_with_page is run over and
+over on batches of new product URLs, each round with an output and checkpoint file of its
+own, which are removed once the round is sampled. Every round so does the same amount of
+work, and a trend in the samples comes from the scraper, not from an output file the
+journal has to read back on every round. After every batch it
+samples the Python heap (tracemalloc), the RSS of the browser processes, the RSS of
+this process and the pages/sec of the batch. After the warm-up share of the run, a
+least-squares slope is fitted to each memory series (MB per hour), and throughput
+decay is the drop from the first to the last third of the run. The run fails (exit
+code 1) when a slope or the decay exceeds its threshold. The samples go to
+samples.csv and the verdict to report.json.
+"""
+import argparse
+import csv
+import json
+import logging as log
+import os
+import tempfile
+import time
+import tracemalloc
+
+from scraper.autotune import process_rss_mb, browser_rss_mb
+from scraper.storage import save_links_to_json
+
+
+def slope_per_hour(times: list[float], values: list[float]) -> float:
+    n = len(times)
+    if n < 2:
+        return 0.0
+    mean_t, mean_v = sum(times) / n, sum(values) / n
+    var = sum((t - mean_t) ** 2 for t in times)
+    if not var:
+        return 0.0
+    return sum((t - mean_t) * (v - mean_v) for t, v in zip(times, values)) / var * 3600
+
+
+def evaluate(samples: list[dict], warmup: float, max_heap_slope: float, max_rss_slope: float, max_decay: float) -> dict:
+    steady = [s for s in samples if s["t"] >= samples[-1]["t"] * warmup] or samples
+    times = [s["t"] for s in steady]
+    third = max(1, len(steady) // 3)
+    first_rate = sum(s["rate"] for s in steady[:third]) / third
+    last_rate = sum(s["rate"] for s in steady[-third:]) / third
+    result = {
+        "heap_slope_mb_per_hour": slope_per_hour(times, [s["heap_mb"] for s in steady]),
+        "browser_rss_slope_mb_per_hour": slope_per_hour(times, [s["browser_rss_mb"] for s in steady]),
+        "process_rss_slope_mb_per_hour": slope_per_hour(times, [s["process_rss_mb"] for s in steady]),
+        "first_rate": first_rate,
+        "last_rate": last_rate,
+        "throughput_decay": 1 - last_rate / first_rate if first_rate else 0.0,
+    }
+    failures = []
+    if result["heap_slope_mb_per_hour"] > max_heap_slope:
+        failures.append(f"Python heap grows {result['heap_slope_mb_per_hour']:.1f} MB/h (limit {max_heap_slope})")
+    if result["browser_rss_slope_mb_per_hour"] > max_rss_slope:
+        failures.append(f"browser RSS grows {result['browser_rss_slope_mb_per_hour']:.1f} MB/h (limit {max_rss_slope})")
+    if result["throughput_decay"] > max_decay:
+        failures.append(f"throughput fell {result['throughput_decay']:.0%} (limit {max_decay:.0%})")
+    result["failures"] = failures
+    result["passed"] = not failures
+    return result
+
+
+def run_soak(duration: float, output_dir: str, batch: int = 50, headless: bool = True, warmup: float = 0.2,
+             max_heap_slope: float = 50.0, max_rss_slope: float = 200.0, max_decay: float = 0.2) -> dict:
+    """
+    Runs the soak test in a new directory under `output_dir` and returns the report
+    (with 'directory' set to that directory).
+    """
+    from playwright.sync_api import sync_playwright
+    from scraper import fixture_server, pipeline
+
+    os.makedirs(output_dir, exist_ok=True)
+    run_dir = tempfile.mkdtemp(prefix=time.strftime("run-%Y%m%d-%H%M%S-"), dir=output_dir)
+    log.info(f"[soak] Writing to {run_dir}")
+    server = fixture_server.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/"
+    site = fixture_server.fixture_site(base_url, run_dir)
+    input_file = os.path.join(run_dir, "batch.json")
+    samples = []
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=headless)
+            context = browser.new_context()
+            page = pipeline.new_page(context)
+            round_number = 0
+            while time.perf_counter() - started < duration:
+                first = round_number * batch
+                save_links_to_json([f"{base_url}product/{i}" for i in range(first, first + batch)], input_file)
+                output_file = os.path.join(run_dir, f"output.{round_number:05d}.json")
+                checkpoint = os.path.join(run_dir, f"checkpoint.{round_number:05d}.txt")
+                round_started = time.perf_counter()
+                pipeline.process_long_json_with_page(page, site, input_file, output_file, checkpoint)
+                elapsed = time.perf_counter() - round_started
+                for path in (output_file, checkpoint):
+                    os.remove(path)
+                round_number += 1
+                sample = {
+                    "t": time.perf_counter() - started,
+                    "pages": round_number * batch,
+                    "rate": batch / elapsed,
+                    "heap_mb": tracemalloc.get_traced_memory()[0] / 2**20,
+                    "browser_rss_mb": browser_rss_mb(),
+                    "process_rss_mb": process_rss_mb(os.getpid()),
+                }
+                samples.append(sample)
+                log.info(f"[soak] {sample['t']:.0f}s: {sample['pages']} pages, {sample['rate']:.1f} pages/s, "
+                         f"heap {sample['heap_mb']:.1f} MB, browser {sample['browser_rss_mb']:.0f} MB")
+            context.close()
+            browser.close()
+    finally:
+        tracemalloc.stop()
+        server.shutdown()
+    with open(os.path.join(run_dir, "samples.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(samples[0]) if samples else ["t"])
+        writer.writeheader()
+        writer.writerows(samples)
+    report = evaluate(samples, warmup, max_heap_slope, max_rss_slope, max_decay) if samples else {"passed": False, "failures": ["no samples"]}
+    report.update(duration=duration, batch=batch, samples=len(samples), directory=run_dir)
+    save_links_to_json(report, os.path.join(run_dir, "report.json"))
+    return report
+
+
+def main(argv=None):
+    log.basicConfig(level=log.INFO)
+    parser = argparse.ArgumentParser(prog="python -m scraper.soak", description="Soak test against the local fixture shop.")
+    parser.add_argument("--duration", type=float, default=600, help="Seconds to run.")
+    parser.add_argument("--batch", type=int, default=50, help="Pages per sample.")
+    parser.add_argument("--output", default="soak", help="Each run writes to a new directory created in here.")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--warmup", type=float, default=0.2, help="Share of the run ignored by the checks.")
+    parser.add_argument("--max-heap-slope", type=float, default=50.0, help="MB per hour.")
+    parser.add_argument("--max-rss-slope", type=float, default=200.0, help="Browser RSS, MB per hour.")
+    parser.add_argument("--max-decay", type=float, default=0.2, help="Allowed throughput drop, 0.2 = 20%%.")
+    args = parser.parse_args(argv)
+    report = run_soak(args.duration, args.output, args.batch, not args.headed, args.warmup,
+                      args.max_heap_slope, args.max_rss_slope, args.max_decay)
+    print(json.dumps(report, indent=2))
+    if not report["passed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
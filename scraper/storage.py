@@ -0,0 +1,181 @@
+import glob
+import gzip
+import json
+import os
+
+from scraper.profiling import timed
+
+
+def _encode(obj):
+    # Compact records (scraper.compact.Record) are written as plain objects.
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+@timed("json write")
+def save_links_to_json(links: list, filename: str, durable: bool = False):
+    # Written next to the target and renamed over it, so readers never see a half-written file.
+    # `durable` also flushes the data to disk before the rename.
+    directory = os.path.dirname(filename)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    temporary = filename + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(links, f, ensure_ascii=False, indent=2, default=_encode)
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temporary, filename)
+
+
+def encode_items(links: list) -> bytes:
+    """
+    The items of json.dump(links, indent=2) as bytes, joined by commas, without the brackets.
+    """
+    items = (json.dumps(link, ensure_ascii=False, indent=2, default=_encode) for link in links)
+    return ",\n".join("  " + item.replace("\n", "\n  ") for item in items).encode("utf-8")
+
+
+@timed("json write")
+def append_links_to_json(links: list, filename: str):
+    """
+    Adds `links` to the end of a list saved by save_links_to_json, writing only the new
+    items instead of the whole file. A missing file is created.
+    """
+    if not os.path.exists(filename):
+        return save_links_to_json(links, filename)
+    if not links:
+        return
+    with open(filename, "r+b") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 2))
+        tail = f.read()
+        if size == 2 and tail == b"[]":
+            f.truncate(1)
+            separator = b"\n"
+        elif tail == b"\n]":
+            f.truncate(size - 2)
+            separator = b",\n"
+        else:
+            raise ValueError(f"{filename} was not written by save_links_to_json, cannot append to it")
+        f.seek(0, os.SEEK_END)
+        f.write(separator + encode_items(links) + b"\n]")
+
+
+def _layouts(filename: str) -> list[list[str]]:
+    # Every layout an output named `filename` may have on disk: the file, its .gz, its rotated segments.
+    plain = filename[:-3] if filename.endswith(".gz") else filename
+    root, ext = os.path.splitext(plain)
+    pattern = glob.escape(root) + ".[0-9][0-9][0-9][0-9][0-9]" + (ext or ".json")
+    layouts = [[path] for path in dict.fromkeys((filename, plain, plain + ".gz")) if os.path.exists(path)]
+    segments = sorted(glob.glob(pattern) + glob.glob(pattern + ".gz"))
+    return layouts + [segments] if segments else layouts
+
+
+def output_files(filename: str) -> list[str]:
+    """
+    The files holding the output written as `filename` by save_links_to_json or
+    scraper.writer.BackgroundWriter: the file itself, its .gz, or its rotated segments
+    (<name>.00001.json[.gz], ...) in order. Empty if there is none. If an earlier run
+    left another layout behind, the one written last wins.
+    """
+    layouts = _layouts(filename)
+    if not layouts:
+        return []
+    return max(layouts, key=lambda paths: max(os.path.getmtime(path) for path in paths))
+
+
+def remove_output(filename: str):
+    """
+    Removes every layout of the output `filename` (see output_files), so a new run
+    never reads or mixes with the files of an earlier one.
+    """
+    for paths in _layouts(filename):
+        for path in paths:
+            os.remove(path)
+
+
+def output_exists(filename: str) -> bool:
+    return bool(output_files(filename))
+
+
+def output_mtime(filename: str) -> float:
+    return max(os.path.getmtime(path) for path in output_files(filename))
+
+
+def _open(path: str):
+    return gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") else open(path, "r", encoding="utf-8")
+
+
+def _load_file(path: str):
+    with _open(path) as f:
+        return json.load(f)
+
+
+def _iter_list(f, chunk_size: int = 1 << 20):
+    # Decodes the items of a JSON list one at a time, reading `chunk_size` characters at once.
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+
+    def fill():
+        nonlocal buffer, position, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer, position = buffer[position:] + chunk, 0
+
+    def skip(characters: str):
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in characters:
+                position += 1
+            if position < len(buffer) or eof:
+                return
+            fill()
+
+    fill()
+    skip(" \t\r\n")
+    if buffer[position:position + 1] != "[":
+        raise ValueError(f"{getattr(f, 'name', 'The file')} does not hold a JSON list")
+    position += 1
+    while True:
+        skip(" \t\r\n,")
+        if position >= len(buffer):
+            raise ValueError(f"{getattr(f, 'name', 'The file')} ends inside the list")
+        if buffer[position] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+            # A value is only complete once its delimiter is read: "-1." may still become "-1.5".
+            complete = eof or (end < len(buffer) and buffer[end] in ",] \t\r\n")
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            fill()
+            continue
+        position = end
+        yield item
+
+
+def iter_records(filename: str):
+    """
+    Yields the items of the JSON list output `filename` one by one, decoding each file
+    (segment) incrementally, so memory does not grow with the file. Raises ValueError
+    for a file that does not hold a list.
+    """
+    files = output_files(filename)
+    if not files:
+        raise FileNotFoundError(f"No such file: {filename!r}")
+    for path in files:
+        with _open(path) as f:
+            yield from _iter_list(f)
+
+
+def load_links_from_json(filename: str) -> list:
+    files = output_files(filename)
+    if len(files) == 1:
+        return _load_file(files[0])
+    return list(iter_records(filename))
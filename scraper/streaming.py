@@ -0,0 +1,401 @@
+"""
+Streaming version of the pipeline.
+
+Instead of writing links_output.json, reading it back, writing products_output.json
+and so on, the stages menu -> pagination -> listing -> detail are connected by bounded
+asyncio queues. Detail pages start loading as soon as the first listing page yields
+links, and a full queue makes the upstream stage wait (backpressure), so memory stays
+bounded while the wall time drops to roughly the slowest stage.
+"""
+import asyncio
+import logging as log
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from playwright.async_api import async_playwright, Page
+
+from scraper import archive, selector_health, snapshots, structured
+from scraper.autotune import GradientTuner, AdaptiveLimiter, browser_rss_mb
+from scraper.profiling import timed, devtools_trace_async
+from scraper.browser_server import launch_browser_async, close_browser_async, endpoint_from_env, warm_context_async
+from scraper.compact import Record, UrlSet
+from scraper.replay import open_context_async
+from scraper.sites import SiteConfig, selector_chain
+from scraper.writer import BackgroundWriter
+from scraper.pipeline import (
+    HREFS_JS,
+    PageLoadError,
+    absolute_link,
+    unwrap_redirect,
+    remove_page_param,
+    scrape_pages_in_reverse,
+    is_empty_record,
+    last_page_from_href,
+    parse_page_value,
+)
+
+# Marks the end of a queue; every consumer receives one.
+DONE = None
+
+
+@dataclass
+class StreamConfig:
+    queue_size: int = 100
+    pagination_workers: int = 1
+    listing_workers: int = 2
+    detail_workers: int = 4
+    # Records are handed to the background writer (and the search index) in batches of `flush_every`.
+    flush_every: int = 50
+    # Gzip the output and split it into files of `rotate_records` records, see scraper.writer.
+    compress: bool = False
+    rotate_records: int = None
+    headless: bool = True
+    # HAR archive to record into or to replay from, see scraper.replay.
+    record_har: str = None
+    replay_har: str = None
+    # Running browser server to connect to, see scraper.browser_server.
+    browser_endpoint: str = None
+    # Let GradientTuner choose the number of detail pages in flight (up to max_detail_workers).
+    autotune: bool = False
+    max_detail_workers: int = 16
+    memory_limit_mb: int = None
+    # SQLite file of scraper.search, updated with every flush.
+    search_index: str = None
+    # Start from the site's saved session state, see scraper.session.
+    session: bool = False
+    # With `session`: serve large static assets from the site's disk cache.
+    asset_cache: bool = False
+
+
+@timed("navigation")
+async def goto(page: Page, site: SiteConfig, url: str):
+    log.info(f"Visiting: {url}")
+    try:
+        response = await page.goto(url, timeout=site.timeout, wait_until='load')
+    except Exception as e:
+        log.error(f"Error loading {url}: {e}")
+        raise PageLoadError(f"Error loading {url}: {e}")
+    await archive.archive_response_async(response)
+    if site.settle_delay:
+        await asyncio.sleep(site.settle_delay)
+    return response
+
+
+async def extract_text(page: Page, selector, join_parts: bool = False, text_from: str = "inner_text") -> str:
+    """
+    Async counterpart of scraper.pipeline.extract_text.
+    """
+    for css in selector_chain(selector):
+        if join_parts:
+            locator = page.locator(css)
+            parts = await (locator.all_text_contents() if text_from == "text_content" else locator.all_inner_texts())
+            text = "\n".join(part.strip() for part in parts if part.strip())
+            if text:
+                return text
+            continue
+        element = await page.query_selector(css)
+        if element:
+            return (await (element.text_content() if text_from == "text_content" else element.inner_text())).strip()
+    return ""
+
+
+async def get_last_page_number(page: Page, site: SiteConfig) -> int:
+    """
+    Async counterpart of scraper.pipeline.get_last_page_number.
+    """
+    element = await page.query_selector(site.selectors['pagination_last_page'])
+    if not element:
+        return 1
+    if site.last_page_from == "text":
+        return parse_page_value((await element.inner_text()).strip())
+    return last_page_from_href(site, await element.get_attribute("href"))
+
+
+@timed("pagination")
+async def expand_category(page: Page, site: SiteConfig, link: str) -> list[str]:
+    """
+    Returns the listing pages of one category, see scraper.pipeline.discover_listing_pages.
+    """
+    if site.pagination_mode == "none":
+        return [link]
+    if site.pagination_mode == "fixed":
+        return scrape_pages_in_reverse(site, link, site.fixed_last_page)
+    await goto(page, site, link)
+    pagination = site.selectors.get('pagination')
+    if not pagination or not await page.query_selector(pagination):
+        return [link]
+    if site.pagination_mode == "anchors":
+        hrefs = await page.eval_on_selector_all(f"{pagination} a", HREFS_JS)
+        return [link] + [absolute_link(href, site.link_prefix) for href in hrefs]
+    last_page = await get_last_page_number(page, site)
+    await selector_health.observe_async(page, site, {"pagination_last_page": last_page > 1})
+    return scrape_pages_in_reverse(site, remove_page_param(link, site.page_param), last_page)
+
+
+async def _close_downstream(queue: asyncio.Queue, consumers: int):
+    for _ in range(consumers):
+        await queue.put(DONE)
+
+
+async def _pagination_worker(page: Page, site: SiteConfig, inbox: asyncio.Queue, outbox: asyncio.Queue, seen: UrlSet):
+    while (link := await inbox.get()) is not DONE:
+        try:
+            urls = await expand_category(page, site, link)
+        except PageLoadError as e:
+            log.error(f"Skipping category {link}: {e}")
+            continue
+        for url in urls:
+            if seen.add(url):
+                await outbox.put(url)
+
+
+async def _listing_worker(page: Page, site: SiteConfig, inbox: asyncio.Queue, outbox: asyncio.Queue, seen: UrlSet):
+    while (url := await inbox.get()) is not DONE:
+        try:
+            await goto(page, site, url)
+        except PageLoadError as e:
+            log.error(f"Skipping listing page {url}: {e}")
+            continue
+        if site.require_product_selector and not await page.query_selector(site.selectors['product']):
+            log.info("Product links selector not found on this page. Skipping this URL.")
+            continue
+        hrefs = await page.eval_on_selector_all(site.selectors['product'], HREFS_JS)
+        await selector_health.observe_async(page, site, {"product": hrefs})
+        for href in hrefs:
+            link = absolute_link(href, site.link_prefix)
+            if site.unwrap_redirects:
+                link = unwrap_redirect(link)
+            if seen.add(link):
+                await outbox.put(link)
+
+
+async def _detail_worker(context, site: SiteConfig, inbox: asyncio.Queue, outbox: asyncio.Queue,
+                         limiter: AdaptiveLimiter = None):
+    # The page is opened on the first item and closed while throttled, so idle autotuned workers cost no browser memory.
+    page = None
+    try:
+        while (url := await inbox.get()) is not DONE:
+            try:
+                if limiter is None:
+                    page = page or await context.new_page()
+                    title, desc, extra = await _scrape_detail(page, site, url)
+                else:
+                    page, title, desc, extra = await _scrape_detail_limited(context, page, site, url, limiter)
+            except PageLoadError:
+                if not site.skip_load_errors:
+                    raise
+                if limiter is not None:
+                    # _scrape_detail_limited closed it.
+                    page = None
+                continue
+            if is_empty_record(site, title, desc):
+                log.info(f"Skipping product at {url} because it has no text.")
+                continue
+            await outbox.put(Record(url, title, desc, extra))
+    finally:
+        if page:
+            await page.close()
+
+
+@timed("detail")
+async def _scrape_detail(page: Page, site: SiteConfig, url: str) -> tuple[str, str, dict]:
+    """
+    Async counterpart of scraper.pipeline.scrape_product_fields, including the navigation.
+    """
+    await selector_health.wait_async(site)
+    async with devtools_trace_async(page, url):
+        try:
+            await goto(page, site, url)
+            fields = {}
+            if site.structured_data:
+                try:
+                    fields = structured.parse(await page.evaluate(structured.STRUCTURED_JS))
+                except Exception as e:
+                    log.info(f"Could not read structured data: {e}")
+            queried = {}
+            if not fields.get("title"):
+                queried['product_title'] = await extract_text(page, site.selectors['product_title'])
+            if not fields.get("desc"):
+                queried['product_desc'] = await extract_text(page, site.selectors['product_desc'],
+                                                             site.join_desc_parts, site.desc_from)
+            await selector_health.observe_async(page, site, queried)
+            if site.structured_data:
+                title, desc, extra = structured.combine(fields, queried.get('product_title'), queried.get('product_desc'))
+            else:
+                title, desc, extra = queried['product_title'], queried['product_desc'], {}
+        except Exception:
+            await snapshots.capture_async(page, url, "error")
+            raise
+        await snapshots.capture_async(page, url, "sample" if title.strip() or desc.strip() else "empty")
+    return title, desc, extra
+
+
+async def _scrape_detail_limited(context, page: Page, site: SiteConfig, url: str, limiter: AdaptiveLimiter,
+                                 attempts: int = 2) -> tuple:
+    """
+    Scrapes one detail page inside a limiter slot and reports its latency to the tuner.
+    A failed load is reported as an error (which shrinks the limit) and retried once
+    before the page is closed and the exception is raised. A worker that has to wait for a slot closes its
+    page first, so throttled workers hold no browser memory.
+    """
+    for attempt in range(1, attempts + 1):
+        if page is not None and limiter.saturated:
+            await page.close()
+            page = None
+        started = await limiter.acquire()
+        ok = False
+        try:
+            page = page or await context.new_page()
+            title, desc, extra = await _scrape_detail(page, site, url)
+            ok = True
+            return page, title, desc, extra
+        except Exception:
+            if attempt == attempts:
+                if page is not None:
+                    await page.close()
+                raise
+            log.info(f"Retrying {url} after a failed load.")
+        finally:
+            await limiter.release(started, ok)
+
+
+async def _record_writer(inbox: asyncio.Queue, output_json: str, flush_every: int, site_name: str = None,
+                         search_index: str = None, compress: bool = False, rotate_records: int = None,
+                         desc_key: str = "desc") -> int:
+    # Only the records not yet indexed are kept; the output itself is the writer's.
+    batch, written = [], 0
+    loop = asyncio.get_running_loop()
+    # SQLite runs on one thread of its own: the connection stays on that thread and the
+    # event loop driving the pages never waits for the index.
+    indexer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-index") if search_index else None
+    index = None
+    if indexer:
+        from scraper.search import SearchIndex
+        index = await loop.run_in_executor(indexer, SearchIndex, search_index)
+    # Encoding and disk writes run on the writer's thread, not on the event loop driving the pages.
+    writer = BackgroundWriter(output_json, batch_size=flush_every, compress=compress, rotate_records=rotate_records)
+    try:
+        while (record := await inbox.get()) is not DONE:
+            written += 1
+            await writer.put_async(record if desc_key == "desc" else record.to_dict(desc_key))
+            if index is not None:
+                batch.append(record)
+                if len(batch) >= flush_every:
+                    await loop.run_in_executor(indexer, index.add, batch, site_name)
+                    batch = []
+        if index is not None and batch:
+            await loop.run_in_executor(indexer, index.add, batch, site_name)
+    finally:
+        if index is not None:
+            await loop.run_in_executor(indexer, index.close)
+        if indexer:
+            indexer.shutdown()
+        await asyncio.to_thread(writer.close)
+    return written
+
+
+async def _stage(workers: list, downstream: asyncio.Queue, consumers: int):
+    """
+    Waits for all workers of a stage and then tells the next stage that no more items come.
+    When one worker fails the others are cancelled and awaited before the error is raised.
+    """
+    tasks = [asyncio.ensure_future(worker) for worker in workers]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    await _close_downstream(downstream, consumers)
+
+
+async def stream_site(site: SiteConfig, output_json: str, start_urls: list[str] = None,
+                      config: StreamConfig = None, context=None) -> int:
+    """
+    Runs menu -> pagination -> listing -> detail as concurrent stages joined by bounded queues.
+    If `start_urls` is given, the menu is not scraped and those category links are used instead.
+    An existing browser `context` can be passed in; otherwise a browser is launched.
+    Returns the number of scraped records; the records themselves are only kept in `output_json`,
+    so memory does not grow with the crawl.
+    """
+    config = config or StreamConfig()
+    if context is None:
+        async with async_playwright() as p:
+            browser = await launch_browser_async(p, config.headless, config.browser_endpoint)
+            if config.session and not (config.record_har or config.replay_har):
+                from scraper import session
+                context = await session.open_context_async(browser, site, asset_cache=config.asset_cache)
+            elif endpoint_from_env(config.browser_endpoint) and not (config.record_har or config.replay_har):
+                context = await warm_context_async(browser, config.browser_endpoint)
+            else:
+                context = await open_context_async(browser, config.record_har, config.replay_har)
+            try:
+                return await stream_site(site, output_json, start_urls, config, context)
+            finally:
+                await context.close()
+                await close_browser_async(browser, config.browser_endpoint)
+
+    categories = asyncio.Queue(config.queue_size)
+    listings = asyncio.Queue(config.queue_size)
+    details = asyncio.Queue(config.queue_size)
+    records = asyncio.Queue(config.queue_size)
+    seen_listings, seen_products = UrlSet(), UrlSet()
+
+    async def feed_categories():
+        links = start_urls
+        if links is None and 'main_menu' not in site.selectors:
+            links = [site.base_url]
+        if links is None:
+            menu_page = await context.new_page()
+            await goto(menu_page, site, site.base_url)
+            hrefs = await menu_page.eval_on_selector_all(site.selectors['main_menu'], HREFS_JS)
+            links = [absolute_link(href, site.menu_prefix) for href in hrefs]
+            await menu_page.close()
+            log.info(f"Found {len(links)} main menu links.")
+        for link in links:
+            await categories.put(link)
+        await _close_downstream(categories, config.pagination_workers)
+
+    async def pages(n: int) -> list[Page]:
+        return [await context.new_page() for _ in range(n)]
+
+    pagination_pages = await pages(config.pagination_workers)
+    listing_pages = await pages(config.listing_workers)
+    limiter, detail_workers = None, config.detail_workers
+    if config.autotune:
+        tuner = GradientTuner(initial=config.detail_workers, max_limit=config.max_detail_workers,
+                              memory_limit_mb=config.memory_limit_mb, memory_probe=browser_rss_mb, name=site.name)
+        limiter = AdaptiveLimiter(tuner)
+        detail_workers = limiter.workers
+    stages = [
+        feed_categories(),
+        _stage([_pagination_worker(pg, site, categories, listings, seen_listings) for pg in pagination_pages],
+               listings, config.listing_workers),
+        _stage([_listing_worker(pg, site, listings, details, seen_products) for pg in listing_pages],
+               details, detail_workers),
+        _stage([_detail_worker(context, site, details, records, limiter) for _ in range(detail_workers)],
+               records, 1),
+    ]
+    tasks = [asyncio.create_task(stage) for stage in stages]
+    writer = asyncio.create_task(_record_writer(records, output_json, config.flush_every, site.name, config.search_index,
+                                                config.compress, config.rotate_records, site.desc_key))
+    try:
+        await asyncio.gather(*tasks)
+        written = await writer
+    except BaseException:
+        # One failing stage stops the whole stream instead of leaving the others blocked on a queue.
+        for task in tasks + [writer]:
+            task.cancel()
+        # Lets the cancelled stages run their cleanup (closing detail pages) before the context goes.
+        await asyncio.gather(*tasks, writer, return_exceptions=True)
+        raise
+    finally:
+        for pg in pagination_pages + listing_pages:
+            await pg.close()
+    log.info(f"Streamed {written} records from {len(seen_listings)} listing pages and {len(seen_products)} products.")
+    return written
+
+
+def run_streaming(site: SiteConfig, output_json: str, start_urls: list[str] = None, config: StreamConfig = None) -> int:
+    return asyncio.run(stream_site(site, output_json, start_urls, config))
@@ -0,0 +1,150 @@
+"""
+Structured data (JSON-LD and schema.org microdata) of product and article pages.
+
+Most shops embed an application/ld+json Product block carrying the name, description,
+SKU, brand and offers. STRUCTURED_JS collects every JSON-LD block and the microdata
+of the first Product item in a single round trip, and parse() turns that into
+    {'title', 'desc', 'sku', 'brand', 'gtin', 'price', 'currency', 'availability', 'source'}
+with only the keys that were found. With SiteConfig.structured_data (off by default,
+`--structured-data` turns it on for a run) the title and description come from it, and
+the selectors are only queried for the fields it lacks, so a page with a complete
+JSON-LD block costs one evaluate() instead of the selector round trips. Compare the
+records of a sample run first: JSON-LD descriptions are sometimes only a summary of the
+one on the page, which combine() can only notice when both were read.
+"""
+import html
+import json
+import re
+
+STRUCTURED_JS = """() => {
+    const jsonld = [...document.querySelectorAll('script[type="application/ld+json"]')].map(s => s.textContent);
+    const item = document.querySelector('[itemscope][itemtype*="schema.org/Product"]');
+    let microdata = null;
+    if (item) {
+        microdata = {};
+        for (const el of item.querySelectorAll('[itemprop]')) {
+            const key = el.getAttribute('itemprop');
+            if (key in microdata) continue;
+            microdata[key] = el.getAttribute('content') || el.getAttribute('href') || (el.innerText || '').trim();
+        }
+    }
+    return {jsonld, microdata};
+}"""
+
+PRODUCT_TYPES = {"Product", "ProductGroup", "IndividualProduct"}
+ARTICLE_TYPES = {"Article", "BlogPosting", "NewsArticle"}
+
+TAG_RE = re.compile(r"<[^>]+>")
+BREAK_RE = re.compile(r"<\s*(br|/p|/li|/h\d)\s*/?>", re.IGNORECASE)
+
+
+def clean_text(value) -> str:
+    """
+    Plain text of a structured field; some shops put HTML into the description.
+    """
+    if not isinstance(value, str):
+        return ""
+    text = html.unescape(TAG_RE.sub("", BREAK_RE.sub("\n", value)))
+    return "\n".join(" ".join(line.split()) for line in text.splitlines() if line.strip())
+
+
+def _name(value) -> str:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    if isinstance(value, dict):
+        value = value.get("name")
+    return clean_text(value)
+
+
+def _types(node: dict) -> set:
+    kind = node.get("@type")
+    return set(kind) if isinstance(kind, list) else {kind}
+
+
+def find_items(data, types: set):
+    """
+    Yields the JSON-LD nodes of the given @types, wherever they are nested (@graph, lists, ...).
+    """
+    if isinstance(data, list):
+        for item in data:
+            yield from find_items(item, types)
+    elif isinstance(data, dict):
+        if _types(data) & types:
+            yield data
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                yield from find_items(value, types)
+
+
+def _offer_fields(offers) -> dict:
+    if isinstance(offers, list):
+        offers = offers[0] if offers else None
+    if not isinstance(offers, dict):
+        return {}
+    fields = {
+        "price": offers.get("price", offers.get("lowPrice")),
+        "currency": offers.get("priceCurrency"),
+        "availability": offers.get("availability"),
+    }
+    if isinstance(fields["availability"], str):
+        fields["availability"] = fields["availability"].rsplit("/", 1)[-1]
+    return {key: str(value) for key, value in fields.items() if value not in (None, "")}
+
+
+def _product_fields(item: dict) -> dict:
+    fields = {
+        "title": clean_text(item.get("name") or item.get("headline")),
+        "desc": clean_text(item.get("description") or item.get("articleBody")),
+        "sku": clean_text(str(item["sku"])) if item.get("sku") else "",
+        "brand": _name(item.get("brand")),
+        "gtin": clean_text(str(item.get("gtin13") or item.get("gtin") or item.get("gtin8") or "")),
+    }
+    fields = {key: value for key, value in fields.items() if value}
+    fields.update(_offer_fields(item.get("offers")))
+    return fields
+
+
+def parse(raw: dict) -> dict:
+    """
+    Turns the result of STRUCTURED_JS into record fields; JSON-LD wins over microdata.
+    Returns an empty dict when the page has no usable structured data.
+    """
+    blocks = []
+    for text in (raw or {}).get("jsonld") or []:
+        try:
+            blocks.append(json.loads(text))
+        except ValueError:
+            continue
+    for types in (PRODUCT_TYPES, ARTICLE_TYPES):
+        for item in find_items(blocks, types):
+            fields = _product_fields(item)
+            if fields.get("title") or fields.get("desc"):
+                fields["source"] = "json-ld"
+                return fields
+    microdata = (raw or {}).get("microdata")
+    if microdata:
+        fields = _product_fields(microdata)
+        fields.update(_offer_fields(microdata))
+        if fields.get("title") or fields.get("desc"):
+            fields["source"] = "microdata"
+            return fields
+    return {}
+
+
+def combine(fields: dict, title: str = None, desc: str = None) -> tuple[str, str, dict]:
+    """
+    Merges structured `fields` with the selector results (None when not queried).
+    The title comes from `fields` when present; of the two descriptions the longer one
+    is kept. Returns (title, desc, extra fields with 'source').
+    """
+    extra = dict(fields)
+    sources = [extra.pop("source")] if extra.get("source") else []
+    structured_title, structured_desc = extra.pop("title", ""), extra.pop("desc", "")
+    if len((desc or "").strip()) > len(structured_desc.strip()):
+        structured_desc = ""
+    if (title and not structured_title) or (desc and not structured_desc):
+        sources.append("selectors")
+    title = structured_title or title or ""
+    desc = structured_desc or desc or ""
+    extra["source"] = "+".join(sources) or "selectors"
+    return title, desc, extra
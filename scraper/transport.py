@@ -0,0 +1,313 @@
+"""
+Small pooled HTTP client for fetches that do not need a browser (JSON endpoints, static pages).
+
+Connection setup is paid once per host instead of once per request:
+   - HTTP/1.1 (the default): connections are kept alive and reused per host (up to
+     `max_per_host` idle),
+   - DNS: resolved addresses are cached for `dns_ttl` seconds and shared by all
+     connections; an entry is dropped when connecting to its addresses fails,
+   - TLS: the session of the last connection to a host is reused for the next handshake
+     (session resumption skips the certificate exchange).
+metrics() reports per host how many requests reused a connection and how much time
+went into DNS, TCP connect and TLS handshakes.
+
+HTTP/2 is opt-in (http2=True, with httpx and h2 installed: pip install httpx[http2]).
+Requests to a host are then multiplexed over one httpx connection, which does its own
+DNS resolution and TLS and so bypasses the DNS cache and session reuse above; for
+those hosts metrics() only counts requests, retries are httpx's and timings are per
+request. The HTTP/1.1 path is the one the connection metrics describe.
+
+A request that fails on a kept-alive connection the server already closed is retried
+once on a new connection, but only for idempotent methods (GET, HEAD, PUT, DELETE,
+OPTIONS, TRACE) or when the caller passes idempotent=True (e.g. a POST that only
+searches). Retrying anything else could apply it twice.
+"""
+import gzip
+import http.client
+import json
+import logging as log
+import socket
+import ssl
+import threading
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field, asdict
+from urllib.parse import urlsplit
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE", "OPTIONS", "TRACE")
+
+
+@dataclass
+class Response:
+    url: str
+    status: int
+    headers: dict
+    body: bytes
+    http_version: str = "HTTP/1.1"
+
+    def text(self) -> str:
+        charset = "utf-8"
+        content_type = self.headers.get("content-type", "")
+        if "charset=" in content_type:
+            charset = content_type.split("charset=")[-1].split(";")[0].strip()
+        return self.body.decode(charset, errors="replace")
+
+    def json(self):
+        return json.loads(self.body)
+
+
+@dataclass
+class HostMetrics:
+    requests: int = 0
+    reused: int = 0
+    connections: int = 0
+    retries: int = 0
+    dns_lookups: int = 0
+    dns_cache_hits: int = 0
+    tls_handshakes: int = 0
+    tls_resumed: int = 0
+    dns_seconds: float = 0.0
+    connect_seconds: float = 0.0
+    tls_seconds: float = 0.0
+    request_seconds: float = 0.0
+    versions: dict = field(default_factory=dict)
+
+
+def _decode(body: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.decompress(body)
+    if encoding == "deflate":
+        return zlib.decompress(body)
+    return body
+
+
+class DnsCache:
+    """
+    getaddrinfo results per (host, port), kept for `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def resolve(self, host: str, port: int, metrics: HostMetrics = None) -> list:
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get((host, port))
+        if entry and entry[0] > now:
+            if metrics:
+                metrics.dns_cache_hits += 1
+            return entry[1]
+        started = time.perf_counter()
+        addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        if metrics:
+            metrics.dns_lookups += 1
+            metrics.dns_seconds += time.perf_counter() - started
+        with self.lock:
+            self.entries[(host, port)] = (now + self.ttl, addresses)
+        return addresses
+
+    def invalidate(self, host: str, port: int):
+        with self.lock:
+            self.entries.pop((host, port), None)
+
+
+def _open_socket(addresses: list, timeout: float) -> socket.socket:
+    error = None
+    for family, kind, proto, _, address in addresses:
+        sock = socket.socket(family, kind, proto)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(address)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            return sock
+        except OSError as e:
+            error = e
+            sock.close()
+    raise error or OSError("getaddrinfo returned no addresses")
+
+
+def _connect(client: "HttpClient", host: str, port: int, timeout: float, metrics: HostMetrics) -> socket.socket:
+    addresses = client.dns.resolve(host, port, metrics)
+    started = time.perf_counter()
+    try:
+        sock = _open_socket(addresses, timeout)
+    except OSError:
+        # The cached addresses may be stale (moved host, failover); resolve again next time.
+        client.dns.invalidate(host, port)
+        raise
+    metrics.connections += 1
+    metrics.connect_seconds += time.perf_counter() - started
+    return sock
+
+
+class _Connection(http.client.HTTPConnection):
+    def __init__(self, host: str, client: "HttpClient", metrics: HostMetrics, **kwargs):
+        super().__init__(host, **kwargs)
+        self.client = client
+        self.metrics = metrics
+
+    def connect(self):
+        self.sock = _connect(self.client, self.host, self.port, self.timeout, self.metrics)
+
+
+class _TlsConnection(http.client.HTTPSConnection):
+    def __init__(self, host: str, client: "HttpClient", metrics: HostMetrics, **kwargs):
+        super().__init__(host, context=client.ssl_context, **kwargs)
+        self.client = client
+        self.metrics = metrics
+
+    def connect(self):
+        sock = _connect(self.client, self.host, self.port, self.timeout, self.metrics)
+        started = time.perf_counter()
+        session = self.client.tls_sessions.get((self.host, self.port))
+        try:
+            self.sock = self.client.ssl_context.wrap_socket(sock, server_hostname=self.host, session=session)
+        except BaseException:
+            # A failed handshake would leave the TCP socket open.
+            sock.close()
+            raise
+        self.metrics.tls_handshakes += 1
+        self.metrics.tls_resumed += self.sock.session_reused
+        self.metrics.tls_seconds += time.perf_counter() - started
+
+
+class HttpClient:
+    def __init__(self, timeout: float = 30.0, headers: dict = None, max_per_host: int = 4, http2: bool = False,
+                 dns_ttl: float = 300.0):
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+        self.max_per_host = max_per_host
+        self.pools = {}
+        self.lock = threading.Lock()
+        self.dns = DnsCache(dns_ttl)
+        self.ssl_context = ssl.create_default_context()
+        self.tls_sessions = {}
+        self.host_metrics = defaultdict(HostMetrics)
+        self.h2 = None
+        if http2:
+            try:
+                import h2  # noqa: F401  httpx needs it for HTTP/2
+                import httpx
+                self.h2 = httpx.Client(http2=True, timeout=timeout, headers=self.headers,
+                                       limits=httpx.Limits(max_keepalive_connections=max_per_host))
+            except ImportError:
+                log.debug("httpx[http2] is not installed, using HTTP/1.1 keep-alive connections.")
+
+    def _checkout(self, scheme: str, netloc: str):
+        metrics = self.host_metrics[netloc]
+        with self.lock:
+            idle = self.pools.setdefault((scheme, netloc), [])
+            if idle:
+                metrics.reused += 1
+                return idle.pop()
+        connection_class = _TlsConnection if scheme == "https" else _Connection
+        return connection_class(netloc, self, metrics, timeout=self.timeout)
+
+    def _keep_session(self, connection):
+        if isinstance(connection.sock, ssl.SSLSocket):
+            # Read after the response: TLS 1.3 sends its session tickets after the handshake.
+            self.tls_sessions[(connection.host, connection.port)] = connection.sock.session
+
+    def _checkin(self, scheme: str, netloc: str, connection):
+        with self.lock:
+            idle = self.pools.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_per_host:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def _request_h2(self, method: str, url: str, body: bytes, headers: dict) -> Response:
+        response = self.h2.request(method, url, content=body, headers=headers)
+        # httpx removes the content encoding itself.
+        return Response(url, response.status_code, {key.lower(): value for key, value in response.headers.items()},
+                        response.content, response.http_version)
+
+    def request(self, method: str, url: str, body: bytes = None, headers: dict = None, idempotent: bool = None) -> Response:
+        """
+        Sends one request; `idempotent` overrides whether the method may be retried (see the module docstring).
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        parts = urlsplit(url)
+        metrics = self.host_metrics[parts.netloc]
+        metrics.requests += 1
+        started = time.perf_counter()
+        try:
+            if self.h2 is not None:
+                response = self._request_h2(method, url, body, headers)
+            else:
+                response = self._request_http1(method, url, parts, body, headers, metrics, idempotent)
+        finally:
+            metrics.request_seconds += time.perf_counter() - started
+        metrics.versions[response.http_version] = metrics.versions.get(response.http_version, 0) + 1
+        return response
+
+    def _request_http1(self, method: str, url: str, parts, body: bytes, headers: dict, metrics: HostMetrics,
+                       idempotent: bool) -> Response:
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        request_headers = dict(self.headers, **(headers or {}))
+        for attempt in (1, 2):
+            connection = self._checkout(parts.scheme, parts.netloc)
+            try:
+                connection.request(method, path, body=body, headers=request_headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest, ConnectionError) as e:
+                # A kept-alive connection the server already closed; retry once on a fresh one.
+                connection.close()
+                if attempt == 2 or not idempotent:
+                    raise
+                metrics.retries += 1
+                log.debug(f"Retrying {url} on a new connection: {e}")
+                continue
+            except BaseException:
+                # Timeouts, TLS and parse errors leave the connection half used: never pool it.
+                connection.close()
+                raise
+            response_headers = {key.lower(): value for key, value in response.getheaders()}
+            self._keep_session(connection)
+            if response.will_close:
+                connection.close()
+            else:
+                self._checkin(parts.scheme, parts.netloc, connection)
+            return Response(url, response.status, response_headers, _decode(data, response_headers.get("content-encoding", "")))
+
+    def get(self, url: str, headers: dict = None) -> Response:
+        return self.request("GET", url, headers=headers)
+
+    def metrics(self) -> dict:
+        """
+        Per-host connection metrics, e.g. {'pardi.hu': {'requests': 40, 'reused': 39, ...}}.
+        """
+        return {host: asdict(metrics) for host, metrics in self.host_metrics.items()}
+
+    def close(self):
+        with self.lock:
+            for idle in self.pools.values():
+                for connection in idle:
+                    connection.close()
+            self.pools.clear()
+        if self.h2 is not None:
+            self.h2.close()
+        for host, metrics in self.host_metrics.items():
+            if metrics.requests:
+                log.info(f"{host}: {metrics.requests} requests, {metrics.connections} connections "
+                         f"({metrics.reused} reused), {metrics.tls_resumed}/{metrics.tls_handshakes} TLS sessions resumed, "
+                         f"{(metrics.dns_seconds + metrics.connect_seconds + metrics.tls_seconds) * 1000:.0f}ms in setup "
+                         f"of {metrics.request_seconds * 1000:.0f}ms total")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,98 @@
+"""
+URL helpers of the pipeline that need no browser: absolute links, tracking redirects,
+page parameters and listing page URLs. scraper.pipeline re-exports them.
+"""
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse, unquote
+
+from scraper.sites import SiteConfig
+
+
+def absolute_link(href: str, prefix: str) -> str:
+    """
+    Prepends `prefix` to relative hrefs; absolute URLs are returned unchanged.
+    """
+    if not prefix or href.startswith("http"):
+        return href
+    if prefix.endswith("/") and href.startswith("/"):
+        href = href[1:]
+    return prefix + href
+
+
+def unwrap_redirect(url: str) -> str:
+    """
+    Turns a tracking link such as 'https://track.example/?u=https%3A%2F%2Fsite/post'
+    into the URL it points to; other URLs are returned unchanged.
+    """
+    url = unquote(url)
+    if url.count('http') > 1:
+        url = 'http' + url.split('http')[-1]
+    return url
+
+
+def remove_page_param(url: str, param: str = "page") -> str:
+    """
+    Removes `param` from the query string of the URL if present, e.g.:
+    '...?page=11' => '...'
+    '...?foo=bar&page=2' => '...?foo=bar'
+    Returns a "cleaned" URL to avoid the situation
+    '?page=11?page=1'
+    """
+    parsed = urlparse(url)
+    qs = parse_qs(parsed.query)
+    if param in qs:
+        qs.pop(param)
+    new_query = urlencode(qs, doseq=True)
+    new_parsed = parsed._replace(query=new_query)
+    return urlunparse(new_parsed)
+
+
+def page_url(site: SiteConfig, base_url: str, number: int) -> str:
+    separator = "&" if "?" in base_url else "?"
+    return f"{base_url}{separator}{site.page_param}={number}{site.page_suffix}"
+
+
+def page_number(site: SiteConfig, url: str) -> int:
+    """
+    Returns the listing page number of `url`, or site.first_page when it has none.
+    """
+    values = parse_qs(urlparse(url.split("#")[0]).query).get(site.page_param)
+    try:
+        return int(values[0]) if values else site.first_page
+    except ValueError:
+        return site.first_page
+
+
+def group_by_category(site: SiteConfig, urls: list[str]) -> dict:
+    """
+    Groups listing page URLs by their category (the URL without the page parameter),
+    each group sorted from the first (newest) page onwards.
+    """
+    categories = {}
+    for url in urls:
+        categories.setdefault(remove_page_param(url.split("#")[0], site.page_param), []).append(url)
+    return {base: sorted(pages, key=lambda url: page_number(site, url)) for base, pages in categories.items()}
+
+
+def scrape_pages_in_reverse(site: SiteConfig, base_url: str, last_page: int) -> list[str]:
+    """
+    Creates a list of listing links in descending order (from last_page to site.first_page).
+    Example: last_page=5 => [base_url?page=5, base_url?page=4, ..., base_url?page=1]
+    """
+    return [page_url(site, base_url, p) for p in range(last_page, site.first_page - 1, -1)]
+
+
+def parse_page_value(value: str) -> int:
+    try:
+        return int(value)
+    except ValueError:
+        return 1
+
+
+def last_page_from_href(site: SiteConfig, href: str) -> int:
+    """
+    Reads the page number from the href of the 'last page' element (?page=N), or 1.
+    """
+    if not href:
+        return 1
+    values = parse_qs(urlparse(href).query).get(site.page_param)
+    return parse_page_value(values[0]) if values else 1
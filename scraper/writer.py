@@ -0,0 +1,197 @@
+"""
+Background record writer: JSON encoding, compression and disk writes happen on a
+dedicated thread, so the thread or event loop driving the browser never waits for them.
+
+    with BackgroundWriter("motoroazis/motoroazis_final_output.json", rotate_records=5000) as writer:
+        for record in records:
+            writer.put(record)
+
+Records go through a bounded queue. The writer thread takes up to `batch_size` of
+them at a time, encodes them (with orjson when it is installed, otherwise json) and
+appends them to the current segment, gzip-compressed with `compress`. Each segment
+is a JSON list, written as <name>.part and renamed to its final name once complete.
+With `rotate_records` the output is split into <name>.00001.json, <name>.00002.json,
+... (.json.gz when compressed), otherwise a single file at `path` is written. A full
+queue is the backpressure signal: put() waits and put_async() waits in an executor
+thread, so the event loop keeps running, until the writer catches up; both are counted
+in stats()['stalls'].
+
+scraper.storage.load_links_from_json and iter_records read every layout written here
+(one file, .json.gz, rotated segments) under the name the output was requested as, so
+the stages that read a products output need no options of their own. Opening a writer
+removes whatever an earlier run left under that name in any layout.
+"""
+import asyncio
+import gzip
+import json
+import logging as log
+import os
+import queue
+import threading
+import time
+
+from scraper.storage import _encode, remove_output
+
+try:
+    import orjson
+except ImportError:  # the standard json module is used instead
+    orjson = None
+
+# Marks the end of the queue.
+_CLOSE = object()
+
+
+def encode_batch(records: list) -> bytes:
+    """
+    One record per line, separated by commas, as the body of a JSON list.
+    """
+    if orjson is not None:
+        return b",\n".join(orjson.dumps(record, default=_encode) for record in records)
+    return ",\n".join(json.dumps(record, ensure_ascii=False, default=_encode) for record in records).encode("utf-8")
+
+
+class BackgroundWriter:
+    def __init__(self, path: str, batch_size: int = 200, queue_size: int = 10_000, compress: bool = False,
+                 rotate_records: int = None, compress_level: int = 6):
+        self.path = path
+        self.batch_size = batch_size
+        self.compress = compress or path.endswith(".gz")
+        self.compress_level = compress_level
+        self.rotate_records = rotate_records
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.segments = []
+        self.error = None
+        self.written = 0
+        self.bytes = 0
+        self.stalls = 0
+        self.encode_seconds = 0.0
+        self.write_seconds = 0.0
+        self._file = None
+        self._segment_records = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # The plain file, .gz or segments of an earlier run would be read together with (or instead of) these.
+        remove_output(path)
+        self.thread = threading.Thread(target=self._run, name=f"writer-{os.path.basename(path)}", daemon=True)
+        self.thread.start()
+
+    def _check(self):
+        if self.error is not None:
+            raise RuntimeError(f"Writing {self.path} failed") from self.error
+
+    def put(self, record):
+        """
+        Queues a record; waits only while the queue is full (backpressure).
+        """
+        self._check()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.stalls += 1
+            self.queue.put(record)
+
+    async def put_async(self, record):
+        """
+        Async counterpart of put: a full queue makes the calling task wait, not the event loop.
+        """
+        self._check()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.stalls += 1
+            await asyncio.get_running_loop().run_in_executor(None, self.queue.put, record)
+
+    @property
+    def pressure(self) -> float:
+        """
+        Share of the queue in use, 0.0 - 1.0.
+        """
+        return self.queue.qsize() / self.queue.maxsize
+
+    def _segment_path(self) -> str:
+        path = self.path[:-3] if self.path.endswith(".gz") else self.path
+        if self.rotate_records:
+            root, ext = os.path.splitext(path)
+            path = f"{root}.{len(self.segments) + 1:05d}{ext or '.json'}"
+        return path + ".gz" if self.compress else path
+
+    def _open(self):
+        final = self._segment_path()
+        part = final + ".part"
+        self._file = gzip.open(part, "wb", compresslevel=self.compress_level) if self.compress else open(part, "wb")
+        self._file.write(b"[\n")
+        self._segment_records = 0
+        self.segments.append(final)
+
+    def _finish(self):
+        self._file.write(b"\n]\n")
+        self._file.close()
+        self._file = None
+        os.replace(self.segments[-1] + ".part", self.segments[-1])
+        self.bytes += os.path.getsize(self.segments[-1])
+        log.info(f"Wrote {self._segment_records} records to {self.segments[-1]}")
+
+    def _write(self, batch: list):
+        while batch:
+            if self._file is None:
+                self._open()
+            room = self.rotate_records - self._segment_records if self.rotate_records else len(batch)
+            chunk, batch = batch[:room], batch[room:]
+            started = time.perf_counter()
+            data = encode_batch(chunk)
+            self.encode_seconds += time.perf_counter() - started
+            started = time.perf_counter()
+            self._file.write((b",\n" if self._segment_records else b"") + data)
+            self.write_seconds += time.perf_counter() - started
+            self._segment_records += len(chunk)
+            self.written += len(chunk)
+            if self.rotate_records and self._segment_records >= self.rotate_records:
+                self._finish()
+
+    def _run(self):
+        closing = False
+        while not closing:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _CLOSE:
+                closing = True
+                batch.pop()
+            if self.error is not None:
+                # Keep draining so producers are never stuck on a full queue.
+                continue
+            try:
+                self._write(batch)
+                if closing:
+                    if self._file is None and not self.segments:
+                        self._open()
+                    if self._file is not None:
+                        self._finish()
+            except Exception as e:
+                log.error(f"Writer for {self.path} failed: {e}")
+                self.error = e
+
+    def close(self):
+        """
+        Writes the queued records, completes the last segment and stops the thread.
+        """
+        if self.thread.is_alive():
+            self.queue.put(_CLOSE)
+            self.thread.join()
+            log.info(f"Writer {self.path}: {self.written} records in {len(self.segments)} file(s), "
+                     f"{self.encode_seconds:.2f}s encoding, {self.write_seconds:.2f}s writing, {self.stalls} stalls")
+        self._check()
+
+    def stats(self) -> dict:
+        return {"records": self.written, "segments": list(self.segments), "bytes": self.bytes, "stalls": self.stalls,
+                "queued": self.queue.qsize(), "encode_seconds": self.encode_seconds, "write_seconds": self.write_seconds}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
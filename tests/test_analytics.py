@@ -0,0 +1,34 @@
+import logging
+
+from main.main import analyze_site, record_batches
+from scraper.storage import save_links_to_json
+
+
+def test_elements_that_are_not_records_are_skipped_and_logged(tmp_path, caplog):
+    path = str(tmp_path / "products_output.json")
+    save_links_to_json([{"url": "https://example.hu/a", "title": "A", "desc": "Leírás"}, "https://example.hu/b",
+                        None, {"title": "url nélkül"}, {"url": "https://example.hu/c", "title": "", "text": ""}], path)
+    with caplog.at_level(logging.WARNING):
+        batches = list(record_batches([path]))
+    assert len(batches) == 1 and list(batches[0]["title_len"]) == [1, 0]
+    assert list(batches[0]["desc_len"]) == [len("Leírás"), 0]
+    assert [record.getMessage().split(":")[0] for record in caplog.records] == [
+        f"Skipping element {position} of {path}" for position in (1, 2, 3)]
+
+
+def test_link_lists_are_not_analysed(tmp_path):
+    path = str(tmp_path / "links_output.json")
+    save_links_to_json(["https://example.hu/a", "https://example.hu/b"], path)
+    assert list(record_batches([path])) == []
+
+
+def test_the_url_delta_is_against_the_previous_run(tmp_path):
+    path, state = str(tmp_path / "products_output.json"), str(tmp_path / "analytics")
+
+    def run(urls):
+        save_links_to_json([{"url": url, "title": "t", "desc": "d"} for url in urls], path)
+        return analyze_site("example", [path], state)["delta"]
+
+    assert run(["https://example.hu/a", "https://example.hu/b"]) is None
+    assert run(["https://example.hu/b", "https://example.hu/c"]) == {"previous_urls": 2, "new_urls": 1, "removed_urls": 1}
+    assert run(["https://example.hu/c", "https://example.hu/d"]) == {"previous_urls": 2, "new_urls": 1, "removed_urls": 1}
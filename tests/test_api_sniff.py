@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip("playwright")
+
+from scraper import get_site
+from scraper.api_sniff import detect_page_param, match_endpoint
+
+API = "https://www.motozem.hu/api/listing?cat=12&iPage=2&limit=24"
+
+
+def test_the_list_matching_most_dom_links_is_chosen():
+    site = get_site("motozem")
+    data = {
+        "banners": [{"href": "/akcio"}],
+        "result": {"items": [{"id": 1, "url": "/sisak-a"}, {"id": 2, "url": "/sisak-b"}, {"id": 3, "url": "/sisak-c"}]},
+        "related": [{"link": "https://www.motozem.hu/sisak-a"}],
+    }
+    dom_links = {"https://www.motozem.hu/sisak-a", "https://www.motozem.hu/sisak-b"}
+    endpoint = match_endpoint(API, "GET", None, data, site, dom_links)
+    assert (endpoint.items_path, endpoint.url_field, endpoint.matches) == (["result", "items"], "url", 2)
+    assert (endpoint.url, endpoint.method) == (API, "GET")
+
+
+def test_no_endpoint_without_dom_links():
+    site = get_site("motozem")
+    assert match_endpoint(API, "GET", None, {"items": [{"url": "/masik"}]}, site, {"https://www.motozem.hu/x"}) is None
+    assert match_endpoint(API, "GET", None, {"count": 3}, site, set()) is None
+
+
+def test_page_param_equal_to_the_listing_page_wins():
+    site = get_site("motozem")
+    listing = "https://www.motozem.hu/bukosisak/?iPage=2"
+    assert detect_page_param("https://www.motozem.hu/api?offset=24&pg=2", site, listing) == "pg"
+    # Falls back to the usual names, then gives up.
+    assert detect_page_param("https://www.motozem.hu/api?page=7", site, listing) == "page"
+    assert detect_page_param("https://www.motozem.hu/api?offset=24", site, listing) is None
+    assert detect_page_param("https://www.motozem.hu/api?p=1&limit=24", site, "https://www.motozem.hu/bukosisak/") == "p"
@@ -0,0 +1,47 @@
+import asyncio
+import os
+
+from scraper import archive
+from scraper.archive import WarcWriter, lookup, read_record
+
+
+def test_transfer_headers_are_replaced_by_the_archived_length(tmp_path):
+    writer = WarcWriter(str(tmp_path))
+    body = "<html>Bukósisak</html>".encode("utf-8")
+    writer.write("https://example.hu/a", 200, {"Content-Encoding": "br", "content-length": "12",
+                                               "Transfer-Encoding": "chunked", "Content-Type": "text/html"}, body)
+    asyncio.run(writer.write_async("https://example.hu/b", 200, {}, b"b"))
+    writer.close()
+    assert lookup(str(tmp_path), "https://example.hu/a") == body
+    assert lookup(str(tmp_path), "https://example.hu/b") == b"b"
+    with open(tmp_path / "index.tsv", encoding="utf-8") as f:
+        url, segment, offset, length = f.readline().rstrip("\n").split("\t")
+    record = read_record(str(tmp_path), segment, int(offset), int(length))
+    http_head = record.split(b"\r\n\r\n")[1].decode("utf-8").lower()
+    assert "content-encoding" not in http_head and "transfer-encoding" not in http_head
+    assert f"content-length: {len(body)}" in http_head
+    assert "content-type: text/html" in http_head
+
+
+def test_index_lines_are_written_after_their_records(tmp_path):
+    writer = WarcWriter(str(tmp_path), flush_bytes=1024 * 1024)
+    # More index lines than the file buffer holds.
+    urls = [f"https://example.hu/bukosisak/{'x' * 100}/{i}" for i in range(200)]
+    for url in urls:
+        writer.write(url, 200, {}, b"a")
+    writer.queue.join()
+    # The records are still in memory, so the index must not point at them yet.
+    assert os.path.getsize(tmp_path / "index.tsv") == 0
+    writer.flush()
+    assert lookup(str(tmp_path), urls[-1]) == b"a"
+    writer.close()
+
+
+def test_durable_archives_fsync_the_segment_before_the_index(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr(archive.os, "fsync", lambda fd: synced.append(fd))
+    writer = WarcWriter(str(tmp_path), durable=True)
+    writer.write("https://example.hu/a", 200, {}, b"a")
+    writer.flush()
+    assert synced == [writer.fd, writer.index.fileno()]
+    writer.close()
@@ -0,0 +1,64 @@
+import asyncio
+
+from scraper.autotune import AdaptiveLimiter, GradientTuner
+
+
+def test_memory_cap_follows_the_measured_browser_memory():
+    measured = {"mb": 0.0}
+    tuner = GradientTuner(initial=4, max_limit=16, window=2, memory_limit_mb=1200, page_memory_mb=150,
+                          memory_probe=lambda: measured["mb"])
+    # No measurement yet: the guess of 150 MB per page allows 8 pages.
+    assert tuner.max_limit == 8
+    measured["mb"] = 4 * 400.0
+    tuner.record(1.0)
+    tuner.record(1.0)
+    # 400 MB per page in flight: 3 pages fit into 1200 MB.
+    assert tuner.max_limit == 3 and tuner.limit <= 3
+    measured["mb"] = 3 * 50.0
+    tuner.record(1.0)
+    tuner.record(1.0)
+    assert tuner.max_limit == 16
+
+
+def test_limiter_reports_saturation():
+    async def run():
+        limiter = AdaptiveLimiter(GradientTuner(initial=1, max_limit=1))
+        assert not limiter.saturated
+        started = await limiter.acquire()
+        assert limiter.saturated
+        await limiter.release(started)
+        assert not limiter.saturated
+
+    asyncio.run(run())
+
+
+def test_workers_can_follow_a_limit_raised_above_the_starting_memory_cap():
+    async def run():
+        tuner = GradientTuner(initial=2, max_limit=8, memory_limit_mb=300, page_memory_mb=150)
+        limiter = AdaptiveLimiter(tuner)
+        # The memory cap allows 2 pages at the start, but every worker the limit may need is started.
+        assert tuner.max_limit == 2 and limiter.workers == 8
+        peak = 0
+        release = asyncio.Event()
+
+        async def worker():
+            nonlocal peak
+            started = await limiter.acquire()
+            peak = max(peak, limiter.in_flight)
+            await release.wait()
+            await limiter.release(started)
+
+        tasks = [asyncio.create_task(worker()) for _ in range(limiter.workers)]
+        await asyncio.sleep(0)
+        assert limiter.in_flight == 2
+        # The measured memory leaves room for more pages and the tuner raises the limit.
+        tuner.max_limit = tuner.estimate = 6
+        async with limiter.condition:
+            limiter.condition.notify_all()
+        await asyncio.sleep(0)
+        assert limiter.in_flight == 6
+        release.set()
+        await asyncio.gather(*tasks)
+        assert peak == 6
+
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from urllib.request import urlopen
+
+import pytest
+
+from scraper import fixture_server
+from scraper.browser_server import close_browser, launch_browser, state_file, warm_context
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_connected_worker_gets_the_seeded_cookies_and_leaves_the_server_running(tmp_path):
+    pytest.importorskip("playwright")
+    from playwright.sync_api import sync_playwright
+
+    shop = fixture_server.start()
+    base_url = f"http://127.0.0.1:{shop.server_address[1]}/"
+    seeded = tmp_path / "state.json"
+    seeded.write_text(json.dumps({"cookies": [{"name": "consent", "value": "yes", "domain": "127.0.0.1", "path": "/",
+                                               "expires": -1, "httpOnly": False, "secure": False, "sameSite": "Lax"}],
+                                  "origins": []}))
+    port = free_port()
+    endpoint = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([sys.executable, "-m", "scraper.browser_server", "--port", str(port),
+                               "--storage-state", str(seeded)])
+    try:
+        deadline = time.monotonic() + 60
+        while not os.path.exists(state_file(port)):
+            assert time.monotonic() < deadline and server.poll() is None
+            time.sleep(0.2)
+        for _ in range(2):
+            with sync_playwright() as p:
+                browser = launch_browser(p, endpoint=endpoint)
+                context = warm_context(browser, endpoint)
+                page = context.new_page()
+                page.goto(base_url + "product/1")
+                assert {"consent": "yes"}.items() <= {c["name"]: c["value"] for c in context.cookies()}.items()
+                context.close()
+                close_browser(browser, endpoint)
+            with urlopen(endpoint + "/json/version", timeout=10) as response:
+                assert response.status == 200
+    finally:
+        # SIGINT stops the server like Ctrl+C, which also removes its state file.
+        server.send_signal(signal.SIGINT)
+        server.wait(timeout=30)
+        shop.shutdown()
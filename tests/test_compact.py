@@ -0,0 +1,27 @@
+import pytest
+
+from scraper.compact import Record, UrlSet, UrlStore
+
+URLS = ["https://www.motoroazis.hu/bukosisak?page=2", "https://www.motoroazis.hu/csizma", "https://totalbike.hu/"]
+
+
+def test_url_store_indexes_like_a_list():
+    store = UrlStore(URLS)
+    assert list(store) == URLS
+    for index in range(-len(URLS), len(URLS)):
+        assert store[index] == URLS[index]
+    for index in (len(URLS), -len(URLS) - 1):
+        with pytest.raises(IndexError):
+            store[index]
+
+
+def test_url_set_add_reports_new_urls():
+    seen = UrlSet(merge_every=2)
+    assert [seen.add(url) for url in URLS + URLS[:1]] == [True, True, True, False]
+    assert len(seen) == 3 and seen.issuperset(URLS)
+
+
+def test_blog_records_keep_their_text_key():
+    record = Record.from_dict({"url": "https://example.hu/blog/1", "title": "Poszt", "text": "szöveg"})
+    assert record.desc == "szöveg"
+    assert record.to_dict("text") == {"url": "https://example.hu/blog/1", "title": "Poszt", "text": "szöveg"}
@@ -0,0 +1,102 @@
+import json
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from scraper import fixture_server
+from scraper.distributed import DETAIL, Frontier, run_coordinator
+
+
+def items(urls):
+    return [{"url": url, "kind": DETAIL} for url in urls]
+
+
+def record(url):
+    return {"url": url, "title": "Termék", "desc": "leírás"}
+
+
+def test_failed_items_are_retried_and_the_good_records_of_the_lease_kept():
+    frontier = Frontier(max_attempts=3)
+    frontier.add(items(["a", "b", "c"]))
+    lease = frontier.lease("w1", 3)
+    reply = frontier.complete(lease["lease_id"], [record("a"), record("c")], [], [{"url": "b", "error": "timeout"}])
+    assert reply["accepted"] == 2
+    assert [r.url for r in frontier.take_records()] == ["a", "c"]
+    retry = frontier.lease("w1", 3)
+    assert [item["url"] for item in retry["items"]] == ["b"]
+    frontier.complete(retry["lease_id"], [record("b")], [])
+    assert frontier.status() == {"pending": 0, "leased": 0, "done": 3, "records": 3, "retrying": 0, "parked": 0}
+    assert frontier.lease("w1", 3)["finished"]
+
+
+def test_items_are_parked_after_max_attempts_so_the_crawl_finishes():
+    frontier = Frontier(lease_seconds=0, max_attempts=2)
+    frontier.add(items(["a", "b"]))
+    # An expired lease counts as one failure for each of its items.
+    frontier.lease("w1", 2)
+    lease = frontier.lease("w2", 2)
+    frontier.complete(lease["lease_id"], [record("a")], [], [{"url": "b", "error": "timeout"}])
+    assert [entry["url"] for entry in frontier.parked] == ["b"]
+    assert frontier.status()["parked"] == 1
+    assert frontier.lease("w1", 2)["finished"]
+
+
+def test_the_last_report_finishes_the_crawl_at_once():
+    frontier = Frontier()
+    frontier.add(items(["a", "b"]))
+    first = frontier.lease("w1", 1)
+    second = frontier.lease("w2", 1)
+    assert not frontier.complete(first["lease_id"], [record("a")], [])["finished"]
+    assert not frontier.finished.is_set()
+    reply = frontier.complete(second["lease_id"], [record("b")], [])
+    assert reply["finished"] and frontier.finished.is_set()
+    # Links discovered later reopen the crawl.
+    frontier.add(items(["c"]))
+    assert not frontier.finished.is_set()
+
+
+def test_records_taken_once():
+    frontier = Frontier()
+    frontier.add(items(["a"]))
+    lease = frontier.lease("w1", 1)
+    frontier.complete(lease["lease_id"], [record("a"), record("a")], [])
+    assert len(frontier.take_records()) == 1
+    assert frontier.take_records() == []
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_workers_in_separate_processes_crawl_the_fixture_shop(tmp_path):
+    pytest.importorskip("playwright")
+    shop = fixture_server.start()
+    base_url = f"http://127.0.0.1:{shop.server_address[1]}/"
+    site = fixture_server.fixture_site(base_url, str(tmp_path))
+    good = [f"{base_url}product/{i}" for i in range(12)]
+    # Nothing listens on port 9: these fail on every attempt and must be parked.
+    bad = [f"http://127.0.0.1:9/product/{i}" for i in range(2)]
+    output = str(tmp_path / "output.json")
+    port = free_port()
+    result = {}
+    coordinator = threading.Thread(target=lambda: result.update(run_coordinator(
+        site, items(good + bad), output, port=port, lease_seconds=60, flush_seconds=0.5, max_attempts=2)))
+    coordinator.start()
+    try:
+        workers = [subprocess.Popen([sys.executable, "-m", "scraper.distributed", "worker", "--headless", "--batch-size", "3",
+                                     "--coordinator", f"http://127.0.0.1:{port}"]) for _ in range(2)]
+        for worker in workers:
+            assert worker.wait(timeout=300) == 0
+        coordinator.join(timeout=60)
+    finally:
+        shop.shutdown()
+    assert result["records"] == len(good) and result["parked"] == len(bad)
+    with open(output, encoding="utf-8") as f:
+        assert sorted(r["url"] for r in json.load(f)) == sorted(good)
+    with open(output + ".failed.json", encoding="utf-8") as f:
+        assert sorted(r["url"] for r in json.load(f)) == sorted(bad)
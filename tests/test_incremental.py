@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("playwright")
+
+from scraper import get_site, incremental
+from scraper.incremental import find_new_links
+
+
+@pytest.fixture
+def blog(monkeypatch):
+    listing = {
+        "https://totalbike.hu/technika/nepperuzo/?p=0": ["/uj-2", "/uj-1", "/regi-1"],
+        "https://totalbike.hu/technika/nepperuzo/?p=1": ["/regi-2", "/regi-3"],
+        "https://totalbike.hu/technika/nepperuzo/?p=2": ["/regi-4"],
+    }
+    visited = []
+
+    class Page:
+        url = None
+
+    def goto(page, site, url):
+        visited.append(url)
+        page.url = url
+
+    monkeypatch.setattr(incremental, "goto", goto)
+    monkeypatch.setattr(incremental, "scrape_listing_links", lambda page, site: listing.get(page.url, []))
+    return Page(), listing, visited
+
+
+def test_the_walk_stops_at_the_first_page_of_known_posts(blog):
+    page, listing, visited = blog
+    assert find_new_links(page, get_site("totalbike"), {"/regi-1", "/regi-2", "/regi-3"}) == ["/uj-2", "/uj-1"]
+    assert len(visited) == 2
+
+
+def test_new_posts_on_deeper_pages_are_found_newest_first(blog):
+    page, listing, visited = blog
+    assert find_new_links(page, get_site("totalbike"), {"/regi-4"}) == ["/uj-2", "/uj-1", "/regi-1", "/regi-2", "/regi-3"]
+    assert len(visited) == 3
+
+
+def test_an_empty_page_or_max_pages_ends_the_walk(blog):
+    page, listing, visited = blog
+    assert len(find_new_links(page, get_site("totalbike"), set())) == 6
+    assert visited[-1] == "https://totalbike.hu/technika/nepperuzo/?p=3"
+    visited.clear()
+    assert find_new_links(page, get_site("totalbike"), set(), max_pages=1) == ["/uj-2", "/uj-1", "/regi-1"]
+    assert len(visited) == 1
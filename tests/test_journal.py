@@ -0,0 +1,112 @@
+import json
+import os
+
+import pytest
+
+from scraper.journal import CheckpointJournal
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "output.json"), str(tmp_path / "checkpoint.txt")
+
+
+def records(start, stop):
+    return [{"url": f"https://example.hu/p/{i}", "title": f"Termék {i}", "desc": "leírás"} for i in range(start, stop)]
+
+
+def output_urls(output):
+    with open(output, encoding="utf-8") as f:
+        return [record["url"] for record in json.load(f)]
+
+
+def test_commits_and_compaction_append_in_the_save_links_to_json_layout(paths):
+    output, checkpoint = paths
+    journal = CheckpointJournal(output, checkpoint, compact_every=2)
+    for n in range(5):
+        journal.commit(records(n * 3, n * 3 + 3), n * 3 + 3)
+    journal.close()
+    with open(output, encoding="utf-8") as f:
+        text = f.read()
+    assert text == json.dumps(records(0, 15), ensure_ascii=False, indent=2)
+    assert CheckpointJournal(output, checkpoint).next == 15
+
+
+def test_crash_before_compaction_replays_the_log(paths):
+    output, checkpoint = paths
+    journal = CheckpointJournal(output, checkpoint, compact_every=100)
+    journal.commit(records(0, 2), 2)
+    journal.commit(records(2, 4), 4)
+    journal.log.close()  # crash: no compaction, no close()
+    recovered = CheckpointJournal(output, checkpoint)
+    assert recovered.next == 4
+    assert output_urls(output) == [r["url"] for r in records(0, 4)]
+
+
+def test_torn_tail_is_truncated_before_new_commits(paths):
+    output, checkpoint = paths
+    journal = CheckpointJournal(output, checkpoint, compact_every=100)
+    journal.commit(records(0, 2), 2)
+    journal.log.write('{"next": 3, "rec')
+    journal.log.close()
+    recovered = CheckpointJournal(output, checkpoint, compact_every=100)
+    assert recovered.next == 2
+    recovered.commit(records(2, 3), 3)
+    recovered.commit(records(3, 4), 4)
+    recovered.log.close()  # crash again
+    again = CheckpointJournal(output, checkpoint)
+    assert again.next == 4
+    assert output_urls(output) == [r["url"] for r in records(0, 4)]
+
+
+def test_torn_first_commit(paths):
+    output, checkpoint = paths
+    CheckpointJournal(output, checkpoint).close()
+    with open(checkpoint, "a", encoding="utf-8") as f:
+        f.write('{"next": 1, "rec')
+    recovered = CheckpointJournal(output, checkpoint, compact_every=100)
+    assert recovered.next == 0
+    recovered.commit(records(0, 1), 1)
+    recovered.commit(records(1, 2), 2)
+    recovered.log.close()
+    again = CheckpointJournal(output, checkpoint)
+    assert again.next == 2
+    assert output_urls(output) == [r["url"] for r in records(0, 2)]
+
+
+def test_interrupted_append_is_cut_back(paths):
+    output, checkpoint = paths
+    journal = CheckpointJournal(output, checkpoint, compact_every=100)
+    journal.commit(records(0, 2), 2)
+    journal.compact()
+    journal.commit(records(2, 4), 4)
+    journal.log.close()
+    with open(output, "ab") as f:
+        f.write(b',\n  {"url": "half')  # append of the next compaction interrupted
+    recovered = CheckpointJournal(output, checkpoint)
+    assert recovered.next == 4
+    assert output_urls(output) == [r["url"] for r in records(0, 4)]
+
+
+def test_empty_checkpoint_file(paths):
+    output, checkpoint = paths
+    open(checkpoint, "w").close()
+    journal = CheckpointJournal(output, checkpoint)
+    assert journal.next == 0
+    journal.commit(records(0, 1), 1)
+    journal.close()
+    assert output_urls(output) == [records(0, 1)[0]["url"]]
+
+
+def test_plain_number_checkpoint_is_converted(paths):
+    output, checkpoint = paths
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(records(0, 3), f)
+    with open(checkpoint, "w", encoding="utf-8") as f:
+        f.write("3")
+    journal = CheckpointJournal(output, checkpoint)
+    assert journal.next == 3
+    journal.commit(records(3, 5), 5)
+    journal.close()
+    assert output_urls(output) == [r["url"] for r in records(0, 5)]
+    assert not os.path.exists(output + ".tmp")
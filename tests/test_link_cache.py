@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from scraper import get_site, link_cache
+from scraper.link_cache import fingerprint, refresh_category
+
+PAGES = ["https://www.motoroazis.hu/sisak", "https://www.motoroazis.hu/sisak?page=2", "https://www.motoroazis.hu/sisak?page=3"]
+
+
+@pytest.fixture
+def listing(monkeypatch):
+    content = {PAGES[0]: ["/a", "/b"], PAGES[1]: ["/c", "/d"], PAGES[2]: ["/e"]}
+    visited = []
+
+    def visit(page, site, url):
+        visited.append(url)
+        return list(content[url])
+
+    monkeypatch.setattr(link_cache, "_visit", visit)
+    return content, visited
+
+
+def refresh(entry, **options):
+    return refresh_category(None, get_site("motoroazis"), PAGES, entry, **options)
+
+
+def test_a_new_category_is_crawled_in_full(listing):
+    content, visited = listing
+    entry = refresh(None)
+    assert visited == PAGES
+    assert entry["links"] == ["/a", "/b", "/c", "/d", "/e"]
+    assert entry["fingerprint"] == fingerprint(["/a", "/b"]) and entry["crawled"] == entry["checked"]
+
+
+def test_an_unchanged_first_page_skips_the_deeper_pages(listing):
+    content, visited = listing
+    entry = refresh(None)
+    visited.clear()
+    assert refresh(entry)["links"] == ["/a", "/b", "/c", "/d", "/e"]
+    assert visited == PAGES[:1]
+
+
+def test_a_changed_category_stops_at_the_first_page_of_known_links(listing):
+    content, visited = listing
+    entry = refresh(None)
+    visited.clear()
+    content[PAGES[0]] = ["/new", "/a"]
+    content[PAGES[1]] = ["/b", "/c"]
+    entry = refresh(entry)
+    assert visited == PAGES[:2]
+    assert entry["links"][0] == "/new" and set(entry["links"]) == {"/new", "/a", "/b", "/c", "/d", "/e"}
+
+
+def test_an_expired_category_is_crawled_again_and_drops_gone_links(listing):
+    content, visited = listing
+    entry = refresh(None)
+    entry["crawled"] = time.time() - 2 * 3600
+    content[PAGES[2]] = []
+    visited.clear()
+    assert refresh(entry, max_age=24 * 3600)["links"] == ["/a", "/b", "/c", "/d", "/e"]
+    assert visited == PAGES[:1]
+    entry = refresh(entry, max_age=3600)
+    assert visited[1:] == PAGES
+    assert entry["links"] == ["/a", "/b", "/c", "/d"]
@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("playwright")
+
+from scraper.prefetch import final_response
+
+
+class Request:
+    def __init__(self, navigation):
+        self.navigation = navigation
+
+    def is_navigation_request(self):
+        return self.navigation
+
+
+class Response:
+    def __init__(self, status, frame="main", navigation=True):
+        self.status, self.frame, self.request = status, frame, Request(navigation)
+
+
+def keep(*responses):
+    kept = None
+    for response in responses:
+        kept = final_response(kept, response, "main")
+    return kept
+
+
+def test_redirects_are_followed_to_the_final_response():
+    final = Response(200)
+    assert keep(Response(301), Response(302), final) is final
+
+
+def test_later_navigations_and_subresources_do_not_replace_the_final_response():
+    final = Response(200)
+    assert keep(final, Response(200, navigation=False), Response(200, frame="iframe"), Response(404)) is final
+    assert keep(Response(200, frame="iframe")) is None
@@ -0,0 +1,88 @@
+import asyncio
+import os
+from collections import Counter, defaultdict
+
+import pytest
+
+from scraper import profiling
+from scraper.profiling import devtools_trace, devtools_trace_async, render_flamegraph, timed
+
+
+@pytest.fixture
+def profiler(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling.profiler, "enabled", True)
+    monkeypatch.setattr(profiling.profiler, "output_dir", str(tmp_path))
+    monkeypatch.setattr(profiling.profiler, "trace_rate", 1.0)
+    monkeypatch.setattr(profiling.profiler, "traces", 0)
+    monkeypatch.setattr(profiling.profiler, "stage_stats",
+                        defaultdict(lambda: {"calls": 0, "total": 0.0, "max": 0.0}))
+    return profiling.profiler
+
+
+def test_timed_records_functions_and_coroutines(profiler):
+    @timed("sync stage")
+    def work():
+        return 1
+
+    @timed("async stage")
+    async def async_work():
+        await asyncio.sleep(0.01)
+        return 2
+
+    assert work() + work() + asyncio.run(async_work()) == 4
+    assert profiler.stage_stats["sync stage"]["calls"] == 2
+    assert profiler.stage_stats["async stage"]["total"] >= 0.01
+
+
+def test_timed_records_nothing_when_disabled(profiler, monkeypatch):
+    monkeypatch.setattr(profiler, "enabled", False)
+    timed("off")(lambda: None)()
+    assert "off" not in profiler.stage_stats
+
+
+class Browser:
+    def __init__(self):
+        self.calls = []
+
+    def start_tracing(self, page=None, path=None, screenshots=True):
+        self.calls.append(("start", os.path.basename(path)))
+
+    def stop_tracing(self):
+        self.calls.append(("stop",))
+
+
+class AsyncBrowser(Browser):
+    async def start_tracing(self, **options):
+        Browser.start_tracing(self, **options)
+
+    async def stop_tracing(self):
+        Browser.stop_tracing(self)
+
+
+class Page:
+    def __init__(self, browser):
+        self.context = type("Context", (), {"browser": browser})()
+
+
+def test_devtools_traces_one_page_at_a_time(profiler):
+    browser = AsyncBrowser()
+
+    async def load(url, delay):
+        async with devtools_trace_async(Page(browser), url):
+            await asyncio.sleep(delay)
+
+    async def run():
+        await asyncio.gather(load("https://example.hu/a", 0.05), load("https://example.hu/b", 0.01))
+
+    asyncio.run(run())
+    assert browser.calls == [("start", "0001_https_example_hu_a.json"), ("stop",)]
+    sync_browser = Browser()
+    with devtools_trace(Page(sync_browser), "https://example.hu/c"):
+        pass
+    assert sync_browser.calls == [("start", "0002_https_example_hu_c.json"), ("stop",)]
+    assert not profiler.tracing
+
+
+def test_flamegraph_has_a_rect_per_frame():
+    svg = render_flamegraph(Counter({"MainThread;main;load": 3, "MainThread;main;parse": 1}))
+    assert svg.count("<rect") == 4 and "load (3 samples)" in svg
@@ -0,0 +1,55 @@
+import asyncio
+import os
+
+import pytest
+
+from scraper.replay import NOT_FOUND, open_context, open_context_async, recording_options
+
+
+class Context:
+    def __init__(self, **options):
+        self.options, self.routes = options, []
+
+    def route_from_har(self, path, not_found=None):
+        self.routes.append((path, not_found))
+
+
+class Browser:
+    def new_context(self, **options):
+        return Context(**options)
+
+
+class AsyncContext(Context):
+    async def route_from_har(self, path, not_found=None):
+        Context.route_from_har(self, path, not_found)
+
+
+class AsyncBrowser:
+    async def new_context(self, **options):
+        return AsyncContext(**options)
+
+
+def test_recording_options_create_the_directory_and_pick_the_content_mode(tmp_path):
+    zipped = recording_options(str(tmp_path / "archives" / "pardi.har.zip"))
+    assert os.path.isdir(tmp_path / "archives")
+    assert zipped["record_har_content"] == "attach" and zipped["service_workers"] == "block"
+    assert recording_options(str(tmp_path / "pardi.har"))["record_har_content"] == "embed"
+
+
+def test_contexts_record_replay_or_stay_live(tmp_path):
+    har = str(tmp_path / "pardi.har")
+    assert open_context(Browser(), record_har=har).options["record_har_path"] == har
+    replaying = open_context(Browser(), replay_har=har)
+    assert replaying.routes == [(har, NOT_FOUND)] and replaying.options == {"service_workers": "block"}
+    live = open_context(Browser())
+    assert live.options == {} and live.routes == []
+    with pytest.raises(ValueError):
+        open_context(Browser(), record_har=har, replay_har=har)
+
+
+def test_async_contexts_replay_like_the_sync_ones(tmp_path):
+    har = str(tmp_path / "pardi.har")
+    replaying = asyncio.run(open_context_async(AsyncBrowser(), replay_har=har))
+    assert replaying.routes == [(har, NOT_FOUND)]
+    with pytest.raises(ValueError):
+        asyncio.run(open_context_async(AsyncBrowser(), record_har=har, replay_har=har))
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from scraper.revisit import RevisitScheduler, content_hash
+
+DAY = 86400.0
+
+
+def test_hash_ignores_whitespace_extra_fields_and_the_text_key():
+    dom = {"url": "u", "title": " Arai  RX-7V ", "text": "Bukósisak\n\nleírás"}
+    structured = {"url": "u", "title": "Arai RX-7V", "desc": "Bukósisak leírás", "sku": "RX7V", "source": "json-ld"}
+    assert content_hash(dom) == content_hash(structured)
+
+
+def test_first_check_of_a_seeded_url_is_only_the_baseline(tmp_path):
+    scheduler = RevisitScheduler(str(tmp_path / "state.json"))
+    scheduler.seed([{"url": "u", "title": "Régi", "desc": "kinyert szöveg"}], fetched_at=0.0)
+    assert not scheduler.observe({"url": "u", "title": "Régi", "desc": "másképp kinyert szöveg"}, fetched_at=DAY)
+    entry = scheduler.history["u"]
+    assert (entry["checks"], entry["changes"], entry["observed"]) == (0, 0, DAY)
+    assert scheduler.observe({"url": "u", "title": "Új", "desc": "másképp kinyert szöveg"}, fetched_at=2 * DAY)
+    assert (entry["checks"], entry["changes"]) == (1, 1)
+
+
+def test_failures_are_recorded_and_lower_the_score(tmp_path):
+    scheduler = RevisitScheduler(str(tmp_path / "state.json"))
+    for url in ("a", "b"):
+        scheduler.observe({"url": url, "title": url, "desc": "x"}, fetched_at=0.0)
+    scheduler.fail("a")
+    scheduler.fail("new")
+    # "new" failed before its first fetch: known now, and behind the pages that did load.
+    assert scheduler.plan(["a", "b", "new", "other"], budget=4, now=10 * DAY) == ["other", "b", "a", "new"]
+    assert scheduler.history["a"]["failures"] == 1
+    scheduler.observe({"url": "a", "title": "a", "desc": "x"}, fetched_at=11 * DAY)
+    assert "failures" not in scheduler.history["a"]
+    assert not scheduler.observe({"url": "new", "title": "n", "desc": "x"}, fetched_at=11 * DAY)
+    scheduler.save()
+    assert RevisitScheduler(str(tmp_path / "state.json")).history.keys() == scheduler.history.keys()
+
+
+def test_selector_health_abort_stops_a_revisit_but_load_errors_do_not(tmp_path, monkeypatch):
+    pytest.importorskip("playwright")
+    from dataclasses import replace
+
+    from scraper import get_site, pipeline, revisit
+    from scraper.selector_health import SelectorHealthError
+
+    def process_item(page, site, url, *args):
+        if url == "broken":
+            raise pipeline.PageLoadError(f"Error loading {url}")
+        if url == "abort":
+            raise SelectorHealthError("product_desc stopped matching")
+        return {"url": url, "title": url, "desc": "x"}
+
+    monkeypatch.setattr(pipeline, "process_item", process_item)
+    site = replace(get_site("motoroazis"), output_dir=str(tmp_path))
+    links = str(tmp_path / "links.json")
+    corpus = str(tmp_path / "corpus.json")
+    revisit.save_links_to_json(["broken", "ok", "abort", "later"], links)
+    with pytest.raises(SelectorHealthError):
+        revisit.revisit_corpus(None, site, links, corpus, budget=10)
+    assert [record["url"] for record in revisit.load_links_from_json(corpus)] == ["ok"]
+    assert os.path.exists(revisit.state_file(site))
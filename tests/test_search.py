@@ -0,0 +1,53 @@
+import pytest
+
+from scraper.search import SearchIndex, analyze, find_output_files, site_for, stem
+
+
+@pytest.mark.parametrize("forms", [
+    ("bukósisak", "bukósisakok", "bukósisakot", "bukósisakokat", "bukósisakban"),
+    ("kabát", "kabátok", "kabátot", "kabátokat", "kabátban"),
+    ("csizma", "csizmák", "csizmákat", "csizmában"),
+    ("kesztyű", "kesztyűk", "kesztyűkben"),
+    ("motoros", "motorosok"),
+    ("méret", "méretek"),
+    ("plexi", "plexik"),
+])
+def test_singular_and_plural_share_a_stem(forms):
+    assert len({analyze(form) for form in forms}) == 1
+
+
+def test_bare_stems_keep_their_endings():
+    assert analyze("kabát") == "kabat"
+    assert analyze("motoros") == "motoros"
+    assert stem("arai") == "arai"
+
+
+def test_plural_query_finds_singular_records(tmp_path):
+    index = SearchIndex(str(tmp_path / "index.sqlite"))
+    index.add([
+        {"url": "https://example.hu/1", "title": "Gaerne csizma", "desc": "Vízálló motoros csizma."},
+        {"url": "https://example.hu/2", "title": "Téli kabát", "desc": "Bélelt kabát."},
+    ], "example")
+    assert [hit["url"] for hit in index.search("csizmák")] == ["https://example.hu/1"]
+    assert [hit["url"] for hit in index.search("kabátok")] == ["https://example.hu/2"]
+    index.close()
+
+
+@pytest.mark.parametrize("path, site", [
+    ("mototoazis/blog_pages_output.json", "motoroazis_blog"),
+    ("mototoazis/products_output.json", "motoroazis"),
+    ("mototoazis/motoroazis_blog_final_output.json.gz", "motoroazis_blog"),
+    ("mototoazis/motoroazis_final_output.00001.json", "motoroazis"),
+    ("mototoazis/notes.json", "mototoazis"),
+    ("motozem/motozen_final_output.json", "motozem"),
+    ("totalbike/clear_totalbike_posts.json", "totalbike"),
+])
+def test_output_files_map_to_their_site(path, site):
+    assert site_for(path) == site
+
+
+def test_only_site_directories_are_searched_for_outputs(tmp_path):
+    for directory in ("totalbike", "soak", "fixture"):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / "output.json").write_text("[]", encoding="utf-8")
+    assert find_output_files(str(tmp_path)) == [str(tmp_path / "totalbike" / "output.json")]
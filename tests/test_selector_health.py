@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from scraper import get_site, selector_health
+from scraper.selector_health import SelectorHealthError, SelectorMonitor
+
+
+def monitor(**options):
+    options = {"window": 10, "min_samples": 5, "max_empty_rate": 0.6, "min_increase": 0.3, **options}
+    return SelectorMonitor(get_site("pardi"), **options)
+
+
+def feed(m, key, hits):
+    for hit in hits:
+        m.record(key, hit)
+
+
+def test_nothing_trips_before_min_samples():
+    m = monitor()
+    feed(m, "product_title", [False] * 4)
+    assert m.unhealthy() == []
+    m.record("product_title", False)
+    assert m.unhealthy() == ["product_title"]
+
+
+def test_the_window_only_keeps_the_last_observations():
+    m = monitor()
+    feed(m, "product_title", [False] * 10 + [True] * 10)
+    assert m.empty_rate("product_title") == 0.0
+    assert m.baseline_rate("product_title") == 1.0
+    assert m.unhealthy() == []
+
+
+def test_a_field_that_was_always_often_empty_does_not_trip():
+    m = monitor()
+    # 70% empty before the window and in it: above max_empty_rate, but no increase.
+    feed(m, "product_desc", [False, True, False, False, True, False, False, True, False, False] * 3)
+    assert m.empty_rate("product_desc") == pytest.approx(0.7)
+    assert m.baseline_rate("product_desc") == pytest.approx(0.7)
+    assert m.unhealthy() == []
+
+
+def test_a_jump_in_the_empty_rate_trips_only_that_key():
+    m = monitor()
+    feed(m, "product_title", [True] * 20 + [False] * 6)
+    feed(m, "product_desc", [True] * 26)
+    assert m.empty_rate("product_title") == pytest.approx(0.6)
+    assert m.baseline_rate("product_title") == 0.0
+    assert m.unhealthy() == ["product_title"]
+
+
+def test_pauses_clear_the_windows_until_max_pauses():
+    m = monitor(action="pause", max_pauses=1)
+    feed(m, "product_title", [False] * 10)
+    assert not m.should_abort() and m.unhealthy() == []
+    feed(m, "product_title", [False] * 10)
+    assert m.should_abort()
+    assert monitor().should_abort()
+    with pytest.raises(ValueError):
+        monitor(action="retry")
+
+
+class Page:
+    url = "https://www.pardi.hu/termek"
+
+    async def query_selector(self, css):
+        return None
+
+    async def evaluate(self, script, arg=None):
+        return []
+
+
+def test_an_async_pause_holds_the_other_workers_too(monkeypatch):
+    site = get_site("pardi")
+    monkeypatch.setattr(selector_health, "save_links_to_json", lambda report, path: None)
+    m = selector_health.enable(site, action="pause", window=10, min_samples=5, pause_seconds=0.2, max_pauses=1)
+    feed(m, "product_title", [False] * 4)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        trip = asyncio.create_task(selector_health.observe_async(Page(), site, {"product_title": ""}))
+        await asyncio.sleep(0.05)
+        started = loop.time()
+        await selector_health.observe_async(Page(), site, {"product_desc": "leírás"})
+        waited = loop.time() - started
+        await trip
+        return waited
+
+    try:
+        assert asyncio.run(run()) >= 0.1
+        feed(m, "product_title", [False] * 4)
+        with pytest.raises(SelectorHealthError):
+            asyncio.run(selector_health.observe_async(Page(), site, {"product_title": ""}))
+    finally:
+        selector_health.disable()
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from scraper.session import AssetCache
+
+BIG = b"x" * (32 * 1024)
+
+
+@pytest.mark.parametrize("status, headers, body, stored", [
+    (200, {"cache-control": "public, max-age=3600"}, BIG, True),
+    (200, {}, BIG, True),
+    (200, {"cache-control": "public, max-age=3600"}, b"small", False),
+    (200, {"cache-control": "no-store"}, BIG, False),
+    (200, {"cache-control": "private, max-age=3600"}, BIG, False),
+    (200, {"set-cookie": "id=1"}, BIG, False),
+    (404, {}, BIG, False),
+])
+def test_only_large_cacheable_responses_are_stored(tmp_path, status, headers, body, stored):
+    cache = AssetCache(str(tmp_path))
+    assert cache.store("https://example.hu/app.js", status, headers, body) is stored
+    assert (cache.load("https://example.hu/app.js") is not None) is stored
+
+
+def test_entries_expire_with_their_max_age(tmp_path):
+    cache = AssetCache(str(tmp_path))
+    cache.store("https://example.hu/app.js", 200, {"cache-control": "max-age=0"}, BIG)
+    assert cache.load("https://example.hu/app.js") is None
+
+
+class Request:
+    def __init__(self, url, resource_type="script"):
+        self.url, self.resource_type, self.method = url, resource_type, "GET"
+
+
+class Response:
+    status, headers = 200, {"cache-control": "max-age=3600", "content-length": str(len(BIG))}
+
+    async def body(self):
+        return BIG
+
+
+class Route:
+    def __init__(self, request):
+        self.request = request
+        self.calls = []
+
+    async def fallback(self):
+        self.calls.append("fallback")
+
+    async def fetch(self):
+        self.calls.append("fetch")
+        return Response()
+
+    async def fulfill(self, **kwargs):
+        self.calls.append("fulfill")
+        self.fulfilled = kwargs
+
+
+def test_async_handler_serves_assets_from_disk(tmp_path):
+    cache = AssetCache(str(tmp_path))
+
+    async def load(url, resource_type="script"):
+        route = Route(Request(url, resource_type))
+        await cache.handle_async(route)
+        return route
+
+    assert asyncio.run(load("https://example.hu/app.js")).calls == ["fetch", "fulfill"]
+    second = asyncio.run(load("https://example.hu/app.js"))
+    assert second.calls == ["fulfill"] and second.fulfilled["body"] == BIG
+    assert "content-length" not in second.fulfilled["headers"]
+    assert asyncio.run(load("https://example.hu/photo.js", "image")).calls == ["fallback"]
+    assert (cache.hits, cache.misses) == (1, 1)
@@ -0,0 +1,59 @@
+import pytest
+
+from scraper.sites import SITES, SiteConfig, get_site, is_empty_record, selector_chain, site_from_dict
+
+
+def test_every_site_is_registered_under_its_name_with_the_detail_selectors():
+    for name, site in SITES.items():
+        assert get_site(name) is site and site.name == name
+        assert {"product", "product_title", "product_desc"} <= set(site.selectors)
+        assert site.base_url.startswith("https://")
+
+
+def test_unknown_site_lists_the_known_ones():
+    with pytest.raises(ValueError, match="pardi"):
+        get_site("nincs")
+
+
+def test_defaults_keep_the_baseline_records():
+    site = SiteConfig(name="example", base_url="https://example.hu/", selectors={})
+    assert (site.page_param, site.first_page, site.pagination_mode) == ("page", 1, "last_page")
+    assert (site.desc_key, site.desc_from, site.structured_data) == ("desc", "inner_text", False)
+    assert not (site.skip_empty_desc or site.skip_load_errors or site.join_desc_parts)
+    assert site.settle_delay == 0.0
+
+
+def test_sites_keep_the_behaviour_of_their_original_scripts():
+    assert get_site("motoroazis_blog").desc_key == "text"
+    assert get_site("motoroazis").skip_load_errors and get_site("motoroazis").skip_empty_desc
+    assert get_site("jaszmotor").desc_from == "text_content"
+    assert get_site("motozem").settle_delay == get_site("pardi").settle_delay == 2.0
+    assert get_site("totalbike").first_page == 0 and get_site("totalbike").unwrap_redirects
+
+
+def test_site_survives_a_json_round_trip():
+    import json
+    from dataclasses import asdict
+
+    site = get_site("tornadohelmets")
+    assert site_from_dict(json.loads(json.dumps(asdict(site)))) == SiteConfig(**{
+        **asdict(site), "selectors": {key: list(value) if isinstance(value, tuple) else value
+                                      for key, value in site.selectors.items()}})
+    assert selector_chain("a.b") == ("a.b",)
+    assert selector_chain(["a", "b"]) == ("a", "b")
+
+
+@pytest.mark.parametrize("site, title, desc, skipped", [
+    ("pardi", "Termék", "Leírás", False),
+    ("pardi", "Termék", "", False),
+    ("pardi", "", "Leírás", False),
+    # Blank title and description: skipped on every site. The original scripts only
+    # skipped them when both were non-empty whitespace, so empty pages used to be saved.
+    ("pardi", "", "", True),
+    ("pardi", "  ", "\n", True),
+    # motoroazis also skips products without a description, as its script did.
+    ("motoroazis", "Termék", " ", True),
+    ("motoroazis", "Termék", "Leírás", False),
+])
+def test_record_skipping_rules(site, title, desc, skipped):
+    assert is_empty_record(get_site(site), title, desc) is skipped
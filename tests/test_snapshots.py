@@ -0,0 +1,63 @@
+import asyncio
+import gzip
+import os
+
+from scraper.snapshots import SnapshotService
+
+
+class Page:
+    def __init__(self, dom="<html>hiba</html>", fail=False):
+        self.dom, self.fail, self.calls = dom, fail, 0
+
+    def screenshot(self, full_page=False):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("Target page, context or browser has been closed")
+        return b"png"
+
+    def content(self):
+        return self.dom
+
+
+class AsyncPage(Page):
+    async def screenshot(self, full_page=False):
+        return Page.screenshot(self, full_page)
+
+    async def content(self):
+        return self.dom
+
+
+def read_index(directory):
+    with open(os.path.join(directory, "index.tsv"), encoding="utf-8") as f:
+        return [line.rstrip("\n").split("\t") for line in f]
+
+
+def test_the_snapshot_is_taken_from_the_page_itself(tmp_path):
+    service = SnapshotService(str(tmp_path), sample_rate=0.0)
+    service.capture(Page(), "https://example.hu/termek/1", "error")
+    asyncio.run(service.capture_async(AsyncPage("<p>üres</p>"), "https://example.hu/termek/2", "empty"))
+    service.close()
+    index = read_index(tmp_path)
+    assert [(reason, url) for _, reason, url, _ in index] == [
+        ("error", "https://example.hu/termek/1"), ("empty", "https://example.hu/termek/2")]
+    with gzip.open(os.path.join(tmp_path, index[1][3] + ".html.gz"), "rt", encoding="utf-8") as f:
+        assert f.read() == "<p>üres</p>"
+    assert service.taken == 2
+
+
+def test_samples_follow_the_rate_and_nothing_is_read_otherwise(tmp_path):
+    page = Page()
+    service = SnapshotService(str(tmp_path), sample_rate=0.0)
+    service.capture(page, "https://example.hu/termek/1")
+    service.close()
+    assert page.calls == 0 and service.taken == 0
+
+
+def test_a_closed_page_or_a_full_quota_drops_the_snapshot(tmp_path):
+    service = SnapshotService(str(tmp_path), quota_bytes=0)
+    service.capture(Page(), "https://example.hu/termek/1", "error")
+    assert service.dropped == 1
+    service = SnapshotService(str(tmp_path / "other"))
+    service.capture(Page(fail=True), "https://example.hu/termek/1", "error")
+    service.close()
+    assert service.taken == 0 and not os.path.exists(tmp_path / "other" / "index.tsv")
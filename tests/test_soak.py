@@ -0,0 +1,35 @@
+import pytest
+
+from scraper.soak import evaluate, slope_per_hour
+
+
+def samples(heap, rate, rss=None):
+    return [{"t": t * 600.0, "heap_mb": h, "rate": r, "browser_rss_mb": (rss or heap)[t], "process_rss_mb": 100.0}
+            for t, (h, r) in enumerate(zip(heap, rate))]
+
+
+def test_slope_is_in_units_per_hour():
+    assert slope_per_hour([0, 1800, 3600], [10, 15, 20]) == pytest.approx(10.0)
+    assert slope_per_hour([0], [10]) == 0.0
+    assert slope_per_hour([5, 5], [1, 2]) == 0.0
+
+
+def test_flat_run_passes():
+    report = evaluate(samples([50] * 12, [10] * 12), 0.2, 50, 200, 0.2)
+    assert report["passed"] and report["failures"] == []
+    assert report["throughput_decay"] == pytest.approx(0.0)
+
+
+def test_heap_growth_and_throughput_decay_fail():
+    # 12 samples 10 minutes apart: the heap grows 60 MB/h and the rate halves.
+    report = evaluate(samples([50 + 10 * t for t in range(12)], [10] * 6 + [5] * 6), 0.2, 50, 200, 0.2)
+    assert report["heap_slope_mb_per_hour"] == pytest.approx(60.0)
+    assert report["throughput_decay"] == pytest.approx(0.5)
+    assert not report["passed"] and len(report["failures"]) == 2
+
+
+def test_warmup_is_ignored():
+    # Memory jumps during the first samples only (the warm-up share), then stays flat.
+    report = evaluate(samples([10, 200] + [300] * 10, [10] * 12), 0.2, 50, 200, 0.2)
+    assert report["heap_slope_mb_per_hour"] == pytest.approx(0.0)
+    assert report["passed"]
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from scraper import streaming
+from scraper.compact import UrlSet
+from scraper.pipeline import PageLoadError
+from scraper.sites import SiteConfig
+
+SITE = SiteConfig(name="example", base_url="https://example.hu/", link_prefix="https://example.hu",
+                  pagination_mode="none", selectors={"product": "a.product"})
+
+
+class Page:
+    def __init__(self):
+        self.url, self.closed = None, False
+
+    async def query_selector(self, css):
+        return object()
+
+    async def eval_on_selector_all(self, css, script):
+        return [f"/termek/{self.url.rsplit('/', 1)[-1]}-{i}" for i in range(2)]
+
+    async def close(self):
+        self.closed = True
+
+
+class Context:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        self.pages.append(Page())
+        return self.pages[-1]
+
+
+@pytest.fixture
+def broken_pages(monkeypatch):
+    async def goto(page, site, url):
+        if "hibas" in url:
+            raise PageLoadError(f"Error loading {url}: timeout")
+        page.url = url
+
+    monkeypatch.setattr(streaming, "goto", goto)
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_a_listing_page_that_fails_to_load_is_skipped(broken_pages):
+    async def run():
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+        for url in ["https://example.hu/kat/a", "https://example.hu/kat/hibas", "https://example.hu/kat/b", None]:
+            inbox.put_nowait(url)
+        await streaming._listing_worker(Page(), SITE, inbox, outbox, UrlSet())
+        return drain(outbox)
+
+    assert asyncio.run(run()) == ["https://example.hu/termek/a-0", "https://example.hu/termek/a-1",
+                                  "https://example.hu/termek/b-0", "https://example.hu/termek/b-1"]
+
+
+def test_a_category_that_fails_to_expand_is_skipped(broken_pages, monkeypatch):
+    async def expand(page, site, link):
+        await streaming.goto(page, site, link)
+        return [link, link + "?page=2"]
+
+    monkeypatch.setattr(streaming, "expand_category", expand)
+
+    async def run():
+        inbox, outbox = asyncio.Queue(), asyncio.Queue()
+        for url in ["https://example.hu/hibas", "https://example.hu/kat", None]:
+            inbox.put_nowait(url)
+        await streaming._pagination_worker(Page(), SITE, inbox, outbox, UrlSet())
+        return drain(outbox)
+
+    assert asyncio.run(run()) == ["https://example.hu/kat", "https://example.hu/kat?page=2"]
+
+
+def test_a_failing_stage_waits_for_the_cancelled_ones(broken_pages, monkeypatch, tmp_path):
+    async def scrape_detail(page, site, url):
+        if url.endswith("b-1"):
+            raise RuntimeError("extraction failed")
+        await asyncio.sleep(0.05)
+        return "Cím", "Leírás", {}
+
+    monkeypatch.setattr(streaming, "_scrape_detail", scrape_detail)
+
+    async def run():
+        context = Context()
+        with pytest.raises(RuntimeError):
+            await streaming.stream_site(SITE, str(tmp_path / "out.json"),
+                                        ["https://example.hu/kat/a", "https://example.hu/kat/b"],
+                                        streaming.StreamConfig(detail_workers=2), context)
+        assert [task for task in asyncio.all_tasks() if task is not asyncio.current_task()] == []
+        return context
+
+    assert all(page.closed for page in asyncio.run(run()).pages)
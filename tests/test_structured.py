@@ -0,0 +1,56 @@
+import pytest
+
+from scraper.structured import combine
+
+FIELDS = {"title": "Arai RX-7V bukósisak", "desc": "Rövid leírás.", "sku": "RX7V", "source": "json-ld"}
+
+
+def test_longer_dom_description_is_kept():
+    long_desc = "Rövid leírás. A teljes leírás a termékoldalon, méretekkel és anyagokkal."
+    title, desc, extra = combine(FIELDS, None, long_desc)
+    assert (title, desc) == ("Arai RX-7V bukósisak", long_desc)
+    assert extra == {"sku": "RX7V", "source": "json-ld+selectors"}
+
+
+def test_structured_description_is_kept_when_longer():
+    title, desc, extra = combine(FIELDS, None, "Rövid.")
+    assert desc == "Rövid leírás." and extra["source"] == "json-ld"
+
+
+def test_selectors_fill_missing_fields():
+    title, desc, extra = combine({}, "Cím", "Leírás")
+    assert (title, desc, extra) == ("Cím", "Leírás", {"source": "selectors"})
+
+
+class Page:
+    # Answers the structured data query; every selector query is recorded.
+    def __init__(self, jsonld):
+        self.jsonld = jsonld
+        self.queried = []
+
+    def evaluate(self, script):
+        return {"jsonld": self.jsonld, "microdata": None}
+
+    def query_selector(self, css):
+        self.queried.append(css)
+        return None
+
+    def query_selector_all(self, css):
+        self.queried.append(css)
+        return []
+
+
+def test_selectors_are_skipped_for_fields_the_structured_data_has():
+    pytest.importorskip("playwright")
+    from dataclasses import replace
+
+    from scraper import get_site
+    from scraper.pipeline import scrape_product_fields
+
+    site = replace(get_site("tornadohelmets"), structured_data=True)
+    complete = Page(['{"@type": "Product", "name": "Arai RX-7V", "description": "Bukósisak."}'])
+    assert scrape_product_fields(complete, site)[:2] == ("Arai RX-7V", "Bukósisak.")
+    assert complete.queried == []
+    title_only = Page(['{"@type": "Product", "name": "Arai RX-7V"}'])
+    scrape_product_fields(title_only, site)
+    assert title_only.queried and site.selectors["product_title"] not in title_only.queried
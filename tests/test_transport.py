@@ -0,0 +1,88 @@
+import http.client
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraper.transport import HttpClient
+
+
+class OneRequestPerConnection(BaseHTTPRequestHandler):
+    # Answers as if the connection stayed open, then closes it, like a server's keep-alive timeout.
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def _answer(self):
+        self.requests.append(self.command)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+        self.close_connection = True
+
+    do_GET = do_POST = _answer
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    OneRequestPerConnection.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), OneRequestPerConnection)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+
+
+def test_only_idempotent_requests_are_retried_on_a_closed_connection(server):
+    with HttpClient() as client:
+        assert client.get(server).body == b"ok"
+        assert client.get(server).body == b"ok"
+        assert client.metrics()[server.split("/")[2]]["retries"] == 1
+        with pytest.raises(OSError):
+            client.request("POST", server, body=b"{}")
+        assert client.request("POST", server, body=b"{}", idempotent=True).body == b"ok"
+    assert OneRequestPerConnection.requests == ["GET", "GET", "POST"]
+
+
+def test_dns_entry_is_dropped_after_a_failed_connect(server):
+    host, port = server.split("/")[2].split(":")
+    with HttpClient() as client:
+        client.get(server)
+        assert (host, int(port)) in client.dns.entries
+        client.dns.entries[(host, int(port))] = (float("inf"), client.dns.entries[(host, int(port))][1][:0])
+        with pytest.raises(OSError):
+            client.get(server)
+        assert (host, int(port)) not in client.dns.entries
+        assert client.get(server).body == b"ok"
+
+
+class BrokenResponse(BaseHTTPRequestHandler):
+    # Answers with something that is not HTTP and keeps the connection open.
+    def do_GET(self):
+        self.wfile.write(b"garbage\r\n\r\n")
+        self.wfile.flush()
+        self.rfile.read(1)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_a_connection_that_failed_mid_response_is_closed_not_pooled():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BrokenResponse)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        with HttpClient(timeout=5) as client:
+            used = []
+            checkout = client._checkout
+            client._checkout = lambda *args: used.append(checkout(*args)) or used[-1]
+            with pytest.raises(http.client.HTTPException):
+                client.get(url)
+            assert len(used) == 1 and used[0].sock is None
+            assert all(not idle for idle in client.pools.values())
+    finally:
+        server.shutdown()
+
@@ -0,0 +1,59 @@
+from scraper import get_site
+from scraper.urls import (
+    absolute_link,
+    group_by_category,
+    last_page_from_href,
+    page_number,
+    page_url,
+    parse_page_value,
+    remove_page_param,
+    scrape_pages_in_reverse,
+    unwrap_redirect,
+)
+
+
+def test_absolute_link():
+    assert absolute_link("/blog/poszt", "https://www.motoroazis.hu") == "https://www.motoroazis.hu/blog/poszt"
+    assert absolute_link("/termek", "https://jaszmotor.hu/") == "https://jaszmotor.hu/termek"
+    assert absolute_link("https://masik.hu/x", "https://jaszmotor.hu/") == "https://masik.hu/x"
+    assert absolute_link("/x", "") == "/x"
+
+
+def test_unwrap_redirect():
+    post = "https://totalbike.hu/technika/nepperuzo/2018/02/20/poszt/"
+    assert unwrap_redirect("https://dex.hu/x.php?id=totalbike_cikklink&url=https%3A%2F%2Ftotalbike.hu%2Ftechnika"
+                           "%2Fnepperuzo%2F2018%2F02%2F20%2Fposzt%2F") == post
+    assert unwrap_redirect(post) == post
+
+
+def test_remove_page_param():
+    assert remove_page_param("https://x.hu/kat?page=11") == "https://x.hu/kat"
+    assert remove_page_param("https://x.hu/kat?foo=bar&page=2") == "https://x.hu/kat?foo=bar"
+    assert remove_page_param("https://x.hu/kat?iPage=3", "iPage") == "https://x.hu/kat"
+
+
+def test_page_urls_follow_the_site_parameters():
+    motozem, totalbike = get_site("motozem"), get_site("totalbike")
+    assert page_url(motozem, "https://www.motozem.hu/bukosisak/", 3) == "https://www.motozem.hu/bukosisak/?iPage=3#filter-anchor"
+    assert page_url(motozem, "https://www.motozem.hu/x?sort=1", 2) == "https://www.motozem.hu/x?sort=1&iPage=2#filter-anchor"
+    assert page_number(motozem, "https://www.motozem.hu/x?iPage=4#filter-anchor") == 4
+    assert page_number(totalbike, "https://totalbike.hu/technika/nepperuzo/") == 0
+    assert page_number(motozem, "https://www.motozem.hu/x?iPage=abc") == 1
+    assert scrape_pages_in_reverse(totalbike, "https://t.hu/", 2) == ["https://t.hu/?p=2", "https://t.hu/?p=1", "https://t.hu/?p=0"]
+
+
+def test_group_by_category_sorts_pages_from_the_first():
+    site = get_site("motoroazis")
+    urls = ["https://m.hu/a?page=3", "https://m.hu/b", "https://m.hu/a", "https://m.hu/a?page=2"]
+    assert group_by_category(site, urls) == {
+        "https://m.hu/a": ["https://m.hu/a", "https://m.hu/a?page=2", "https://m.hu/a?page=3"],
+        "https://m.hu/b": ["https://m.hu/b"],
+    }
+
+
+def test_last_page_from_href():
+    site = get_site("motoroazis")
+    assert last_page_from_href(site, "/motoros_ruhazat_58?page=17") == 17
+    assert last_page_from_href(site, "/motoros_ruhazat_58") == 1
+    assert last_page_from_href(site, None) == 1
+    assert parse_page_value("x") == 1
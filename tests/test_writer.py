@@ -0,0 +1,88 @@
+import asyncio
+import json
+import os
+import time
+
+import pytest
+
+from scraper.storage import iter_records, load_links_from_json, output_exists, output_files, save_links_to_json
+from scraper.writer import BackgroundWriter
+
+
+def records(n):
+    return [{"url": f"https://example.hu/p/{i}", "title": f"Termék {i}", "desc": "leírás"} for i in range(n)]
+
+
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("rotate_records", [None, 4])
+def test_outputs_read_back_under_the_requested_name(tmp_path, compress, rotate_records):
+    path = str(tmp_path / "final_output.json")
+    with BackgroundWriter(path, batch_size=3, compress=compress, rotate_records=rotate_records) as writer:
+        for record in records(10):
+            writer.put(record)
+    assert output_exists(path)
+    assert len(output_files(path)) == (3 if rotate_records else 1)
+    assert load_links_from_json(path) == records(10)
+    assert list(iter_records(path)) == records(10)
+
+
+def test_put_async_waits_for_a_full_queue_without_blocking_the_loop(tmp_path):
+    path = str(tmp_path / "final_output.json")
+    writer = BackgroundWriter(path, queue_size=1)
+
+    async def produce():
+        for record in records(200):
+            await writer.put_async(record)
+
+    asyncio.run(produce())
+    writer.close()
+    assert load_links_from_json(path) == records(200)
+
+
+def test_missing_output():
+    assert not output_exists("does/not/exist.json")
+    with pytest.raises(FileNotFoundError):
+        load_links_from_json("does/not/exist.json")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 20])
+def test_records_are_decoded_across_chunk_boundaries(tmp_path, chunk_size):
+    from scraper.storage import _iter_list
+
+    data = [{"url": "https://example.hu/1", "desc": "a, b ] c"}, -1.5e3, [1, [2]], "x", None, 12]
+    path = tmp_path / "records.json"
+    path.write_text(json.dumps(data, indent=1), encoding="utf-8")
+    with open(path, encoding="utf-8") as f:
+        assert list(_iter_list(f, chunk_size)) == data
+
+
+@pytest.mark.parametrize("text", ['{"url": "a"}', '[{"url": "a"}, {"url"', '[1, 2'])
+def test_streaming_rejects_what_is_not_a_complete_list(tmp_path, text):
+    path = tmp_path / "records.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_records(str(path)))
+
+
+def test_a_rotated_run_replaces_an_earlier_plain_output_and_its_stale_segments(tmp_path):
+    path = str(tmp_path / "final_output.json")
+    save_links_to_json(records(3), path)
+    with BackgroundWriter(path, rotate_records=2) as writer:
+        for record in records(10):
+            writer.put(record)
+    with BackgroundWriter(path, rotate_records=4) as writer:
+        for record in records(5):
+            writer.put(record)
+    assert output_files(path) == [str(tmp_path / "final_output.00001.json"), str(tmp_path / "final_output.00002.json")]
+    assert load_links_from_json(path) == records(5)
+
+
+def test_the_layout_written_last_is_read(tmp_path):
+    path = str(tmp_path / "final_output.json")
+    with BackgroundWriter(path, rotate_records=2, compress=True) as writer:
+        for record in records(3):
+            writer.put(record)
+    # Written by something other than a BackgroundWriter, later.
+    save_links_to_json(records(1), path)
+    os.utime(path, (time.time() + 10, time.time() + 10))
+    assert output_files(path) == [path]